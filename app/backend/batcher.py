@@ -0,0 +1,156 @@
+"""Micro-batching of robot decisions across concurrent requests.
+
+Each request thread submits its robot's (observation, mask) and blocks on a
+future. A single worker thread collects pending decisions for up to
+`max_wait_ms` or `max_batch_size` items, runs one batched forward pass and
+resolves every caller's future.
+
+Requests register as callers for the span of their robot turns, so a batch
+waits for the other registered requests' next decisions. If every registered
+caller is already waiting in the batch, nobody else can join it, so it is run
+immediately and a lone request never pays the batching wait. A request whose
+move came from the decision cache or the opening book marks itself idle until
+its next submission, so it doesn't hold up anyone's batch.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import numpy as np
+
+from high_society.numpy_policy import NumpyQNetwork, masked_argmax
+
+
+# Put on the queue to make the worker re-check who it is waiting for
+_WAKE = object()
+
+
+@dataclass
+class _Pending:
+    observation: np.ndarray
+    action_mask: np.ndarray
+    future: Future
+
+
+class InferenceBatcher:
+    def __init__(self, q_net: NumpyQNetwork, max_batch_size: int = 32, max_wait_ms: float = 2.0):
+        self.q_net = q_net
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_ms / 1000
+        self._queue: queue.Queue = queue.Queue()
+        self._active_callers = 0
+        # Per request thread: inside a caller() span, and counted in _active_callers
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._worker: threading.Thread | None = None
+        # Counters for tuning max_wait_ms / max_batch_size
+        self.batches = 0
+        self.decisions = 0
+
+    @contextmanager
+    def caller(self):
+        """Register the current request as one that will submit decisions until the block exits."""
+        self._local.in_span = True
+        self._register()
+        try:
+            yield
+        finally:
+            self.idle()
+            self._local.in_span = False
+
+    def idle(self):
+        """The current request's move didn't need the model; don't wait for it until it submits again."""
+        if getattr(self._local, "registered", False):
+            with self._lock:
+                self._active_callers -= 1
+            self._local.registered = False
+            self._queue.put(_WAKE)
+
+    def _register(self):
+        if not getattr(self._local, "registered", False):
+            with self._lock:
+                self._active_callers += 1
+            self._local.registered = True
+
+    def submit(self, observation: np.ndarray, action_mask: np.ndarray) -> Future:
+        self._ensure_worker()
+        if getattr(self._local, "in_span", False):
+            self._register()
+        future: Future = Future()
+        self._queue.put(_Pending(observation, action_mask, future))
+        return future
+
+    def get_action(self, observation: np.ndarray, action_mask: np.ndarray) -> int:
+        return self.submit(observation, action_mask).result()
+
+    def close(self):
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = None
+
+    def _ensure_worker(self):
+        if self._worker is None:
+            with self._lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name="inference-batcher", daemon=True)
+                    self._worker.start()
+
+    def _collect_batch(self, first: _Pending) -> tuple[list[_Pending], bool]:
+        """Gather items until the batch is full, every caller is in it, or the wait runs out."""
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait_s
+        while len(batch) < self.max_batch_size and len(batch) < self._active_callers:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            if item is not _WAKE:
+                batch.append(item)
+        return batch, False
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            if first is _WAKE:
+                continue
+            batch, closing = self._collect_batch(first)
+            self._run_batch(batch)
+            if closing:
+                return
+
+    def _run_batch(self, batch: list[_Pending]):
+        try:
+            observations = np.stack([item.observation for item in batch])
+            action_masks = np.stack([item.action_mask for item in batch])
+            actions = masked_argmax(self.q_net(observations), action_masks)
+        except Exception as e:
+            for item in batch:
+                item.future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.decisions += len(batch)
+        for item, action in zip(batch, actions):
+            item.future.set_result(int(action))
+
+
+class BatchedDQNAgent:
+    """Greedy DQN robot whose forward passes go through an InferenceBatcher."""
+
+    def __init__(self, player_id: int, batcher: InferenceBatcher):
+        self.player_id = player_id
+        self.batcher = batcher
+
+    def get_action(self, observation: np.ndarray, action_mask: np.ndarray) -> tuple[int, float]:
+        return self.batcher.get_action(observation, action_mask), 0.0
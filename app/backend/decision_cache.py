@@ -0,0 +1,86 @@
+"""LRU cache of robot decisions.
+
+The greedy DQN robot is a deterministic function of its observation and
+action mask, and opening positions repeat across games, so a decision seen
+before is answered without running the policy. Keys are the observation's
+float32 bytes plus the packed mask bits.
+"""
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+import numpy as np
+
+DEFAULT_MAX_ENTRIES = 50_000
+
+
+def decision_key(observation: np.ndarray, action_mask: np.ndarray) -> bytes:
+    obs_bytes = np.ascontiguousarray(observation, dtype=np.float32).tobytes()
+    return obs_bytes + np.packbits(np.asarray(action_mask, dtype=bool)).tobytes()
+
+
+class DecisionCache:
+    """Thread-safe, size-bounded LRU of decision key -> action."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[bytes, int] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key: bytes) -> int | None:
+        with self._lock:
+            action = self._entries.get(key)
+            if action is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return action
+
+    def put(self, key: bytes, action: int):
+        with self._lock:
+            self._entries[key] = action
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {"size": len(self), "hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate}
+
+
+class CachedAgent:
+    """Answers from the cache when it can, otherwise asks `agent` and remembers the answer.
+
+    Only valid for deterministic agents (the greedy DQN robot). `on_hit` is
+    called for each answer from the cache (the backend marks the request idle
+    in the batcher).
+    """
+
+    def __init__(self, agent, cache: DecisionCache, on_hit: Callable[[], None] | None = None):
+        self.agent = agent
+        self.cache = cache
+        self.on_hit = on_hit
+
+    @property
+    def player_id(self) -> int:
+        return self.agent.player_id
+
+    def get_action(self, observation: np.ndarray, action_mask: np.ndarray) -> tuple[int, float]:
+        key = decision_key(observation, action_mask)
+        action = self.cache.get(key)
+        if action is None:
+            action, _ = self.agent.get_action(observation, action_mask)
+            self.cache.put(key, action)
+        elif self.on_hit is not None:
+            self.on_hit()
+        return action, 0.0
@@ -0,0 +1,98 @@
+"""Slim delta responses for the session API.
+
+Every session response gets a monotonically increasing state version, and
+the session remembers a snapshot of the last few versions it sent. A client
+that reports the version it already has only receives what changed since
+then: new log entries, changed player fields, the auction if it changed and
+the new action mask.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from .schemas import ActionLogEntry, AuctionInfo, PlayerDelta, PlayerInfo, SessionDeltaResponse, SessionGameResponse
+
+# Versions a client may still diff against (covers a few lost responses)
+MAX_SNAPSHOTS = 4
+
+
+@dataclass
+class StateSnapshot:
+    players: list[PlayerInfo]
+    auction: AuctionInfo | None
+    remaining_special_cards: int
+    log_len: int
+
+
+def record_snapshot(snapshots: OrderedDict[int, StateSnapshot], response: SessionGameResponse, log_len: int):
+    snapshots[response.version] = StateSnapshot(
+        players=response.players,
+        auction=response.auction,
+        remaining_special_cards=response.remaining_special_cards,
+        log_len=log_len,
+    )
+    while len(snapshots) > MAX_SNAPSHOTS:
+        snapshots.popitem(last=False)
+
+
+def diff_players(old: list[PlayerInfo], new: list[PlayerInfo]) -> list[PlayerDelta]:
+    deltas = []
+    for old_player, new_player in zip(old, new):
+        old_fields = old_player.model_dump()
+        changed = {
+            key: value for key, value in new_player.model_dump().items()
+            if old_fields[key] != value
+        }
+        if changed:
+            deltas.append(PlayerDelta(player_idx=new_player.player_idx, **changed))
+    return deltas
+
+
+def build_delta_response(
+    response: SessionGameResponse,
+    base: StateSnapshot | None,
+    base_version: int | None,
+    full_log: list[ActionLogEntry],
+) -> SessionDeltaResponse:
+    """Diff `response` against the snapshot the client has, or embed the full response if there is none.
+
+    `full_log` is the session's whole action log; a full response carries all
+    of it, since the client has to rebuild its history from scratch.
+    """
+    if base is None:
+        return SessionDeltaResponse(
+            session_id=response.session_id,
+            version=response.version,
+            current_agent_idx=response.current_agent_idx,
+            action_mask=response.action_mask,
+            game_over=response.game_over,
+            robot_timing=response.robot_timing,
+            full=response.model_copy(update={"action_log": list(full_log)}),
+        )
+
+    changes = {}
+    if len(full_log) > base.log_len:
+        changes["new_log_entries"] = full_log[base.log_len:]
+    changed_players = diff_players(base.players, response.players)
+    if changed_players:
+        changes["changed_players"] = changed_players
+    if response.auction != base.auction:
+        if response.auction is None:
+            changes["auction_cleared"] = True
+        else:
+            changes["auction"] = response.auction
+    if response.remaining_special_cards != base.remaining_special_cards:
+        changes["remaining_special_cards"] = response.remaining_special_cards
+    if response.game_over:
+        changes["winner_idx"] = response.winner_idx
+        changes["eliminated_indices"] = response.eliminated_indices
+
+    return SessionDeltaResponse(
+        session_id=response.session_id,
+        version=response.version,
+        base_version=base_version,
+        current_agent_idx=response.current_agent_idx,
+        action_mask=response.action_mask,
+        game_over=response.game_over,
+        robot_timing=response.robot_timing,
+        **changes,
+    )
@@ -0,0 +1,57 @@
+"""Bounded offload of CPU-bound game work from the async handlers.
+
+Handlers await work on a dedicated thread pool instead of Starlette's
+default one. Work that would push the number of running plus queued jobs
+past the limit is rejected right away (the API answers 503), so a spike of
+new games degrades gracefully instead of piling up threads and latency.
+
+Jobs take a `cancel` event which the handler sets when the client
+disconnects; the robot loop checks it between moves and stops early.
+"""
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class ExecutorOverloaded(Exception):
+    """Raised when the executor's queue is full."""
+
+
+class WorkCancelled(Exception):
+    """Raised inside a job when its cancel event is set."""
+
+
+class RobotExecutor:
+    def __init__(self, max_workers: int = 8, max_queue: int = 64):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="robot")
+        # Only touched from the event loop thread
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """Jobs running or waiting for a worker."""
+        return self._pending
+
+    def check_capacity(self):
+        """Raise ExecutorOverloaded if another job would be rejected."""
+        if self._pending >= self.max_workers + self.max_queue:
+            raise ExecutorOverloaded(f"{self._pending} robot jobs pending")
+
+    async def run(self, fn: Callable[..., T], *args, cancel: threading.Event, **kwargs) -> T:
+        self.check_capacity()
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, functools.partial(fn, *args, cancel=cancel, **kwargs))
+        finally:
+            self._pending -= 1
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,132 @@
+"""One-pass parsing and invariant checks for client-owned game state.
+
+FastAPI parses a JSON body into Python objects and then validates those
+into models, building everything twice. Here the raw body goes straight to
+pydantic-core's JSON validator, which builds the models in one pass. (Building
+them by hand with `model_construct` measured slower than that.)
+
+Type validation alone accepts states the env cannot play from, like a
+duplicated prestige card or a bid that doesn't add up, so `check_game_state`
+verifies the invariants the env relies on before it is restored.
+"""
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+
+from high_society.environments.discrete import (
+    MAX_NUM_PLAYERS,
+    MONEY_CARD_VALUES,
+    GameState,
+    PrestigeCard,
+)
+
+from .schemas import ActionRequest
+
+MIN_NUM_PLAYERS = 3
+NUM_SPECIAL_CARDS = 4
+
+
+class InvalidGameState(ValueError):
+    """The state is well-typed but not one the game can reach."""
+
+
+def parse_action_request(body: bytes) -> ActionRequest:
+    """Validate the raw JSON body, raising the same 422 FastAPI would."""
+    try:
+        return ActionRequest.model_validate_json(body)
+    except ValidationError as e:
+        errors = [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+        raise RequestValidationError(errors, body=body)
+
+
+def _check_card(card: PrestigeCard, seen_values: set[int]) -> bool:
+    """Check a prestige card and return whether it is special."""
+    if card.type == "special":
+        if card.speciality != "2x" or card.value is not None:
+            raise InvalidGameState(f"Invalid special card {card}")
+        return True
+    if card.value is None or not 1 <= card.value <= 9 or card.speciality is not None:
+        raise InvalidGameState(f"Invalid value card {card}")
+    if card.value in seen_values:
+        raise InvalidGameState(f"Prestige card {card.value} appears more than once")
+    seen_values.add(card.value)
+    return False
+
+
+def _prestige(value_sum: int, num_specials: int) -> float:
+    """Same as get_total_prestige, from the card value sum and the number of 2x cards."""
+    return value_sum * 2 ** num_specials
+
+
+def check_game_state(game_state: GameState, current_agent_idx: int):
+    """Raise InvalidGameState unless the state is a reachable, in-progress position."""
+    num_players = len(game_state.player_states)
+    players = set(range(num_players))
+    if not MIN_NUM_PLAYERS <= num_players <= MAX_NUM_PLAYERS or set(game_state.player_states) != players:
+        raise InvalidGameState(f"Players must be numbered 0..n-1 with {MIN_NUM_PLAYERS}-{MAX_NUM_PLAYERS} players")
+    if game_state.round_starter_idx not in players:
+        raise InvalidGameState(f"Invalid round starter {game_state.round_starter_idx}")
+
+    seen_values: set[int] = set()
+    num_specials = 0
+    money: dict[int, set[int]] = {}
+    prestige_parts: dict[int, tuple[int, int]] = {}
+    for idx, player in game_state.player_states.items():
+        if player.player_idx != idx:
+            raise InvalidGameState(f"Player {idx} has player_idx {player.player_idx}")
+        values = [card.value for card in player.money_cards]
+        money[idx] = set(values)
+        if len(money[idx]) != len(values) or not money[idx] <= set(MONEY_CARD_VALUES):
+            raise InvalidGameState(f"Player {idx} has invalid money cards {values}")
+        if player.total_money != sum(values):
+            raise InvalidGameState(f"Player {idx} total_money doesn't match their money cards")
+        value_sum = 0
+        player_specials = 0
+        for card in player.prestige_cards:
+            if _check_card(card, seen_values):
+                player_specials += 1
+            else:
+                value_sum += card.value
+        if player.total_prestige != _prestige(value_sum, player_specials):
+            raise InvalidGameState(f"Player {idx} total_prestige doesn't match their prestige cards")
+        num_specials += player_specials
+        prestige_parts[idx] = (value_sum, player_specials)
+
+    deck_specials = sum(_check_card(card, seen_values) for card in game_state.remaining_prestige_cards)
+    if game_state.remaining_special_cards != deck_specials:
+        raise InvalidGameState("remaining_special_cards doesn't match the remaining deck")
+
+    auction = game_state.cur_round
+    if auction is None:
+        raise InvalidGameState("No auction in progress")
+    card_is_special = _check_card(auction.card, seen_values)
+    num_specials += deck_specials + card_is_special
+    if num_specials > NUM_SPECIAL_CARDS:
+        raise InvalidGameState(f"{num_specials} special cards in play")
+    if auction.num < 1 or auction.cur_bidder_idx not in players:
+        raise InvalidGameState("Invalid auction round")
+
+    if set(auction.bids) != players or set(auction.cards_in_bid) != players or set(auction.value_to_agent) != players:
+        raise InvalidGameState("Auction must have a bid entry for every player")
+    if not auction.players_to_bid <= players or len(auction.players_to_bid) < 2:
+        raise InvalidGameState("Auction must have at least two players still bidding")
+    for idx in players:
+        cards = auction.cards_in_bid[idx]
+        if not cards <= money[idx]:
+            raise InvalidGameState(f"Player {idx} bids cards they don't have")
+        if auction.bids[idx] != sum(cards):
+            raise InvalidGameState(f"Player {idx} bid doesn't match their cards in bid")
+        if cards and idx not in auction.players_to_bid:
+            raise InvalidGameState(f"Player {idx} passed but still has cards in bid")
+        value_sum, player_specials = prestige_parts[idx]
+        if card_is_special:
+            potential = _prestige(value_sum, player_specials + 1)
+        else:
+            potential = _prestige(value_sum + auction.card.value, player_specials)
+        if auction.value_to_agent[idx] != potential:
+            raise InvalidGameState(f"Player {idx} value_to_agent doesn't match the auctioned card")
+    # The high bidder may have passed since, so only an upper bound holds
+    if max(auction.bids.values()) > auction.cur_bid:
+        raise InvalidGameState("A bid exceeds the current high bid")
+
+    if current_agent_idx not in auction.players_to_bid:
+        raise InvalidGameState(f"Player {current_agent_idx} is not in the auction and can't move")
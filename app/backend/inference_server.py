@@ -0,0 +1,287 @@
+"""A local inference process shared by every API worker.
+
+With several uvicorn workers, each one would otherwise hold its own policy and
+batch only its own requests. Instead one process owns the policy and serves
+Q-values over a Unix socket; workers point `HIGH_SOCIETY_INFERENCE_SOCKET` at
+it and their InferenceBatcher evaluates through a `RemotePolicy`.
+
+Each worker's batcher already batches its own requests, and sends one batch at
+a time. The server merges the batches that arrive from different workers while
+a forward pass is running into the next pass, so it adds no waiting of its own.
+
+Frames are length-prefixed:
+    request   u32 length, u16 rows, u16 obs_dim, rows * obs_dim float32
+    response  u32 length, u8 status, then on success u16 rows, u16 num_actions,
+              rows * num_actions float32; on error a UTF-8 message
+
+A request with 0 rows of 0 features asks for the policy's dimensions; the
+response is u8 status, u16 obs_dim, u16 num_actions. Clients send it when
+they connect.
+
+Run it with:
+    python -m app.backend.inference_server --socket /tmp/high_society.sock
+"""
+import argparse
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+
+import numpy as np
+
+from high_society.numpy_policy import NumpyQNetwork
+
+_LENGTH = struct.Struct(">I")
+_SHAPE = struct.Struct(">HH")
+_STATUS_OK = 0
+_STATUS_ERROR = 1
+_DTYPE = np.dtype("<f4")
+
+DEFAULT_MAX_BATCH_ROWS = 256
+_DESCRIBE = _SHAPE.pack(0, 0)
+
+
+class InferenceServerError(RuntimeError):
+    """The inference server couldn't evaluate a batch."""
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    buf = bytearray(size)
+    view = memoryview(buf)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:])
+        if n == 0:
+            raise ConnectionError("Connection closed")
+        received += n
+    return bytes(buf)
+
+
+def _recv_frame(sock: socket.socket) -> bytes:
+    (length,) = _LENGTH.unpack(_recv_exactly(sock, _LENGTH.size))
+    return _recv_exactly(sock, length)
+
+
+def _send_frame(sock: socket.socket, payload: bytes):
+    sock.sendall(_LENGTH.pack(len(payload)) + payload)
+
+
+def _encode_rows(rows: np.ndarray) -> bytes:
+    return _SHAPE.pack(*rows.shape) + np.ascontiguousarray(rows, dtype=_DTYPE).tobytes()
+
+
+def _decode_rows(payload: bytes) -> np.ndarray:
+    rows, cols = _SHAPE.unpack_from(payload)
+    data = np.frombuffer(payload, dtype=_DTYPE, offset=_SHAPE.size)
+    if data.size != rows * cols:
+        raise ValueError(f"Expected {rows}x{cols} values, got {data.size}")
+    return data.reshape(rows, cols)
+
+
+# --- Server side ---
+class _PassQueue:
+    """Merges the observation blocks waiting when a forward pass starts into that pass."""
+
+    def __init__(self, q_net: NumpyQNetwork, max_rows: int = DEFAULT_MAX_BATCH_ROWS):
+        self.q_net = q_net
+        self.max_rows = max_rows
+        self._queue: queue.Queue[tuple[np.ndarray, Future] | None] = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="inference-server", daemon=True)
+        self._worker.start()
+        # Counters for tuning
+        self.passes = 0
+        self.rows = 0
+
+    def evaluate(self, observations: np.ndarray) -> np.ndarray:
+        future: Future = Future()
+        self._queue.put((observations, future))
+        return future.result()
+
+    def close(self):
+        self._queue.put(None)
+        self._worker.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            rows = len(item[0])
+            while rows < self.max_rows:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._run_pass(batch)
+                    return
+                batch.append(item)
+                rows += len(item[0])
+            self._run_pass(batch)
+
+    def _run_pass(self, batch: list[tuple[np.ndarray, Future]]):
+        try:
+            q_values = self.q_net(np.concatenate([observations for observations, _ in batch]))
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        self.passes += 1
+        self.rows += len(q_values)
+        offset = 0
+        for observations, future in batch:
+            future.set_result(q_values[offset:offset + len(observations)])
+            offset += len(observations)
+
+
+class _ConnectionHandler(socketserver.BaseRequestHandler):
+    server: "InferenceServer"
+
+    def handle(self):
+        while True:
+            try:
+                payload = _recv_frame(self.request)
+            except ConnectionError:
+                return
+            try:
+                observations = _decode_rows(payload)
+                if observations.shape == (0, 0):
+                    q_net = self.server.q_net
+                    _send_frame(self.request, bytes([_STATUS_OK]) + _SHAPE.pack(q_net.obs_dim, q_net.num_actions))
+                    continue
+                if observations.shape[1] != self.server.q_net.obs_dim:
+                    raise ValueError(
+                        f"Observations have {observations.shape[1]} features, the policy takes {self.server.q_net.obs_dim}"
+                    )
+                response = bytes([_STATUS_OK]) + _encode_rows(self.server.passes.evaluate(observations))
+            except Exception as e:
+                response = bytes([_STATUS_ERROR]) + f"{type(e).__name__}: {e}".encode()
+            _send_frame(self.request, response)
+
+
+class InferenceServer(socketserver.ThreadingUnixStreamServer):
+    """Serves one policy's Q-values to every connected worker, a thread per connection."""
+    daemon_threads = True
+
+    def __init__(self, socket_path: str | os.PathLike, q_net: NumpyQNetwork, max_batch_rows: int = DEFAULT_MAX_BATCH_ROWS):
+        socket_path = Path(socket_path)
+        # A socket left behind by a previous run would make bind fail
+        if socket_path.is_socket():
+            socket_path.unlink()
+        self.q_net = q_net
+        self.passes = _PassQueue(q_net, max_batch_rows)
+        super().__init__(str(socket_path), _ConnectionHandler)
+
+    def server_close(self):
+        super().server_close()
+        self.passes.close()
+        Path(self.server_address).unlink(missing_ok=True)
+
+
+# --- Worker side ---
+class RemotePolicy:
+    """Callable like NumpyQNetwork, but evaluated by the inference server.
+
+    One connection, used by one request at a time; the worker's batcher is
+    its only caller in practice. Reconnects once if the connection dropped.
+    `obs_dim` and `num_actions` are the served policy's, asked for on connect.
+    """
+
+    def __init__(self, socket_path: str | os.PathLike, timeout: float = 10.0):
+        self.socket_path = str(socket_path)
+        self.timeout = timeout
+        self._sock: socket.socket | None = None
+        self._dims: tuple[int, int] | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def obs_dim(self) -> int:
+        return self._describe()[0]
+
+    @property
+    def num_actions(self) -> int:
+        return self._describe()[1]
+
+    def _describe(self) -> tuple[int, int]:
+        if self._dims is None:
+            with self._lock:
+                if self._sock is None:
+                    self._sock = self._connect()
+        return self._dims
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+            _send_frame(sock, _DESCRIBE)
+            response = _recv_frame(sock)
+        except (OSError, ConnectionError) as e:
+            sock.close()
+            raise InferenceServerError(f"Can't reach the inference server at {self.socket_path}: {e}")
+        if response[0] != _STATUS_OK:
+            sock.close()
+            raise InferenceServerError(response[1:].decode())
+        # A restarted server may serve other weights, so take the dimensions on every connect
+        self._dims = _SHAPE.unpack_from(response, 1)
+        return sock
+
+    def _exchange(self, request: bytes) -> bytes:
+        if self._sock is None:
+            self._sock = self._connect()
+        try:
+            _send_frame(self._sock, request)
+            return _recv_frame(self._sock)
+        except (OSError, ConnectionError):
+            self.close()
+            raise
+
+    def __call__(self, observations: np.ndarray) -> np.ndarray:
+        """Q-values for a single observation (obs_dim,) or a batch (B, obs_dim)."""
+        observations = np.asarray(observations, dtype=np.float32)
+        request = _encode_rows(np.atleast_2d(observations))
+        with self._lock:
+            try:
+                response = self._exchange(request)
+            except (OSError, ConnectionError):
+                # The server may have restarted since the last call
+                try:
+                    response = self._exchange(request)
+                except (OSError, ConnectionError) as e:
+                    raise InferenceServerError(f"Inference server connection failed: {e}")
+
+        if response[0] != _STATUS_OK:
+            raise InferenceServerError(response[1:].decode())
+        q_values = _decode_rows(response[1:])
+        return q_values[0] if observations.ndim == 1 else q_values
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve DQN Q-values to the API workers over a Unix socket")
+    parser.add_argument("--socket", default=os.environ.get("HIGH_SOCIETY_INFERENCE_SOCKET"), required=False)
+    parser.add_argument("--weights", default=os.environ.get("HIGH_SOCIETY_WEIGHTS"))
+    parser.add_argument("--max-batch-rows", type=int, default=DEFAULT_MAX_BATCH_ROWS)
+    args = parser.parse_args()
+    if args.socket is None:
+        parser.error("--socket (or HIGH_SOCIETY_INFERENCE_SOCKET) is required")
+    if args.weights is None:
+        parser.error("--weights (or HIGH_SOCIETY_WEIGHTS) is required")
+
+    with InferenceServer(args.socket, NumpyQNetwork.from_checkpoint(args.weights), args.max_batch_rows) as server:
+        print(f"Serving {args.weights} on {args.socket}")
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
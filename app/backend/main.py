@@ -1,56 +1,321 @@
+import asyncio
+import copy
+import json
+import functools
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager, nullcontext
 from pathlib import Path
+from typing import AsyncIterator, Callable, Iterator, TypeVar
 
 import numpy as np
-import torch
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from pydantic import BaseModel
 
-from high_society.agents import DQNAgent, DiscreteRandomPassAgent
+from high_society.agents import DiscreteRandomPassAgent
 from high_society.environments.discrete import (
     ACTION_PASS,
+    MAX_NUM_PLAYERS,
     DiscreteHighSocietyEnv,
 )
+from high_society.game_log import GameLogWriter, GameRecord, deck_in_draw_order
+from high_society.numpy_policy import NumpyDQNAgent, NumpyQNetwork
+from high_society.search import AnytimeRolloutAgent
 from high_society.utils import cat_dict_array
 
 from .schemas import (
     ActionLogEntry,
     ActionRequest,
+    AuctionInfo,
     GameResponse,
     PlayerInfo,
+    RobotTiming,
+    SessionActionRequest,
+    SessionDeltaActionRequest,
+    SessionDeltaResponse,
+    SessionGameResponse,
+    SimulationRequest,
+    SimulationResponse,
+    TokenActionRequest,
+    TokenGameResponse,
 )
+from .batcher import BatchedDQNAgent, InferenceBatcher
+from .decision_cache import DEFAULT_MAX_ENTRIES, CachedAgent, DecisionCache
+from .delta import build_delta_response, record_snapshot
+from .executor import ExecutorOverloaded, RobotExecutor, WorkCancelled
+from .fast_restore import InvalidGameState, check_game_state, parse_action_request
+from .inference_server import RemotePolicy
+from .metrics import CONTENT_TYPE, REGISTRY, Counter, Gauge, Histogram
+from .opening_book import HUMAN_IDX, OpeningBook, weights_sha256
+from .sessions import DEFAULT_MAX_SESSIONS, DEFAULT_TTL_SECONDS, GameSession, SessionStore
+from .simulation import SimulationRunner, config_hash
+from .state_token import InvalidToken, TokenSigner, load_secret
 
-# --- Cached DQN weights (loaded once at startup) ---
-_WEIGHTS_PATH = Path(__file__).resolve().parents[2] / "experiments" / "results" / "pool" / "dqn_agent_v3.pth"
-_cached_weights: dict | None = None
-_cached_agents: dict[tuple[int, int], DQNAgent] = {}
+T = TypeVar("T")
 
+# --- Metrics (served at /metrics) ---
+# Phases can nest (build_response includes computing the human's mask).
+#   parse           request received -> handler starts (body parsing and validation)
+#   restore         env construction plus reset / restore_from_state
+#   mask            action mask computation
+#   robot_inference observation plus robot decision, per robot move
+#   build_response  building the response model
+#   serialize       JSON encoding on the worker for the game endpoints (see _rendered),
+#                   handler done -> response headers sent for the rest
+_PHASE_SECONDS = Histogram("high_society_phase_seconds", "Time spent per request phase", labelnames=("phase",))
+_PARSE = _PHASE_SECONDS.labels("parse")
+_RESTORE = _PHASE_SECONDS.labels("restore")
+_MASK = _PHASE_SECONDS.labels("mask")
+_ROBOT_INFERENCE = _PHASE_SECONDS.labels("robot_inference")
+_BUILD_RESPONSE = _PHASE_SECONDS.labels("build_response")
+_SERIALIZE = _PHASE_SECONDS.labels("serialize")
+_REQUEST_SECONDS = Histogram(
+    "high_society_request_seconds", "Request latency until the response is sent", labelnames=("route", "status"),
+)
+_ROBOT_TURNS = Histogram(
+    "high_society_robot_turns_per_request", "Robot moves played per request",
+    buckets=(0, 1, 2, 3, 4, 6, 8, 12, 16, 24, 32, 48, 64),
+)
+_ROBOT_BUDGET_USED = Histogram(
+    "high_society_robot_budget_used_ratio", "Search robot time spent per request / its budget",
+    buckets=(0.25, 0.5, 0.75, 0.9, 1.0, 1.05, 1.1, 1.25, 1.5, 2.0),
+)
+_IN_FLIGHT = Gauge("high_society_requests_in_flight", "HTTP requests being handled")
+Gauge("high_society_robot_jobs_pending", "Robot jobs running or queued", function=lambda: _robot_executor.pending)
+Gauge("high_society_sessions", "Live server-side game sessions", function=lambda: len(_sessions))
+Counter(
+    "high_society_game_log_written_total", "Finished games written to the game log",
+    function=lambda: _game_log.written if _game_log is not None else 0,
+)
+Counter(
+    "high_society_game_log_dropped_total", "Finished games dropped because the game log writer fell behind",
+    function=lambda: _game_log.dropped if _game_log is not None else 0,
+)
+Counter("high_society_decision_cache_hits_total", "Robot decisions answered from the cache", function=lambda: _decision_cache.hits)
+Counter("high_society_decision_cache_misses_total", "Robot decisions not in the cache", function=lambda: _decision_cache.misses)
+Gauge("high_society_decision_cache_entries", "Decisions held in the cache", function=lambda: len(_decision_cache))
+Gauge("high_society_decision_cache_hit_ratio", "Decision cache hits / lookups", function=lambda: _decision_cache.hit_rate)
+Counter(
+    "high_society_opening_book_hits_total", "Robot replies played from the opening book",
+    function=lambda: _opening_book.hits if _opening_book is not None else 0,
+)
+Counter(
+    "high_society_inference_batches_total", "Batched forward passes",
+    function=lambda: _batcher.batches if _batcher is not None else 0,
+)
+Counter(
+    "high_society_inference_decisions_total", "Robot decisions made by batched forward passes",
+    function=lambda: _batcher.decisions if _batcher is not None else 0,
+)
 
-def _get_weights() -> dict:
-    global _cached_weights
-    if _cached_weights is None:
-        _cached_weights = torch.load(str(_WEIGHTS_PATH), weights_only=True, map_location="cpu")
-    return _cached_weights
+# Keys this module stores in the ASGI scope
+_SCOPE_START = "high_society.start"
+_SCOPE_HANDLER_DONE = "high_society.handler_done"
 
 
-def _get_dqn_agent(player_id: int, num_players: int) -> DQNAgent:
-    key = (player_id, num_players)
-    if key not in _cached_agents:
-        env_tmp = DiscreteHighSocietyEnv(num_players=num_players)
-        agent = DQNAgent(
-            player_id=player_id,
-            num_actions=env_tmp.num_actions,
-            obs_space=env_tmp.observation_space("player_0"),
-            epsilon=0.0,
-        )
-        agent.q_net.load_state_dict(_get_weights())
-        _cached_agents[key] = agent
-    return _cached_agents[key]
+def _timed(phase):
+    """Decorator recording each call's duration under `phase`."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with phase.time():
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class _MetricsMiddleware:
+    """ASGI middleware tracking in-flight requests, request latency and the serialize phase."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        scope[_SCOPE_START] = start
+        status = 500
+
+        async def send_with_metrics(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                handler_done = scope.get(_SCOPE_HANDLER_DONE)
+                if handler_done is not None:
+                    _SERIALIZE.observe(time.perf_counter() - handler_done)
+            await send(message)
+
+        _IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            _IN_FLIGHT.dec()
+            # Label by route template, not raw path, to keep the label set small
+            route = scope.get("route")
+            _REQUEST_SECONDS.labels(getattr(route, "path", "unmatched"), status).observe(time.perf_counter() - start)
+
+# --- Shared DQN policy (loaded once per process) ---
+# Weights are read into NumPy so the server never imports torch. Observations
+# are padded to MAX_NUM_PLAYERS, so one read-only network serves every seat and
+# player count.
+_WEIGHTS_PATH = Path(os.environ.get(
+    "HIGH_SOCIETY_WEIGHTS",
+    Path(__file__).resolve().parents[2] / "experiments" / "results" / "pool" / "dqn_agent_v3.pth",
+))
+# Optional flat copy of the weights that every worker memory-maps, so N uvicorn
+# workers share one copy in the page cache. Written from _WEIGHTS_PATH if missing.
+_WEIGHTS_MMAP_PATH = os.environ.get("HIGH_SOCIETY_WEIGHTS_MMAP")
+# Optional socket of a shared inference process (app.backend.inference_server).
+# When set, workers don't load the weights for robot moves; their batcher evaluates there.
+_INFERENCE_SOCKET = os.environ.get("HIGH_SOCIETY_INFERENCE_SOCKET")
+_policy: NumpyQNetwork | RemotePolicy | None = None
+_dqn_robot: CachedAgent | NumpyDQNAgent | BatchedDQNAgent | None = None
+_policy_lock = threading.RLock()
+
+# Robot decisions from concurrent requests share one forward pass.
+# max_wait_ms bounds the extra latency a decision can pick up while a batch fills.
+_BATCHING = os.environ.get("HIGH_SOCIETY_INFERENCE_BATCHING", "1") != "0"
+_BATCH_MAX_SIZE = int(os.environ.get("HIGH_SOCIETY_BATCH_MAX_SIZE", 32))
+_BATCH_MAX_WAIT_MS = float(os.environ.get("HIGH_SOCIETY_BATCH_MAX_WAIT_MS", 2.0))
+_batcher: InferenceBatcher | None = None
+
+# The greedy robot is deterministic, so repeated positions (openings above all)
+# are answered from a cache of past decisions. 0 disables it.
+_DECISION_CACHE_SIZE = int(os.environ.get("HIGH_SOCIETY_DECISION_CACHE_SIZE", DEFAULT_MAX_ENTRIES))
+_decision_cache = DecisionCache(max_entries=_DECISION_CACHE_SIZE)
+
+# Robot replies for the first auction, built offline by scripts/build_opening_book.py.
+# Loaded during warm-up; ignored if it was built from other weights.
+_OPENING_BOOK_PATH = os.environ.get("HIGH_SOCIETY_OPENING_BOOK", str(_WEIGHTS_PATH.with_name("opening_book.json")))
+_opening_book: OpeningBook | None = None
+
+
+def _load_policy() -> NumpyQNetwork | RemotePolicy:
+    if _INFERENCE_SOCKET is not None:
+        return RemotePolicy(_INFERENCE_SOCKET)
+    if _WEIGHTS_MMAP_PATH is None:
+        return NumpyQNetwork.from_checkpoint(_WEIGHTS_PATH)
+
+    mmap_path = Path(_WEIGHTS_MMAP_PATH)
+    if not mmap_path.exists():
+        # Write under a per-process name and rename, so workers starting together never map a partial file
+        tmp_path = mmap_path.with_name(f"{mmap_path.name}.{os.getpid()}.tmp.npy")
+        NumpyQNetwork.from_checkpoint(_WEIGHTS_PATH).save_flat(tmp_path)
+        os.replace(f"{tmp_path}.json", f"{mmap_path}.json")
+        os.replace(tmp_path, mmap_path)
+    return NumpyQNetwork.load_flat(mmap_path)
+
+
+def _get_policy() -> NumpyQNetwork | RemotePolicy:
+    global _policy
+    if _policy is None:
+        with _policy_lock:
+            if _policy is None:
+                _policy = _load_policy()
+    return _policy
+
+
+def _get_batcher() -> InferenceBatcher:
+    global _batcher
+    if _batcher is None:
+        with _policy_lock:
+            if _batcher is None:
+                _batcher = InferenceBatcher(
+                    _get_policy(),
+                    max_batch_size=_BATCH_MAX_SIZE,
+                    max_wait_ms=_BATCH_MAX_WAIT_MS,
+                )
+    return _batcher
+
+
+def _get_dqn_agent() -> CachedAgent | NumpyDQNAgent | BatchedDQNAgent:
+    """The one DQN robot, shared by every seat (the greedy policy ignores player_id)."""
+    global _dqn_robot
+    if _dqn_robot is None:
+        if _BATCHING:
+            robot = BatchedDQNAgent(player_id=0, batcher=_get_batcher())
+        else:
+            robot = NumpyDQNAgent(player_id=0, q_net=_get_policy())
+        on_hit = _get_batcher().idle if _BATCHING else None
+        _dqn_robot = CachedAgent(robot, _decision_cache, on_hit) if _DECISION_CACHE_SIZE > 0 else robot
+    return _dqn_robot
+
+
+# Load the policy at import time so a pre-forking server (e.g. gunicorn --preload)
+# loads it once in the master and workers share the pages after fork.
+if os.environ.get("HIGH_SOCIETY_PRELOAD_POLICY", "0") == "1":
+    _get_policy()
 
 
 def _get_random_agent(player_id: int) -> DiscreteRandomPassAgent:
     return DiscreteRandomPassAgent(player_id=player_id, pass_probability=0.4)
 
 
+# --- Search robot: rollouts within a per-request latency budget ---
+# The budget covers all robot moves of a request and is split across them as they
+# come up; a move whose share runs out is the DQN's. Clients may ask for up to the max.
+ROBOT_TYPE_PATTERN = "^(dqn|random|search)$"
+_ROBOT_BUDGET_MS = float(os.environ.get("HIGH_SOCIETY_ROBOT_BUDGET_MS", 200))
+_MAX_ROBOT_BUDGET_MS = float(os.environ.get("HIGH_SOCIETY_MAX_ROBOT_BUDGET_MS", 2000))
+
+
+def _get_search_agent() -> AnytimeRolloutAgent:
+    """A search robot for one request (its RNG and scratch envs aren't thread-safe)."""
+    return AnytimeRolloutAgent(
+        fallback=_get_dqn_agent(),
+        rollout_agent=NumpyDQNAgent(player_id=0, q_net=_get_policy()),
+        make_env=_make_env,
+    )
+
+
+def _robot_turns_before_human(env: DiscreteHighSocietyEnv, human_idx: int) -> int:
+    """Robot seats still bidding between the seat to move and the human (at least 1)."""
+    players_to_bid = env.game_state.cur_round.players_to_bid
+    start = env.agents.index(env.agent_selection)
+    turns = 0
+    for i in range(env.num_players):
+        idx = (start + i) % env.num_players
+        if idx == human_idx:
+            break
+        turns += idx in players_to_bid
+    return max(turns, 1)
+
+
+class _RobotClock:
+    """A request's robot time budget, and what its robot moves spent."""
+
+    def __init__(self, budget_ms: float | None = None):
+        self.budget_ms = min(budget_ms if budget_ms is not None else _ROBOT_BUDGET_MS, _MAX_ROBOT_BUDGET_MS)
+        self.start = time.perf_counter()
+        self.deadline = self.start + self.budget_ms / 1000
+        self.turns = 0
+        self.rollouts = 0
+        self.fallbacks = 0
+
+    def turn_deadline(self, env: DiscreteHighSocietyEnv, human_idx: int) -> float:
+        """This move's share of the time left."""
+        now = time.perf_counter()
+        return now + max(self.deadline - now, 0.0) / _robot_turns_before_human(env, human_idx)
+
+    @property
+    def used_ms(self) -> float:
+        return (time.perf_counter() - self.start) * 1000
+
+    def timing(self) -> RobotTiming:
+        return RobotTiming(
+            budget_ms=self.budget_ms,
+            used_ms=round(self.used_ms, 3),
+            turns=self.turns,
+            rollouts=self.rollouts,
+            fallbacks=self.fallbacks,
+        )
+
+
 def _describe_action(player_name: str, action: int) -> str:
     if action == ACTION_PASS:
         return f"{player_name} passed"
@@ -74,12 +339,8 @@ def _build_players(env: DiscreteHighSocietyEnv, human_idx: int = 0) -> list[Play
     return players
 
 
-def _build_response(
-    env: DiscreteHighSocietyEnv,
-    current_agent_idx: int,
-    action_log: list[ActionLogEntry],
-    human_idx: int = 0,
-) -> GameResponse:
+def _game_outcome(env: DiscreteHighSocietyEnv) -> tuple[bool, int | None, list[int]]:
+    """Returns (game_over, winner_idx, eliminated_indices)."""
     game_over = all(env.terminations.values())
 
     winner_idx = None
@@ -96,11 +357,27 @@ def _build_response(
                 max_prestige = p.total_prestige
                 winner_idx = idx
 
-    action_mask: list[bool] = []
-    if not game_over:
-        agent_name = env.agents[current_agent_idx]
-        mask = env.get_action_mask(agent_name)
-        action_mask = mask.tolist()
+    return game_over, winner_idx, eliminated_indices
+
+
+@_timed(_MASK)
+def _build_action_mask(env: DiscreteHighSocietyEnv, current_agent_idx: int, game_over: bool) -> list[bool]:
+    if game_over:
+        return []
+    agent_name = env.agents[current_agent_idx]
+    return env.get_action_mask(agent_name).tolist()
+
+
+@_timed(_BUILD_RESPONSE)
+def _build_response(
+    env: DiscreteHighSocietyEnv,
+    current_agent_idx: int,
+    action_log: list[ActionLogEntry],
+    human_idx: int = 0,
+    robot_timing: RobotTiming | None = None,
+) -> GameResponse:
+    game_over, winner_idx, eliminated_indices = _game_outcome(env)
+    action_mask = _build_action_mask(env, current_agent_idx, game_over)
 
     return GameResponse(
         game_state=env.game_state,
@@ -111,96 +388,723 @@ def _build_response(
         winner_idx=winner_idx,
         eliminated_indices=eliminated_indices,
         players=_build_players(env, human_idx),
+        robot_timing=robot_timing,
+    )
+
+
+def _build_auction_info(env: DiscreteHighSocietyEnv) -> AuctionInfo | None:
+    auction = env.game_state.cur_round
+    if auction is None:
+        return None
+    return AuctionInfo(
+        num=auction.num,
+        card=auction.card,
+        cur_bid=auction.cur_bid,
+        cur_bidder_idx=auction.cur_bidder_idx,
     )
 
 
+@_timed(_BUILD_RESPONSE)
+def _build_session_response(
+    session: GameSession,
+    current_agent_idx: int,
+    action_log: list[ActionLogEntry],
+    robot_timing: RobotTiming | None = None,
+) -> SessionGameResponse:
+    env = session.env
+    game_over, winner_idx, eliminated_indices = _game_outcome(env)
+    action_mask = _build_action_mask(env, current_agent_idx, game_over)
+
+    session.version += 1
+    session.action_log.extend(action_log)
+    session.actions.extend(entry.action for entry in action_log)
+
+    response = SessionGameResponse(
+        session_id=session.session_id,
+        version=session.version,
+        current_agent_idx=current_agent_idx,
+        action_mask=action_mask,
+        action_log=action_log,
+        game_over=game_over,
+        winner_idx=winner_idx,
+        eliminated_indices=eliminated_indices,
+        players=_build_players(env, session.human_idx),
+        auction=_build_auction_info(env),
+        remaining_special_cards=env.game_state.remaining_special_cards,
+        robot_timing=robot_timing,
+    )
+    record_snapshot(session.snapshots, response, len(session.action_log))
+    return response
+
+
+def _apply_human_action(env: DiscreteHighSocietyEnv, action: int):
+    """Validate the human's action against the mask and play it."""
+    agent_name = env.agent_selection
+    with _MASK.time():
+        mask = env.get_action_mask(agent_name)
+    if action < 0 or action >= len(mask) or not mask[action]:
+        raise HTTPException(status_code=422, detail=f"Invalid action {action}")
+
+    env.step(action)
+
+
+def _current_agent_idx(env: DiscreteHighSocietyEnv) -> int:
+    if all(env.terminations.values()):
+        return 0  # game over, doesn't matter
+    return env.agents.index(env.agent_selection)
+
+
+def _iter_robot_turns(
+    env: DiscreteHighSocietyEnv,
+    human_idx: int,
+    robot_type: str,
+    num_players: int,
+    cancel: threading.Event | None = None,
+    clock: _RobotClock | None = None,
+) -> Iterator[ActionLogEntry]:
+    """Play robot turns until it's the human's turn or game over, yielding each move after it is played.
+
+    Search robots share `clock`'s budget; every robot type's moves are counted on it.
+    Raises WorkCancelled between moves once `cancel` is set.
+    """
+    clock = clock if clock is not None else _RobotClock()
+    search = _get_search_agent() if robot_type == "search" else None
+    # Let the batcher wait for this request's decisions while it plays robot turns
+    batcher = _get_batcher() if robot_type == "dqn" and _BATCHING else None
+    # Replies to the human's first move are played from the opening book when it has them
+    book = _opening_book if robot_type == "dqn" and human_idx == HUMAN_IDX else None
+    book_line = iter((book.lookup(env) if book is not None else None) or ())
+    turns = 0
+    try:
+        with batcher.caller() if batcher is not None else nullcontext():
+            while not all(env.terminations.values()):
+                agent_name = env.agent_selection
+                agent_idx = env.agents.index(agent_name)
+
+                if agent_idx == human_idx:
+                    break
+                if cancel is not None and cancel.is_set():
+                    raise WorkCancelled("Client disconnected during robot turns")
+
+                with _MASK.time():
+                    mask = env.get_action_mask(agent_name)
+                action = next(book_line, None)
+                if action is not None and mask[action] and batcher is not None:
+                    batcher.idle()
+                if action is None or not mask[action]:
+                    book_line = iter(())
+                    with _ROBOT_INFERENCE.time():
+                        if search is not None:
+                            result = search.search(env, clock.turn_deadline(env, human_idx))
+                            action = result.action
+                            clock.rollouts += result.rollouts
+                            clock.fallbacks += not result.completed
+                        else:
+                            obs = cat_dict_array(env.observe(agent_name))
+                            if robot_type == "dqn":
+                                robot = _get_dqn_agent()
+                            else:
+                                robot = _get_random_agent(agent_idx)
+                            action, _ = robot.get_action(obs, mask)
+
+                desc = _describe_action(agent_name, action)
+                env.step(action)
+
+                turns += 1
+                clock.turns += 1
+                yield ActionLogEntry(player_name=agent_name, action=action, description=desc)
+    finally:
+        _ROBOT_TURNS.observe(turns)
+        if search is not None and turns:
+            _ROBOT_BUDGET_USED.observe(clock.used_ms / clock.budget_ms if clock.budget_ms else 0.0)
+
+
 def _run_robot_turns(
     env: DiscreteHighSocietyEnv,
     human_idx: int,
     robot_type: str,
     num_players: int,
+    cancel: threading.Event | None = None,
+    clock: _RobotClock | None = None,
 ) -> tuple[int, list[ActionLogEntry]]:
     """Run robot turns until it's the human's turn or game over.
 
     Returns (current_agent_idx, action_log).
     """
-    log: list[ActionLogEntry] = []
+    log = list(_iter_robot_turns(env, human_idx, robot_type, num_players, cancel, clock))
+    return _current_agent_idx(env), log
 
-    while not all(env.terminations.values()):
-        agent_name = env.agent_selection
-        agent_idx = env.agents.index(agent_name)
 
-        if agent_idx == human_idx:
-            break
+# --- Offloading: game work runs on a bounded executor, not the event loop ---
+_robot_executor = RobotExecutor(
+    max_workers=int(os.environ.get("HIGH_SOCIETY_ROBOT_WORKERS", 8)),
+    max_queue=int(os.environ.get("HIGH_SOCIETY_ROBOT_QUEUE", 64)),
+)
+_DISCONNECT_POLL_S = 0.05
 
-        obs = cat_dict_array(env.observe(agent_name))
-        mask = env.get_action_mask(agent_name)
 
-        if robot_type == "dqn":
-            robot = _get_dqn_agent(agent_idx, num_players)
-        else:
-            robot = _get_random_agent(agent_idx)
+async def _offload(request: Request, fn: Callable[..., T], *args) -> T:
+    """Run fn(*args, cancel=...) on the robot executor, cancelling it if the client goes away."""
+    start = request.scope.get(_SCOPE_START)
+    if start is not None:
+        _PARSE.observe(time.perf_counter() - start)
 
-        action, _ = robot.get_action(obs, mask)
-        desc = _describe_action(agent_name, action)
-        log.append(ActionLogEntry(player_name=agent_name, action=action, description=desc))
+    cancel = threading.Event()
+    work = asyncio.ensure_future(_robot_executor.run(fn, *args, cancel=cancel))
+    while True:
+        done, _ = await asyncio.wait({work}, timeout=_DISCONNECT_POLL_S)
+        if done:
+            result = work.result()
+            if isinstance(result, BaseModel):
+                # Serialized after the handler returns; the middleware times that.
+                # Rendered responses were serialized on the executor, and the
+                # streaming routes get back a game to stream, not a body
+                request.scope[_SCOPE_HANDLER_DONE] = time.perf_counter()
+            return result
+        if not cancel.is_set() and await request.is_disconnected():
+            cancel.set()
 
-        env.step(action)
 
-    if all(env.terminations.values()):
-        current_idx = 0  # game over, doesn't matter
-    else:
-        current_idx = env.agents.index(env.agent_selection)
+class _ModelJSONResponse(Response):
+    """A response model encoded straight to JSON bytes by its compiled pydantic serializer."""
+    media_type = "application/json"
+
+    def render(self, content: BaseModel) -> bytes:
+        return content.__pydantic_serializer__.to_json(content)
 
-    return current_idx, log
+
+def _rendered(fn: Callable[..., BaseModel]) -> Callable[..., _ModelJSONResponse]:
+    """Wrap a game function to return its response already encoded.
+
+    Encoding then happens on the robot executor, not the event loop, and skips
+    FastAPI re-checking the model it was just given. Routes using this declare
+    `response_model` for the docs.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs) -> _ModelJSONResponse:
+        result = fn(*args, **kwargs)
+        with _SERIALIZE.time():
+            return _ModelJSONResponse(result)
+    return wrapper
+
+
+# --- Startup warm-up: build everything a first request would otherwise pay for ---
+MIN_NUM_PLAYERS = 3
+_WARMUP = os.environ.get("HIGH_SOCIETY_WARMUP", "1") != "0"
+_env_templates: dict[int, DiscreteHighSocietyEnv] = {}
+_ready = threading.Event()
+_warmup_error: str | None = None
+
+
+def _make_env(num_players: int) -> DiscreteHighSocietyEnv:
+    """A new env for `num_players`, copied from a template so its spaces are not rebuilt.
+
+    Callers must reset() or restore_from_state() it; both replace all game state.
+    """
+    template = _env_templates.get(num_players)
+    if template is None:
+        template = _env_templates.setdefault(num_players, DiscreteHighSocietyEnv(num_players=num_players))
+    return copy.copy(template)
+
+
+def _warm_up():
+    """Pre-build env templates, load the policy and opening book and run the policy once per batch size."""
+    global _warmup_error, _opening_book
+    try:
+        for num_players in range(MIN_NUM_PLAYERS, MAX_NUM_PLAYERS + 1):
+            env = _make_env(num_players)
+            env.reset(num_players=num_players)
+            obs = cat_dict_array(env.observe(env.agent_selection))
+            mask = env.get_action_mask(env.agent_selection)
+
+        policy = _get_policy()
+        for batch_size in sorted({1, _BATCH_MAX_SIZE}):
+            policy(np.zeros((batch_size, policy.obs_dim), dtype=np.float32))
+
+        # Goes through the batcher (and starts its worker thread) when batching is on
+        _get_dqn_agent().get_action(obs, mask)
+
+        _opening_book = OpeningBook.load(_OPENING_BOOK_PATH, _WEIGHTS_PATH)
+    except Exception as e:
+        _warmup_error = f"{type(e).__name__}: {e}"
+        return
+    _warmup_error = None
+    _ready.set()
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    global _game_log
+    if _WARMUP:
+        await asyncio.to_thread(_warm_up)
+    else:
+        _ready.set()
+    yield
+    _simulator.shutdown()
+    if _game_log is not None:
+        await asyncio.to_thread(_game_log.close)
+        _game_log = None
 
 
 # --- FastAPI app ---
-app = FastAPI(title="High Society RL")
+app = FastAPI(title="High Society RL", lifespan=_lifespan)
+app.add_middleware(_MetricsMiddleware)
 
 
-@app.get("/api/new-game")
-def new_game(
-    num_players: int = Query(default=4, ge=3, le=5),
-    robot_type: str = Query(default="dqn", pattern="^(dqn|random)$"),
-) -> GameResponse:
-    env = DiscreteHighSocietyEnv(num_players=num_players)
-    env.reset(num_players=num_players)
+@app.exception_handler(ExecutorOverloaded)
+async def _overloaded_handler(request: Request, exc: ExecutorOverloaded) -> JSONResponse:
+    return JSONResponse(status_code=503, content={"detail": "Server busy, try again"}, headers={"Retry-After": "1"})
+
+
+@app.exception_handler(WorkCancelled)
+async def _cancelled_handler(request: Request, exc: WorkCancelled) -> JSONResponse:
+    # Nobody is listening any more; the status is only for logs
+    return JSONResponse(status_code=499, content={"detail": str(exc)})
+
+
+@app.get("/api/health")
+async def health() -> dict:
+    """Liveness: the process is up and serving."""
+    return {
+        "status": "ok",
+        "decision_cache": _decision_cache.stats(),
+        "opening_book_hits": _opening_book.hits if _opening_book is not None else None,
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/api/ready")
+async def ready() -> JSONResponse:
+    """Readiness: warm-up finished, so requests will not pay for cold starts."""
+    if _ready.is_set():
+        return JSONResponse({"status": "ready"})
+    if _warmup_error is not None:
+        return JSONResponse(status_code=503, content={"status": "failed", "detail": _warmup_error})
+    return JSONResponse(status_code=503, content={"status": "starting"})
+
+
+def _new_game(num_players: int, robot_type: str, budget_ms: float | None, cancel: threading.Event) -> GameResponse:
+    with _RESTORE.time():
+        env = _make_env(num_players)
+        env.reset(num_players=num_players)
 
     human_idx = 0
 
     # Run robot turns if human isn't first
-    current_idx, log = _run_robot_turns(env, human_idx, robot_type, num_players)
+    clock = _RobotClock(budget_ms)
+    current_idx, log = _run_robot_turns(env, human_idx, robot_type, num_players, cancel, clock)
 
-    return _build_response(env, current_idx, log, human_idx)
+    return _build_response(env, current_idx, log, human_idx, clock.timing())
 
 
-@app.post("/api/action")
-def submit_action(req: ActionRequest) -> GameResponse:
+@app.get("/api/new-game", response_model=GameResponse)
+async def new_game(
+    request: Request,
+    num_players: int = Query(default=4, ge=3, le=5),
+    robot_type: str = Query(default="dqn", pattern=ROBOT_TYPE_PATTERN),
+    budget_ms: float | None = Query(default=None, gt=0, description="Robot time budget per request (search robots)"),
+) -> Response:
+    return await _offload(request, _rendered(_new_game), num_players, robot_type, budget_ms)
+
+
+def _prepare_action(req: ActionRequest, cancel: threading.Event) -> DiscreteHighSocietyEnv:
+    """Restore the client's state and play the human's action."""
     num_players = len(req.game_state.player_states)
     if not 3 <= num_players <= 5:
         raise HTTPException(status_code=422, detail="num_players must be 3-5")
 
     try:
-        env = DiscreteHighSocietyEnv(num_players=num_players)
-        env.restore_from_state(req.game_state, req.current_agent_idx)
+        with _RESTORE.time():
+            check_game_state(req.game_state, req.current_agent_idx)
+            env = _make_env(num_players)
+            env.restore_from_state(req.game_state, req.current_agent_idx)
+    except InvalidGameState as e:
+        raise HTTPException(status_code=422, detail=f"Invalid game state: {e}")
     except Exception as e:
         raise HTTPException(status_code=422, detail=f"Failed to restore game state: {e}")
 
-    # Validate action
-    agent_name = env.agent_selection
-    mask = env.get_action_mask(agent_name)
-    if req.action < 0 or req.action >= len(mask) or not mask[req.action]:
-        raise HTTPException(status_code=422, detail=f"Invalid action {req.action}")
+    _apply_human_action(env, req.action)
+    return env
+
+
+def _submit_action(req: ActionRequest, cancel: threading.Event) -> GameResponse:
+    env = _prepare_action(req, cancel)
+
+    human_idx = 0
+    clock = _RobotClock(req.budget_ms)
+    current_idx, log = _run_robot_turns(env, human_idx, req.robot_type, env.num_players, cancel, clock)
+
+    return _build_response(env, current_idx, log, human_idx, clock.timing())
+
+
+# The action endpoints parse the raw body themselves (see fast_restore), so the
+# request schema is declared by hand for the OpenAPI docs.
+_ACTION_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": {"$ref": "#/components/schemas/ActionRequest"}}},
+    },
+}
+
+
+@app.post("/api/action", response_model=GameResponse, openapi_extra=_ACTION_REQUEST_BODY)
+async def submit_action(request: Request) -> Response:
+    req = parse_action_request(await request.body())
+    return await _offload(request, _rendered(_submit_action), req)
+
+
+# --- Token API: the game travels in a signed token, so any worker can serve any move ---
+# Every worker must share HIGH_SOCIETY_TOKEN_SECRET to accept each other's tokens
+_token_signer = TokenSigner(load_secret())
+
+
+@_timed(_BUILD_RESPONSE)
+def _build_token_response(
+    env: DiscreteHighSocietyEnv,
+    current_agent_idx: int,
+    action_log: list[ActionLogEntry],
+    robot_type: str,
+    robot_timing: RobotTiming | None = None,
+) -> TokenGameResponse:
+    game_over, winner_idx, eliminated_indices = _game_outcome(env)
+    action_mask = _build_action_mask(env, current_agent_idx, game_over)
+    token = None if game_over else _token_signer.dumps(env.game_state, current_agent_idx, robot_type)
+
+    return TokenGameResponse(
+        token=token,
+        current_agent_idx=current_agent_idx,
+        action_mask=action_mask,
+        action_log=action_log,
+        game_over=game_over,
+        winner_idx=winner_idx,
+        eliminated_indices=eliminated_indices,
+        players=_build_players(env),
+        auction=_build_auction_info(env),
+        remaining_special_cards=env.game_state.remaining_special_cards,
+        robot_timing=robot_timing,
+    )
+
+
+def _new_token_game(num_players: int, robot_type: str, budget_ms: float | None, cancel: threading.Event) -> TokenGameResponse:
+    with _RESTORE.time():
+        env = _make_env(num_players)
+        env.reset(num_players=num_players)
+
+    clock = _RobotClock(budget_ms)
+    current_idx, log = _run_robot_turns(env, 0, robot_type, num_players, cancel, clock)
+    return _build_token_response(env, current_idx, log, robot_type, clock.timing())
+
+
+@app.get("/api/token/new-game", response_model=TokenGameResponse)
+async def new_token_game(
+    request: Request,
+    num_players: int = Query(default=4, ge=3, le=5),
+    robot_type: str = Query(default="dqn", pattern=ROBOT_TYPE_PATTERN),
+    budget_ms: float | None = Query(default=None, gt=0, description="Robot time budget per request (search robots)"),
+) -> Response:
+    return await _offload(request, _rendered(_new_token_game), num_players, robot_type, budget_ms)
+
+
+def _submit_token_action(req: TokenActionRequest, cancel: threading.Event) -> TokenGameResponse:
+    # A token that verifies was issued by us, so the state checks of /api/action are skipped
+    with _RESTORE.time():
+        try:
+            game_state, current_agent_idx, robot_type = _token_signer.loads(req.token)
+        except InvalidToken as e:
+            raise HTTPException(status_code=400, detail=f"Invalid token: {e}")
+        env = _make_env(len(game_state.player_states))
+        env.restore_from_state(game_state, current_agent_idx)
+
+    _apply_human_action(env, req.action)
+    clock = _RobotClock(req.budget_ms)
+    current_idx, log = _run_robot_turns(env, 0, robot_type, env.num_players, cancel, clock)
+    return _build_token_response(env, current_idx, log, robot_type, clock.timing())
+
+
+@app.post("/api/token/action", response_model=TokenGameResponse)
+async def submit_token_action(request: Request, req: TokenActionRequest) -> Response:
+    """Like /api/action, but the client sends back the token instead of the whole game state."""
+    return await _offload(request, _rendered(_submit_token_action), req)
+
+
+# --- Session API: the server keeps the env, the client only sends actions ---
+_sessions = SessionStore(
+    max_sessions=int(os.environ.get("HIGH_SOCIETY_MAX_SESSIONS", DEFAULT_MAX_SESSIONS)),
+    ttl_seconds=float(os.environ.get("HIGH_SOCIETY_SESSION_TTL", DEFAULT_TTL_SECONDS)),
+)
+
+
+# Finished session games are appended to a per-process log under this directory
+# (see high_society.game_log). Unset disables recording.
+_GAME_LOG_DIR = os.environ.get("HIGH_SOCIETY_GAME_LOG_DIR")
+_game_log: GameLogWriter | None = None
+_game_log_lock = threading.Lock()
+
 
-    env.step(req.action)
+def _get_game_log() -> GameLogWriter | None:
+    global _game_log
+    if _game_log is None and _GAME_LOG_DIR is not None:
+        with _game_log_lock:
+            if _game_log is None:
+                _game_log = GameLogWriter(Path(_GAME_LOG_DIR) / f"games-{os.getpid()}.log")
+    return _game_log
 
+
+def _record_session_game(session: GameSession, winner_idx: int | None):
+    game_log = _get_game_log()
+    if game_log is not None:
+        game_log.append(GameRecord(
+            num_players=session.env.num_players,
+            deck=session.deck,
+            actions=session.actions,
+            winner_idx=winner_idx,
+            human_idx=session.human_idx,
+            robot_type=session.robot_type,
+        ))
+
+
+def _apply_session_action(session: GameSession, action: int):
+    _apply_human_action(session.env, action)
+    session.actions.append(action)
+
+
+@contextmanager
+def _locked_session(session: GameSession):
+    """Hold the session's lock; a game whose client disconnected mid robot turns is dropped."""
+    with session.lock:
+        try:
+            yield session
+        except WorkCancelled:
+            _sessions.remove(session.session_id)
+            raise
+
+
+def _new_session_game(
+    num_players: int, robot_type: str, budget_ms: float | None, cancel: threading.Event,
+) -> SessionGameResponse:
+    with _RESTORE.time():
+        env = _make_env(num_players)
+        env.reset(num_players=num_players)
+    session = _sessions.create(env, robot_type)
+    session.robot_budget_ms = budget_ms
+    session.deck = deck_in_draw_order(env)
+
+    with _locked_session(session):
+        clock = _RobotClock(budget_ms)
+        current_idx, log = _run_robot_turns(env, session.human_idx, robot_type, num_players, cancel, clock)
+        return _build_session_response(session, current_idx, log, clock.timing())
+
+
+@app.get("/api/session/new-game", response_model=SessionGameResponse)
+async def new_session_game(
+    request: Request,
+    num_players: int = Query(default=4, ge=3, le=5),
+    robot_type: str = Query(default="dqn", pattern=ROBOT_TYPE_PATTERN),
+    budget_ms: float | None = Query(default=None, gt=0, description="Robot time budget per request (search robots)"),
+) -> Response:
+    return await _offload(request, _rendered(_new_session_game), num_players, robot_type, budget_ms)
+
+
+def _play_session_action(session: GameSession, action: int, cancel: threading.Event) -> SessionGameResponse:
+    """Play the human's action and the robot replies. Caller holds session.lock."""
+    env = session.env
+    if all(env.terminations.values()):
+        raise HTTPException(status_code=409, detail="Game is over")
+    _apply_session_action(session, action)
+    clock = _RobotClock(session.robot_budget_ms)
+    current_idx, log = _run_robot_turns(env, session.human_idx, session.robot_type, env.num_players, cancel, clock)
+    response = _build_session_response(session, current_idx, log, clock.timing())
+    if response.game_over:
+        _record_session_game(session, response.winner_idx)
+    return response
+
+
+def _get_session(session_id: str) -> GameSession:
+    session = _sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired session")
+    return session
+
+
+def _submit_session_action(req: SessionActionRequest, cancel: threading.Event) -> SessionGameResponse:
+    session = _get_session(req.session_id)
+    with _locked_session(session):
+        response = _play_session_action(session, req.action, cancel)
+
+    if response.game_over:
+        _sessions.remove(session.session_id)
+    return response
+
+
+@app.post("/api/session/action", response_model=SessionGameResponse)
+async def submit_session_action(request: Request, req: SessionActionRequest) -> Response:
+    return await _offload(request, _rendered(_submit_session_action), req)
+
+
+def _submit_session_delta_action(req: SessionDeltaActionRequest, cancel: threading.Event) -> SessionDeltaResponse:
+    session = _get_session(req.session_id)
+    with _locked_session(session):
+        base = session.snapshots.get(req.known_version)
+        response = _play_session_action(session, req.action, cancel)
+        delta = build_delta_response(response, base, req.known_version, session.action_log)
+
+    if response.game_over:
+        _sessions.remove(session.session_id)
+    return delta
+
+
+@app.post("/api/session/delta-action", response_model=SessionDeltaResponse)
+async def submit_session_delta_action(request: Request, req: SessionDeltaActionRequest) -> Response:
+    """Like /api/session/action, but only returns what changed since `known_version`."""
+    return await _offload(request, _rendered(_submit_session_delta_action), req)
+
+
+# --- Streaming: robot moves are sent as Server-Sent Events as they happen ---
+# Event stream:
+#   event: state  the state right after the human's action
+#   event: move   one per robot move, with that move's log entry and the state after it
+#   event: done   it's the human's turn again or the game is over
+#   event: error  the robot turns failed partway
+Emit = Callable[[str, str], None]
+
+
+def _sse(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+async def _stream(fn: Callable[..., None], *args) -> AsyncIterator[str]:
+    """Run fn(*args, emit=..., cancel=...) on the robot executor and relay what it emits."""
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue[tuple[str, str]] = asyncio.Queue()
+
+    def emit(event: str, data: str):
+        loop.call_soon_threadsafe(events.put_nowait, (event, data))
+
+    cancel = threading.Event()
+    work = asyncio.ensure_future(_robot_executor.run(fn, *args, emit=emit, cancel=cancel))
+    try:
+        while not work.done() or not events.empty():
+            next_event = asyncio.ensure_future(events.get())
+            await asyncio.wait({next_event, work}, return_when=asyncio.FIRST_COMPLETED)
+            if next_event.done():
+                yield _sse(*next_event.result())
+            else:
+                next_event.cancel()
+
+        exc = work.exception()
+        if exc is None:
+            yield _sse("done", "{}")
+        else:
+            detail = exc.detail if isinstance(exc, HTTPException) else str(exc)
+            yield _sse("error", json.dumps({"detail": detail}))
+    finally:
+        # Starlette stops iterating when the client disconnects
+        cancel.set()
+
+
+def _event_stream(fn: Callable[..., None], *args) -> StreamingResponse:
+    # Reject up front: once streaming starts the status code is already 200
+    _robot_executor.check_capacity()
+    return StreamingResponse(
+        _stream(fn, *args),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _stream_robot_turns(
+    env: DiscreteHighSocietyEnv, robot_type: str, budget_ms: float | None, emit: Emit, cancel: threading.Event,
+):
     human_idx = 0
-    robot_type = req.robot_type
+    clock = _RobotClock(budget_ms)
+    emit("state", _build_response(env, _current_agent_idx(env), [], human_idx, clock.timing()).model_dump_json())
+    for entry in _iter_robot_turns(env, human_idx, robot_type, env.num_players, cancel, clock):
+        response = _build_response(env, _current_agent_idx(env), [entry], human_idx, clock.timing())
+        emit("move", response.model_dump_json())
+
+
+@app.post("/api/action/stream", openapi_extra=_ACTION_REQUEST_BODY)
+async def stream_action(request: Request) -> StreamingResponse:
+    """Like /api/action, but streams each robot move as soon as it is played."""
+    req = parse_action_request(await request.body())
+    env = await _offload(request, _prepare_action, req)
+    return _event_stream(_stream_robot_turns, env, req.robot_type, req.budget_ms)
+
+
+def _check_session_action(req: SessionActionRequest, cancel: threading.Event) -> GameSession:
+    session = _get_session(req.session_id)
+    with session.lock:
+        if all(session.env.terminations.values()):
+            raise HTTPException(status_code=409, detail="Game is over")
+        mask = session.env.get_action_mask(session.env.agent_selection)
+        if req.action < 0 or req.action >= len(mask) or not mask[req.action]:
+            raise HTTPException(status_code=422, detail=f"Invalid action {req.action}")
+    return session
+
+
+def _stream_session_action(session: GameSession, action: int, emit: Emit, cancel: threading.Event):
+    with _locked_session(session):
+        env = session.env
+        _apply_session_action(session, action)
+        clock = _RobotClock(session.robot_budget_ms)
+        emit("state", _build_session_response(session, _current_agent_idx(env), [], clock.timing()).model_dump_json())
+        for entry in _iter_robot_turns(env, session.human_idx, session.robot_type, env.num_players, cancel, clock):
+            response = _build_session_response(session, _current_agent_idx(env), [entry], clock.timing())
+            emit("move", response.model_dump_json())
+        if all(env.terminations.values()):
+            _record_session_game(session, _game_outcome(env)[1])
+
+    if all(env.terminations.values()):
+        _sessions.remove(session.session_id)
+
+
+@app.post("/api/session/stream-action")
+async def stream_session_action(request: Request, req: SessionActionRequest) -> StreamingResponse:
+    """Like /api/session/action, but streams each robot move as soon as it is played."""
+    session = await _offload(request, _check_session_action, req)
+    return _event_stream(_stream_session_action, session, req.action)
+
+
+# --- Batch simulation for analytics ---
+# Runs in its own process pool; by default half the cores, leaving the rest for serving games
+_simulator = SimulationRunner(
+    max_workers=int(os.environ.get("HIGH_SOCIETY_SIM_WORKERS", max(1, (os.cpu_count() or 1) // 2))),
+)
+
+
+@app.post("/api/simulate")
+async def simulate(req: SimulationRequest) -> SimulationResponse:
+    """Play `num_games` robot-only games with the given seats and report per-seat results.
+
+    Results are cached by configuration (and weights), so repeating a query is instant.
+    """
+    weights_path = None
+    weights_hash = None
+    if "dqn" in req.seats:
+        if not _WEIGHTS_PATH.exists():
+            raise HTTPException(status_code=503, detail="DQN weights are not available")
+        weights_path = str(_WEIGHTS_PATH)
+        weights_hash = await asyncio.to_thread(weights_sha256, weights_path)
+    return await _simulator.run(req, config_hash(req, weights_hash), weights_path)
+
+
+def _openapi() -> dict:
+    """FastAPI's schema plus ActionRequest, which no route declares as a parameter."""
+    if app.openapi_schema is None:
+        schema = FastAPI.openapi(app)
+        action_request = ActionRequest.model_json_schema(ref_template="#/components/schemas/{model}")
+        components = schema.setdefault("components", {}).setdefault("schemas", {})
+        for name, definition in action_request.pop("$defs", {}).items():
+            components.setdefault(name, definition)
+        components.setdefault("ActionRequest", action_request)
+    return app.openapi_schema
 
-    current_idx, log = _run_robot_turns(env, human_idx, robot_type, num_players)
 
-    return _build_response(env, current_idx, log, human_idx)
+app.openapi = _openapi
 
 
 # Serve frontend static files in production
@@ -0,0 +1,209 @@
+"""Minimal Prometheus metrics, rendered in the text exposition format.
+
+Counters, gauges and histograms with optional labels, without pulling in a
+client library. Recording is a lock plus a few integer updates, so it stays on
+in production. Gauges and counters can also be backed by a function that is
+read at scrape time, for values another object already tracks.
+"""
+import bisect
+import math
+from abc import ABC, abstractmethod
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans sub-millisecond phases up to slow whole requests
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, "_Metric"] = {}
+
+    def register(self, metric: "_Metric"):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _Metric(ABC):
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (), registry: Registry = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def labels(self, *values: str):
+        """The child for one combination of label values, created on first use."""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {values}")
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    @abstractmethod
+    def _new_child(self):
+        """The value object behind one combination of label values."""
+
+    def samples(self) -> list[str]:
+        lines = []
+        for key, child in list(self._children.items()):
+            lines.extend(self._child_samples(_format_labels(self.labelnames, key), child))
+        return lines
+
+    def _child_samples(self, labels: str, child) -> list[str]:
+        return [f"{self.name}{labels} {_format_value(child.get())}"]
+
+
+class _Value:
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float):
+        self._value = value
+
+    def get(self) -> float:
+        return self._value
+
+
+class _FunctionValue:
+    def __init__(self, function: Callable[[], float]):
+        self.function = function
+
+    def get(self) -> float:
+        return self.function()
+
+
+class _ScalarMetric(_Metric):
+    """A metric with one number per label combination, optionally read from `function`."""
+
+    def __init__(self, *args, function: Callable[[], float] | None = None, **kwargs):
+        self._function = function
+        super().__init__(*args, **kwargs)
+        if not self.labelnames:
+            self.labels()
+
+    def _new_child(self):
+        return _FunctionValue(self._function) if self._function is not None else _Value()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+
+class Counter(_ScalarMetric):
+    type = "counter"
+
+
+class Gauge(_ScalarMetric):
+    type = "gauge"
+
+    def dec(self, amount: float = 1.0):
+        self.labels().dec(amount)
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+
+class _HistogramValue:
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        # counts[i] is the number of observations in (buckets[i-1], buckets[i]]; the last is +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, *args, buckets: tuple[float, ...] = DEFAULT_BUCKETS, **kwargs):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(*args, **kwargs)
+        if not self.labelnames:
+            self.labels()
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+    def _child_samples(self, labels: str, child: _HistogramValue) -> list[str]:
+        with child._lock:
+            counts = list(child.counts)
+            total = child.sum
+        # Splice "le" into the child's labels
+        prefix = labels[:-1] + "," if labels else "{"
+        lines = []
+        cumulative = 0
+        for bound, count in zip((*self.buckets, math.inf), counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{prefix}le="{_format_value(bound)}"}} {cumulative}')
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
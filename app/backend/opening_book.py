@@ -0,0 +1,128 @@
+"""Precomputed robot replies for the first auction.
+
+Every game starts with identical hands and the human (seat 0) bidding first,
+so until the human's second move the position only depends on the player
+count, the first prestige card and the human's first action. The book maps
+each of those (3 player counts x 10 cards x 11 actions) to the robot moves
+that follow, up to the human's next turn or the end of the first auction.
+
+It is built offline with `scripts/build_opening_book.py` and stamped with the
+hash of the weights it was built from; a book for other weights is ignored.
+"""
+import hashlib
+import json
+import os
+
+from high_society.environments.discrete import (
+    ACTION_PASS,
+    MAX_NUM_PLAYERS,
+    MONEY_CARD_VALUES,
+    DiscreteHighSocietyEnv,
+    PrestigeCard,
+)
+from high_society.utils import cat_dict_array
+
+MIN_NUM_PLAYERS = 3
+HUMAN_IDX = 0
+
+# One of each distinct first card
+FIRST_CARDS = [
+    *[PrestigeCard(type="value", value=v) for v in range(1, 10)],
+    PrestigeCard(type="special", speciality="2x"),
+]
+
+
+def weights_sha256(path: str | os.PathLike) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _card_key(card: PrestigeCard) -> str:
+    return card.speciality if card.type == "special" else str(card.value)
+
+
+def _line_key(num_players: int, card: PrestigeCard, human_action: int) -> str:
+    return f"{num_players}/{_card_key(card)}/{human_action}"
+
+
+def _deck_starting_with(card: PrestigeCard) -> list[PrestigeCard]:
+    deck = [
+        *[PrestigeCard(type="value", value=v) for v in range(1, 10)],
+        *[PrestigeCard(type="special", speciality="2x") for _ in range(4)],
+    ]
+    deck.remove(card)
+    return [card, *deck]
+
+
+def human_first_action(env: DiscreteHighSocietyEnv) -> int | None:
+    """The human's first action if it is the only move played so far, else None."""
+    state = env.game_state
+    auction = state.cur_round
+    if auction is None or auction.num != 1 or any(env.terminations.values()):
+        return None
+    robots = [i for i in range(env.num_players) if i != HUMAN_IDX]
+    if env.agent_selection != env.agents[robots[0]]:
+        return None
+    # No robot has bid or passed yet
+    if any(auction.bids[i] or i not in auction.players_to_bid for i in robots):
+        return None
+
+    human_cards = auction.cards_in_bid[HUMAN_IDX]
+    if HUMAN_IDX not in auction.players_to_bid and not human_cards:
+        return ACTION_PASS
+    if len(human_cards) == 1:
+        return next(iter(human_cards))
+    return None
+
+
+def _robot_line(env: DiscreteHighSocietyEnv, robot) -> list[int]:
+    """Play robot moves until the human's turn or the first auction is over."""
+    actions = []
+    while not any(env.terminations.values()) and env.game_state.cur_round.num == 1:
+        agent_name = env.agent_selection
+        if env.agents.index(agent_name) == HUMAN_IDX:
+            break
+        action, _ = robot.get_action(cat_dict_array(env.observe(agent_name)), env.get_action_mask(agent_name))
+        actions.append(int(action))
+        env.step(action)
+    return actions
+
+
+def build_opening_book(robot, weights_hash: str) -> dict:
+    """Record `robot`'s replies to every first card and human first action."""
+    lines = {}
+    for num_players in range(MIN_NUM_PLAYERS, MAX_NUM_PLAYERS + 1):
+        env = DiscreteHighSocietyEnv(num_players=num_players)
+        for card in FIRST_CARDS:
+            for human_action in (ACTION_PASS, *MONEY_CARD_VALUES):
+                env.reset(num_players=num_players, options={"deck": _deck_starting_with(card)})
+                env.step(human_action)
+                lines[_line_key(num_players, card, human_action)] = _robot_line(env, robot)
+    return {"weights_sha256": weights_hash, "lines": lines}
+
+
+class OpeningBook:
+    def __init__(self, lines: dict[str, list[int]]):
+        self.lines = lines
+        self.hits = 0
+
+    @classmethod
+    def load(cls, path: str | os.PathLike, weights_path: str | os.PathLike) -> "OpeningBook | None":
+        """Load the book at `path`, or None if it is missing or was built for other weights."""
+        if not os.path.exists(path) or not os.path.exists(weights_path):
+            return None
+        with open(path) as f:
+            book = json.load(f)
+        if book.get("weights_sha256") != weights_sha256(weights_path):
+            return None
+        return cls(book["lines"])
+
+    def lookup(self, env: DiscreteHighSocietyEnv) -> list[int] | None:
+        """Booked robot moves for the current position, if it is a book position."""
+        human_action = human_first_action(env)
+        if human_action is None:
+            return None
+        line = self.lines.get(_line_key(env.num_players, env.game_state.cur_round.card, human_action))
+        if line is not None:
+            self.hits += 1
+        return line
@@ -1,6 +1,8 @@
-from pydantic import BaseModel
+from typing import Literal
 
-from high_society.environments.discrete import GameState
+from pydantic import BaseModel, Field, model_serializer
+
+from high_society.environments.discrete import GameState, PrestigeCard
 
 
 class NewGameParams(BaseModel):
@@ -13,6 +15,8 @@ class ActionRequest(BaseModel):
     current_agent_idx: int
     action: int
     robot_type: str = "dqn"
+    # Milliseconds for all robot moves of the request (search robots); the server default if None
+    budget_ms: float | None = Field(default=None, gt=0)
 
 
 class PlayerInfo(BaseModel):
@@ -32,6 +36,16 @@ class ActionLogEntry(BaseModel):
     description: str
 
 
+class RobotTiming(BaseModel):
+    """Time the request's robot moves took against their budget."""
+    budget_ms: float
+    used_ms: float
+    turns: int
+    # Search robots only: rollouts played, and moves left to the DQN because their time ran out
+    rollouts: int = 0
+    fallbacks: int = 0
+
+
 class GameResponse(BaseModel):
     game_state: GameState
     current_agent_idx: int
@@ -41,3 +55,129 @@ class GameResponse(BaseModel):
     winner_idx: int | None
     eliminated_indices: list[int]
     players: list[PlayerInfo]
+    robot_timing: RobotTiming | None = None
+
+
+class SessionActionRequest(BaseModel):
+    session_id: str
+    action: int
+
+
+class AuctionInfo(BaseModel):
+    num: int
+    card: PrestigeCard
+    cur_bid: int
+    cur_bidder_idx: int
+
+
+class SessionGameResponse(BaseModel):
+    session_id: str
+    version: int
+    current_agent_idx: int
+    action_mask: list[bool]
+    action_log: list[ActionLogEntry]
+    game_over: bool
+    winner_idx: int | None
+    eliminated_indices: list[int]
+    players: list[PlayerInfo]
+    auction: AuctionInfo | None
+    remaining_special_cards: int
+    robot_timing: RobotTiming | None = None
+
+
+class SessionDeltaActionRequest(BaseModel):
+    session_id: str
+    action: int
+    known_version: int
+
+
+class _OmitNoneFields(BaseModel):
+    """Leaves top-level None fields out of the JSON (nested models are dumped as usual)."""
+
+    @model_serializer(mode="wrap")
+    def _omit_none(self, handler):
+        return {key: value for key, value in handler(self).items() if value is not None}
+
+
+class PlayerDelta(_OmitNoneFields):
+    """Only the PlayerInfo fields that changed; unchanged ones are left out."""
+    player_idx: int
+    player_name: str | None = None
+    money_cards: list[int] | None = None
+    total_prestige: float | None = None
+    total_money: int | None = None
+    is_human: bool | None = None
+    current_bid: int | None = None
+    is_active_in_auction: bool | None = None
+
+
+class SessionDeltaResponse(_OmitNoneFields):
+    """Changes since `base_version`. Fields left out of the JSON are unchanged.
+
+    If the server no longer has the client's version, `base_version` is left
+    out and `full` carries the complete response instead, with the whole
+    session's action log. `winner_idx` is only present once the game is over
+    and somebody won. A None auction can't be sent as a change, so
+    `auction_cleared` is true when the auction went away.
+    """
+    session_id: str
+    version: int
+    base_version: int | None = None
+    current_agent_idx: int
+    action_mask: list[bool]
+    game_over: bool
+    new_log_entries: list[ActionLogEntry] | None = None
+    changed_players: list[PlayerDelta] | None = None
+    auction: AuctionInfo | None = None
+    auction_cleared: bool | None = None
+    remaining_special_cards: int | None = None
+    winner_idx: int | None = None
+    eliminated_indices: list[int] | None = None
+    robot_timing: RobotTiming | None = None
+    full: SessionGameResponse | None = None
+
+
+class TokenActionRequest(BaseModel):
+    token: str
+    action: int
+    # Milliseconds for all robot moves of the request (search robots); the server default if None
+    budget_ms: float | None = Field(default=None, gt=0)
+
+
+class TokenGameResponse(BaseModel):
+    """`token` carries the game to the next action; it is None once the game is over."""
+    token: str | None
+    current_agent_idx: int
+    action_mask: list[bool]
+    action_log: list[ActionLogEntry]
+    game_over: bool
+    winner_idx: int | None
+    eliminated_indices: list[int]
+    players: list[PlayerInfo]
+    auction: AuctionInfo | None
+    remaining_special_cards: int
+    robot_timing: RobotTiming | None = None
+
+
+class SimulationRequest(BaseModel):
+    """Robot type per seat (3-5 seats) and how many games to play."""
+    seats: list[Literal["dqn", "random"]] = Field(min_length=3, max_length=5)
+    num_games: int = Field(default=1000, ge=1, le=100_000)
+    seed: int = 0
+
+
+class SeatStats(BaseModel):
+    seat: int
+    robot_type: str
+    win_rate: float
+    mean_prestige: float
+    elimination_rate: float
+
+
+class SimulationResponse(BaseModel):
+    num_games: int
+    seats: list[SeatStats]
+    # Games where every player left was eliminated
+    no_winner_rate: float
+    elapsed_s: float
+    cached: bool = False
@@ -0,0 +1,99 @@
+"""In-memory store of live games for the session API.
+
+Instead of round-tripping the full GameState on every move, the server keeps
+the env and the client only sends `{session_id, action}`. The store is
+bounded: sessions expire after a TTL of inactivity, and when it is full the
+least recently used session is evicted.
+"""
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from high_society.environments.discrete import DiscreteHighSocietyEnv, PrestigeCard
+
+DEFAULT_MAX_SESSIONS = 10_000
+DEFAULT_TTL_SECONDS = 60 * 60
+
+
+@dataclass
+class GameSession:
+    session_id: str
+    env: DiscreteHighSocietyEnv
+    robot_type: str
+    human_idx: int = 0
+    # Robot time budget per request in ms (search robots); None uses the server default
+    robot_budget_ms: float | None = None
+    # For the game log: the deck in draw order and every seat's actions so far
+    deck: list[PrestigeCard] = field(default_factory=list)
+    actions: list[int] = field(default_factory=list)
+    last_access: float = 0.0
+    # Bumped on every response; the client reports it back to get deltas
+    version: int = 0
+    action_log: list = field(default_factory=list)
+    snapshots: OrderedDict[int, Any] = field(default_factory=OrderedDict)
+    # Serializes moves on the same game; the store lock only guards the index
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class SessionStore:
+    """Thread-safe LRU of GameSessions with a time-to-live."""
+
+    def __init__(
+        self,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._sessions: OrderedDict[str, GameSession] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def create(self, env: DiscreteHighSocietyEnv, robot_type: str, human_idx: int = 0) -> GameSession:
+        session = GameSession(
+            session_id=secrets.token_urlsafe(16),
+            env=env,
+            robot_type=robot_type,
+            human_idx=human_idx,
+            last_access=self.clock(),
+        )
+        with self._lock:
+            self._evict_expired()
+            while len(self._sessions) >= self.max_sessions:
+                self._sessions.popitem(last=False)
+            self._sessions[session.session_id] = session
+        return session
+
+    def get(self, session_id: str) -> GameSession | None:
+        """Return the live session and mark it as recently used, or None if unknown or expired."""
+        now = self.clock()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            if now - session.last_access > self.ttl_seconds:
+                del self._sessions[session_id]
+                return None
+            session.last_access = now
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def remove(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def _evict_expired(self):
+        # Sessions are ordered by last access, so expired ones are at the front
+        now = self.clock()
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if now - oldest.last_access <= self.ttl_seconds:
+                break
+            self._sessions.popitem(last=False)
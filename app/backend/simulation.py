@@ -0,0 +1,188 @@
+"""Batch game simulation for win-rate tables.
+
+Games run in a process pool, chunked so every worker stays busy, with the
+same torch-free robots the API plays against. Each game is seeded from the
+request seed, so a configuration always produces the same result and results
+are cached by a hash of the configuration (and the DQN weights, if used).
+"""
+import asyncio
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from high_society.agents import DiscreteRandomPassAgent
+from high_society.environments.discrete import DiscreteHighSocietyEnv
+from high_society.numpy_policy import NumpyDQNAgent, NumpyQNetwork
+from high_society.utils import cat_dict_array
+
+from .schemas import SeatStats, SimulationRequest, SimulationResponse
+
+MAX_STEPS = 1000
+# Games per task: big enough to amortize the round trip, small enough to balance
+MIN_CHUNK_SIZE = 25
+MAX_CACHED_RESULTS = 256
+
+
+@dataclass
+class SeatTotals:
+    """Per-seat sums over a batch of games, merged across chunks."""
+    wins: np.ndarray
+    prestige: np.ndarray
+    eliminations: np.ndarray
+    games: int = 0
+    no_winner: int = 0
+
+    @classmethod
+    def zeros(cls, num_seats: int) -> "SeatTotals":
+        return cls(np.zeros(num_seats), np.zeros(num_seats), np.zeros(num_seats))
+
+    def merge(self, other: "SeatTotals"):
+        self.wins += other.wins
+        self.prestige += other.prestige
+        self.eliminations += other.eliminations
+        self.games += other.games
+        self.no_winner += other.no_winner
+
+
+# --- Worker side ---
+_worker_q_nets: dict[str, NumpyQNetwork] = {}
+
+
+def _make_robot(robot_type: str, seat: int, game_seed: int, weights_path: str | None):
+    if robot_type == "dqn":
+        if weights_path not in _worker_q_nets:
+            _worker_q_nets[weights_path] = NumpyQNetwork.from_checkpoint(weights_path)
+        return NumpyDQNAgent(player_id=seat, q_net=_worker_q_nets[weights_path])
+    # Same robot as the API's, seeded so results are reproducible
+    return DiscreteRandomPassAgent(player_id=seat, pass_probability=0.4, seed=game_seed * 8 + seat)
+
+
+def simulate_games(seats: list[str], seeds: list[int], weights_path: str | None) -> SeatTotals:
+    """Play one game per seed and sum up the per-seat outcomes."""
+    num_seats = len(seats)
+    env = DiscreteHighSocietyEnv(num_players=num_seats)
+    totals = SeatTotals.zeros(num_seats)
+
+    for game_seed in seeds:
+        robots = [_make_robot(robot_type, seat, game_seed, weights_path) for seat, robot_type in enumerate(seats)]
+        env.reset(num_players=num_seats, seed=game_seed)
+        for _ in range(MAX_STEPS):
+            if all(env.terminations.values()):
+                break
+            agent_name = env.agent_selection
+            seat = env.agents.index(agent_name)
+            obs = cat_dict_array(env.observe(agent_name))
+            action, _ = robots[seat].get_action(obs, env.get_action_mask(agent_name))
+            env.step(action)
+        else:
+            continue  # Hit the step limit; not counted
+
+        player_states = env.game_state.player_states
+        min_money = min(p.total_money for p in player_states.values())
+        winners = [seat for seat, agent in enumerate(env.agents) if env.rewards[agent] == 1.0]
+        for seat in range(num_seats):
+            totals.prestige[seat] += player_states[seat].total_prestige
+            totals.eliminations[seat] += player_states[seat].total_money == min_money
+        for seat in winners:
+            totals.wins[seat] += 1
+        totals.no_winner += not winners
+        totals.games += 1
+
+    return totals
+
+
+# --- Server side ---
+def config_hash(req: SimulationRequest, weights_sha256: str | None) -> str:
+    config = {"seats": req.seats, "num_games": req.num_games, "seed": req.seed, "weights": weights_sha256}
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()
+
+
+class SimulationRunner:
+    def __init__(self, max_workers: int | None = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._pool: ProcessPoolExecutor | None = None
+        self._results: OrderedDict[str, SimulationResponse] = OrderedDict()
+        # Identical requests that arrive while one is running wait for it instead of recomputing
+        self._running: dict[str, asyncio.Future] = {}
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Spawned, not forked: the server process has threads running
+            self._pool = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def cached(self, key: str) -> SimulationResponse | None:
+        result = self._results.get(key)
+        if result is not None:
+            self._results.move_to_end(key)
+        return result
+
+    async def run(self, req: SimulationRequest, key: str, weights_path: str | None) -> SimulationResponse:
+        result = self.cached(key)
+        if result is not None:
+            return result.model_copy(update={"cached": True})
+        if key in self._running:
+            return (await asyncio.shield(self._running[key])).model_copy(update={"cached": True})
+
+        future = asyncio.get_running_loop().create_future()
+        self._running[key] = future
+        try:
+            result = await self._simulate(req, weights_path)
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody else may be waiting; don't warn about an unretrieved exception
+            future.exception()
+            raise
+        finally:
+            del self._running[key]
+
+        future.set_result(result)
+        self._results[key] = result
+        while len(self._results) > MAX_CACHED_RESULTS:
+            self._results.popitem(last=False)
+        return result
+
+    async def _simulate(self, req: SimulationRequest, weights_path: str | None) -> SimulationResponse:
+        start = time.perf_counter()
+        seeds = [req.seed * 1_000_003 + i for i in range(req.num_games)]
+        chunk_size = max(MIN_CHUNK_SIZE, math.ceil(req.num_games / (self.max_workers * 4)))
+
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        chunks = await asyncio.gather(*(
+            loop.run_in_executor(pool, simulate_games, req.seats, seeds[i:i + chunk_size], weights_path)
+            for i in range(0, len(seeds), chunk_size)
+        ))
+
+        totals = SeatTotals.zeros(len(req.seats))
+        for chunk in chunks:
+            totals.merge(chunk)
+        games = max(totals.games, 1)
+        return SimulationResponse(
+            num_games=totals.games,
+            seats=[
+                SeatStats(
+                    seat=seat,
+                    robot_type=robot_type,
+                    win_rate=totals.wins[seat] / games,
+                    mean_prestige=totals.prestige[seat] / games,
+                    elimination_rate=totals.eliminations[seat] / games,
+                )
+                for seat, robot_type in enumerate(req.seats)
+            ],
+            no_winner_rate=totals.no_winner / games,
+            elapsed_s=time.perf_counter() - start,
+        )
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -1,13 +1,12 @@
 import itertools
 
 import numpy as np
-import torch
 from gymnasium import spaces
 
-from high_society.networks import build_mlp, build_discrete_mlp
 from high_society.utils import get_device
 
-device = get_device()
+# torch is imported inside the trainable agents so that the random agents
+# (and anything serving them) can be used without loading torch at all.
 
 
 class Agent:
@@ -83,9 +82,12 @@ class VanillaPGAgent(Agent):
     - > 0 = raise (env computes actual bid)
     """
 
-    def __init__(self, player_id: int, obs_space: spaces.Dict):
+    def __init__(self, player_id: int, obs_space: spaces.Dict, device: str | None = None):
+        import torch
+        from high_society.networks import build_mlp
+
         self.player_id = player_id
-        self.device = device
+        self.device = torch.device(device) if device is not None else get_device()
         obs_dim = sum(space.shape[0] for space in obs_space.spaces.values())
         self.obs_dim = obs_dim
         self.raise_beta_params_net = build_mlp(obs_dim, 2, 10, 256).to(self.device)
@@ -93,20 +95,22 @@ class VanillaPGAgent(Agent):
         self.optimizer = torch.optim.Adam(parameters, lr=1e-3)
 
 
-    @torch.no_grad
     def get_action(self, observation: np.ndarray) -> tuple[np.ndarray, float]:
         """Get an action based on the current observation.
 
         Returns:
             Tuple of (raise_intensity action, log_prob)
         """
-        obs = torch.from_numpy(observation).to(self.device)
-        beta_params = self.raise_beta_params_net(obs)
-        assert beta_params.shape == (2,), f"Expected (2,), got {beta_params.shape}"
-        alpha, beta = beta_params[0], beta_params[1]
-        beta_distn = torch.distributions.Beta(alpha, beta)
-        raise_intensity = beta_distn.rsample()
-        log_prob = beta_distn.log_prob(raise_intensity)
+        import torch
+
+        with torch.no_grad():
+            obs = torch.from_numpy(observation).to(self.device)
+            beta_params = self.raise_beta_params_net(obs)
+            assert beta_params.shape == (2,), f"Expected (2,), got {beta_params.shape}"
+            alpha, beta = beta_params[0], beta_params[1]
+            beta_distn = torch.distributions.Beta(alpha, beta)
+            raise_intensity = beta_distn.rsample()
+            log_prob = beta_distn.log_prob(raise_intensity)
         return np.array([float(raise_intensity)]), log_prob.item()
 
     def update(self, batch_traj_data: list[dict[str, np.ndarray]]):
@@ -116,6 +120,8 @@ class VanillaPGAgent(Agent):
             batch_traj_data: List of trajectory dicts, each containing
                 'observations', 'actions', 'rewards' arrays from one game.
         """
+        import torch
+
         # Concatenate all trajectories from the batch 
         observations = torch.from_numpy(
             np.concatenate([traj["observations"] for traj in batch_traj_data], axis=0)
@@ -222,10 +228,13 @@ class DQNAgent(DiscreteAgent):
     Action is action index.
     """
 
-    def __init__(self, player_id: int, num_actions: int, obs_space: spaces.Dict, epsilon: float = 0.1):
+    def __init__(self, player_id: int, num_actions: int, obs_space: spaces.Dict, epsilon: float = 0.1, device: str | None = None):
+        import torch
+        from high_society.networks import build_discrete_mlp
+
         self.player_id = player_id
         self.num_actions = num_actions
-        self.device = device
+        self.device = torch.device(device) if device is not None else get_device()
         self.epsilon = epsilon
         obs_dim = sum(space.shape[0] for space in obs_space.spaces.values())
         self.q_net = build_discrete_mlp(obs_dim, num_actions, 4, 64).to(self.device)
@@ -237,13 +246,23 @@ class DQNAgent(DiscreteAgent):
         self.target_update_freq = 100
         self.current_step = 0
 
-    @torch.no_grad()
+    @classmethod
+    def from_checkpoint(cls, path: str, player_id: int, num_actions: int, obs_space: spaces.Dict, epsilon: float = 0.0, device: str | None = None) -> "DQNAgent":
+        """Build an agent whose q_net is loaded from a saved state dict."""
+        import torch
+
+        agent = cls(player_id=player_id, num_actions=num_actions, obs_space=obs_space, epsilon=epsilon, device=device)
+        agent.q_net.load_state_dict(torch.load(path, weights_only=True, map_location=agent.device))
+        return agent
+
     def get_action(self, observation: np.ndarray, action_mask: np.ndarray) -> tuple[int, float]:
         """Get an action based on the current observation with epsilon-greedy exploration.
 
         Returns:
             Tuple of (action index, log_prob placeholder)
         """
+        import torch
+
         valid_actions = np.where(action_mask)[0]
 
         # Epsilon-greedy exploration
@@ -251,12 +270,13 @@ class DQNAgent(DiscreteAgent):
             action = np.random.choice(valid_actions)
             return int(action), 0.0
 
-        obs = torch.from_numpy(observation).float().to(self.device)
-        q_vals = self.q_net(obs)
-        # Mask invalid actions with large negative value
-        mask_tensor = torch.from_numpy(action_mask).float().to(self.device)
-        q_vals = q_vals + (1 - mask_tensor) * -1e8
-        action = q_vals.argmax(dim=-1)
+        with torch.no_grad():
+            obs = torch.from_numpy(observation).float().to(self.device)
+            q_vals = self.q_net(obs)
+            # Mask invalid actions with large negative value
+            mask_tensor = torch.from_numpy(action_mask).float().to(self.device)
+            q_vals = q_vals + (1 - mask_tensor) * -1e8
+            action = q_vals.argmax(dim=-1)
         return int(action.item()), 0.0
 
     def update(self, batch_traj_data: list[dict[str, np.ndarray]]) -> dict[str, float]:
@@ -280,14 +300,46 @@ class DQNAgent(DiscreteAgent):
         next_observations[boundary_indices] = 0
         next_action_masks[boundary_indices] = 0
 
+        return self.update_from_batch({
+            "observations": observations,
+            "actions": actions,
+            "action_masks": action_masks,
+            "rewards": rewards,
+            "terminateds": terminateds,
+            "next_observations": next_observations,
+            "next_action_masks": next_action_masks,
+        })
+
+    def update_from_batch(self, batch: dict, cql_alpha: float = 0.0) -> dict[str, float]:
+        """Update Q-network using a batch of transitions, e.g. from TrajectoryDataset.iter_batches.
+
+        `batch` holds observations, actions, action_masks, rewards, terminateds,
+        next_observations and next_action_masks, one row per transition, as
+        numpy arrays or tensors; the next observation and mask are zero after a
+        trajectory's last transition.
+
+        With `cql_alpha` > 0 the loss adds the conservative Q-learning penalty
+        (logsumexp of Q over legal actions minus Q of the played action), which
+        keeps offline training from overvaluing actions the data never took.
+
+        Returns:
+            Dict with metrics: loss, mean_q, mean_target, q_error, plus cql_penalty when cql_alpha > 0
+        """
+        import torch
+
+        def to_tensor(value, dtype):
+            if not isinstance(value, torch.Tensor):
+                value = torch.from_numpy(value)
+            return value.to(self.device, dtype)
+
         # Convert to tensors
-        observations = torch.from_numpy(observations).float().to(self.device)
-        actions = torch.from_numpy(actions).long().to(self.device)
-        action_masks = torch.from_numpy(action_masks).float().to(self.device)
-        rewards = torch.from_numpy(rewards).float().to(self.device)
-        terminateds = torch.from_numpy(terminateds).float().to(self.device)
-        next_observations = torch.from_numpy(next_observations).float().to(self.device)
-        next_action_masks = torch.from_numpy(next_action_masks).float().to(self.device)
+        observations = to_tensor(batch["observations"], torch.float32)
+        actions = to_tensor(batch["actions"], torch.long)
+        action_masks = to_tensor(batch["action_masks"], torch.float32)
+        rewards = to_tensor(batch["rewards"], torch.float32)
+        terminateds = to_tensor(batch["terminateds"], torch.float32)
+        next_observations = to_tensor(batch["next_observations"], torch.float32)
+        next_action_masks = to_tensor(batch["next_action_masks"], torch.float32)
 
         with torch.no_grad():
             target_next_q_values = self.target_q_net(next_observations)
@@ -295,11 +347,15 @@ class DQNAgent(DiscreteAgent):
             next_q_values = target_next_q_values.max(dim=1).values
             target_values = rewards + self.gamma * next_q_values * (1 - terminateds)
 
-        cur_q_values = self.q_net(observations)
-        cur_q_values = cur_q_values.gather(1, actions.unsqueeze(1)).squeeze(1)
+        all_q_values = self.q_net(observations)
+        cur_q_values = all_q_values.gather(1, actions.unsqueeze(1)).squeeze(1)
 
         self.optimizer.zero_grad()
         loss = self.loss_fn(cur_q_values, target_values)
+        if cql_alpha > 0:
+            legal_q_values = all_q_values + (1 - action_masks) * -1e8
+            cql_penalty = (torch.logsumexp(legal_q_values, dim=1) - cur_q_values).mean()
+            loss = loss + cql_alpha * cql_penalty
         loss.backward()
         self.optimizer.step()
 
@@ -307,9 +363,12 @@ class DQNAgent(DiscreteAgent):
         if self.current_step % self.target_update_freq == 0:
             self.target_q_net.load_state_dict(self.q_net.state_dict())
 
-        return {
+        metrics = {
             "loss": loss.item(),
             "mean_q": cur_q_values.mean().item(),
             "mean_target": target_values.mean().item(),
             "q_error": (cur_q_values - target_values).abs().mean().item(),
-        }
\ No newline at end of file
+        }
+        if cql_alpha > 0:
+            metrics["cql_penalty"] = cql_penalty.item()
+        return metrics
\ No newline at end of file
@@ -0,0 +1,312 @@
+"""On-disk trajectory dataset for offline training.
+
+Transitions are stored column by column in shards of fixed-width .npy arrays:
+
+    observations   (N, obs_dim) float32
+    action_masks   (N, num_actions) bool
+    actions        (N,) int16
+    rewards        (N,) float32
+    terminateds    (N,) bool
+    last           (N,) bool   the final transition of its trajectory
+
+A trajectory never spans shards, so a transition's next observation is the
+next row unless `last` is set. `index.json` lists the shards and is rewritten
+(atomically) whenever a shard is added, so a dataset can keep growing across
+runs.
+
+`TrajectoryDataset` memory-maps the shards and streams shuffled minibatches in
+the form `DQNAgent.update_from_batch` takes, touching only the rows it samples,
+so it scales to datasets much larger than memory. `BatchPrefetcher` reads and
+uploads those batches ahead of the learner; it is the only part that needs
+torch, and imports it itself.
+"""
+import json
+import os
+import queue
+import threading
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+
+INDEX_FILE = "index.json"
+DATASET_VERSION = 1
+DEFAULT_SHARD_SIZE = 1_000_000
+
+COLUMNS = {
+    "observations": np.float32,
+    "action_masks": np.bool_,
+    "actions": np.int16,
+    "rewards": np.float32,
+    "terminateds": np.bool_,
+    "last": np.bool_,
+}
+
+
+def _shard_file(root: Path, shard: str, column: str) -> Path:
+    return root / f"{shard}.{column}.npy"
+
+
+def _read_index(root: Path) -> dict | None:
+    path = root / INDEX_FILE
+    if not path.exists():
+        return None
+    with open(path) as f:
+        index = json.load(f)
+    if index.get("version") != DATASET_VERSION:
+        raise ValueError(f"Unsupported dataset version {index.get('version')} in {path}")
+    return index
+
+
+class DatasetWriter:
+    """Appends trajectories to a dataset directory, one shard per `shard_size` transitions.
+
+    Call `close` (or use it as a context manager) to write the last partial shard.
+    """
+
+    def __init__(self, root: str | os.PathLike, shard_size: int = DEFAULT_SHARD_SIZE):
+        self.root = Path(root)
+        self.shard_size = shard_size
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.index = _read_index(self.root) or {"version": DATASET_VERSION, "shards": []}
+        self._buffer: dict[str, list[np.ndarray]] = {column: [] for column in COLUMNS}
+        self._buffered = 0
+
+    def __enter__(self) -> "DatasetWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add_trajectory(self, trajectory: dict[str, np.ndarray]):
+        """Add one seat's trajectory as returned by `collect_trajectories_discrete`."""
+        n = len(trajectory["actions"])
+        if n == 0:
+            return
+        observations = np.asarray(trajectory["observations"], dtype=np.float32)
+        action_masks = np.asarray(trajectory["action_masks"], dtype=np.bool_)
+        for key, dim in (("obs_dim", observations.shape[1]), ("num_actions", action_masks.shape[1])):
+            if self.index.setdefault(key, dim) != dim:
+                raise ValueError(f"Trajectory has {key}={dim}, the dataset has {self.index[key]}")
+
+        last = np.zeros(n, dtype=np.bool_)
+        last[-1] = True
+        self._buffer["observations"].append(observations)
+        self._buffer["action_masks"].append(action_masks)
+        self._buffer["actions"].append(np.asarray(trajectory["actions"], dtype=np.int16))
+        self._buffer["rewards"].append(np.asarray(trajectory["rewards"], dtype=np.float32))
+        self._buffer["terminateds"].append(np.asarray(trajectory["terminateds"], dtype=np.bool_))
+        self._buffer["last"].append(last)
+        self._buffered += n
+        if self._buffered >= self.shard_size:
+            self.flush()
+
+    def add_trajectories(self, trajectories: dict[int, dict[str, np.ndarray]]):
+        """Add every seat of a `collect_trajectories_discrete` result."""
+        for trajectory in trajectories.values():
+            self.add_trajectory(trajectory)
+
+    def flush(self):
+        """Write the buffered trajectories as a new shard."""
+        if self._buffered == 0:
+            return
+        shard = f"shard-{len(self.index['shards']):05d}"
+        for column, parts in self._buffer.items():
+            np.save(_shard_file(self.root, shard, column), np.concatenate(parts))
+        self.index["shards"].append({"name": shard, "num_transitions": self._buffered})
+
+        tmp_path = self.root / f"{INDEX_FILE}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(tmp_path, self.root / INDEX_FILE)
+
+        self._buffer = {column: [] for column in COLUMNS}
+        self._buffered = 0
+
+    def close(self):
+        self.flush()
+
+
+class TrajectoryDataset:
+    """Memory-mapped view of a dataset written by DatasetWriter."""
+
+    def __init__(self, root: str | os.PathLike):
+        self.root = Path(root)
+        index = _read_index(self.root)
+        if index is None:
+            raise FileNotFoundError(f"No dataset index at {self.root / INDEX_FILE}")
+        self.obs_dim = index.get("obs_dim")
+        self.num_actions = index.get("num_actions")
+        self.shards = [shard["name"] for shard in index["shards"]]
+        self.shard_sizes = np.array([shard["num_transitions"] for shard in index["shards"]], dtype=np.int64)
+        self._columns: dict[str, dict[str, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return int(self.shard_sizes.sum())
+
+    def shard(self, i: int) -> dict[str, np.ndarray]:
+        """Shard `i`'s columns, memory-mapped on first use."""
+        name = self.shards[i]
+        if name not in self._columns:
+            self._columns[name] = {
+                column: np.load(_shard_file(self.root, name, column), mmap_mode="r") for column in COLUMNS
+            }
+        return self._columns[name]
+
+    def gather(self, shard_idx: int, rows: np.ndarray) -> dict[str, np.ndarray]:
+        """The transitions at sorted `rows` of a shard, with their next observations and masks."""
+        columns = self.shard(shard_idx)
+        last = columns["last"][rows]
+        # A trajectory's final row has no successor; read any valid row and zero it
+        next_rows = np.where(last, rows, rows + 1)
+        next_observations = columns["observations"][next_rows]
+        next_action_masks = columns["action_masks"][next_rows]
+        next_observations[last] = 0
+        next_action_masks[last] = False
+        return {
+            "observations": columns["observations"][rows],
+            "actions": columns["actions"][rows].astype(np.int64),
+            "action_masks": columns["action_masks"][rows],
+            "rewards": columns["rewards"][rows],
+            "terminateds": columns["terminateds"][rows],
+            "next_observations": next_observations,
+            "next_action_masks": next_action_masks,
+        }
+
+    def iter_batches(
+        self,
+        batch_size: int,
+        shuffle: bool = True,
+        seed: int | None = None,
+        shards_per_group: int = 4,
+        drop_last: bool = False,
+    ) -> Iterator[dict[str, np.ndarray]]:
+        """One pass over the dataset in minibatches of `batch_size` transitions.
+
+        Shards are visited in random order, `shards_per_group` at a time, and
+        each batch samples the group's rows without replacement. Only the group
+        needs an index permutation in memory, and rows are read in sorted order
+        within each shard to keep page-cache access local.
+        """
+        rng = np.random.default_rng(seed)
+        order = rng.permutation(len(self.shards)) if shuffle else np.arange(len(self.shards))
+
+        carry: list[dict[str, np.ndarray]] = []
+        carried = 0
+        for start in range(0, len(order), shards_per_group):
+            group = order[start:start + shards_per_group]
+            offsets = np.concatenate([[0], np.cumsum(self.shard_sizes[group])])
+            positions = rng.permutation(offsets[-1]) if shuffle else np.arange(offsets[-1])
+
+            i = 0
+            while i < len(positions):
+                # A batch can span two groups: top up the rows carried from the last one
+                chunk = positions[i:i + batch_size - carried]
+                i += len(chunk)
+                owner = np.searchsorted(offsets, chunk, side="right") - 1
+                parts = [
+                    self.gather(int(group[g]), np.sort(chunk[owner == g] - offsets[g]))
+                    for g in np.unique(owner)
+                ]
+                carry.extend(parts)
+                carried += len(chunk)
+                if carried == batch_size:
+                    yield _concat(carry)
+                    carry, carried = [], 0
+
+        if carry and not drop_last:
+            yield _concat(carry)
+
+
+def _concat(parts: list[dict[str, np.ndarray]]) -> dict[str, np.ndarray]:
+    if len(parts) == 1:
+        return parts[0]
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+
+class BatchPrefetcher:
+    """Turns numpy batches into tensors on `device` on a background thread, `depth` batches ahead.
+
+    Reading from the memory-mapped shards and the host-to-device copy then
+    overlap with the learner's compute. On CUDA the batches are pinned and
+    copied on a side stream with non_blocking=True; iterating waits on that
+    copy only when the batch is handed over.
+    """
+
+    _DONE = object()
+
+    def __init__(self, batches: Iterable[dict[str, np.ndarray]], device, depth: int = 2):
+        import torch
+
+        self.device = torch.device(device)
+        self._cuda = self.device.type == "cuda"
+        self._copy_stream = torch.cuda.Stream(self.device) if self._cuda else None
+        self._queue: queue.Queue = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._worker = threading.Thread(target=self._run, args=(iter(batches),), name="batch-prefetcher", daemon=True)
+        self._worker.start()
+
+    def __enter__(self) -> "BatchPrefetcher":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __iter__(self) -> Iterator[dict]:
+        import torch
+
+        while True:
+            item = self._queue.get()
+            if item is self._DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            batch, copied = item
+            if copied is not None:
+                stream = torch.cuda.current_stream(self.device)
+                stream.wait_event(copied)
+                # The tensors were allocated on the copy stream but are used on this one
+                for tensor in batch.values():
+                    tensor.record_stream(stream)
+            yield batch
+
+    def close(self):
+        """Stop reading ahead; safe to call before the batches run out."""
+        self._stop.set()
+        while self._worker.is_alive():
+            try:
+                self._queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        self._worker.join()
+
+    def _put(self, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _upload(self, batch: dict[str, np.ndarray]):
+        import torch
+
+        tensors = {key: torch.from_numpy(np.ascontiguousarray(value)) for key, value in batch.items()}
+        if not self._cuda:
+            return {key: tensor.to(self.device) for key, tensor in tensors.items()}, None
+        with torch.cuda.stream(self._copy_stream):
+            tensors = {key: tensor.pin_memory().to(self.device, non_blocking=True) for key, tensor in tensors.items()}
+            copied = torch.cuda.Event()
+            copied.record(self._copy_stream)
+        return tensors, copied
+
+    def _run(self, batches: Iterator[dict[str, np.ndarray]]):
+        try:
+            for batch in batches:
+                if not self._put(self._upload(batch)):
+                    return
+        except Exception as e:
+            self._put(e)
+            return
+        self._put(self._DONE)
@@ -2,7 +2,7 @@ from pettingzoo import AECEnv
 from pettingzoo.utils.agent_selector import AgentSelector
 from gymnasium import spaces
 import numpy as np
-from pydantic import BaseModel
+from pydantic import BaseModel, field_serializer
 
 from typing import Literal
 import random
@@ -36,6 +36,15 @@ class AuctionRound(BaseModel):
     card: PrestigeCard
     value_to_agent: dict[int, float]
 
+    # Sets go out as sorted lists, so the same state always encodes to the same JSON
+    @field_serializer("cards_in_bid", when_used="json")
+    def _sorted_cards_in_bid(self, cards_in_bid: dict[int, set[int]]) -> dict[int, list[int]]:
+        return {idx: sorted(cards) for idx, cards in cards_in_bid.items()}
+
+    @field_serializer("players_to_bid", when_used="json")
+    def _sorted_players_to_bid(self, players_to_bid: set[int]) -> list[int]:
+        return sorted(players_to_bid)
+
 
 class PlayerState(BaseModel):
     player_idx: int
@@ -93,6 +102,7 @@ class DiscreteHighSocietyEnv(AECEnv):
     def __init__(self, num_players: int = None):
         super().__init__()
         self.name = "discrete_high_society"
+        self._spaces_num_players = None
         self.reset(num_players or MAX_NUM_PLAYERS)
 
     def obs_dim(self, agent: str) -> int:
@@ -169,7 +179,15 @@ class DiscreteHighSocietyEnv(AECEnv):
         self._clear_rewards()
 
     def _build_spaces(self):
-        """Set up observation/action spaces and agent lists for current num_players."""
+        """Set up observation/action spaces and agent lists for current num_players.
+
+        The spaces only depend on num_players, so they are kept across resets
+        with the same player count (building them dominates reset time).
+        """
+        if self._spaces_num_players == self.num_players:
+            return
+        self._spaces_num_players = self.num_players
+
         self.agents = [f"player_{i}" for i in range(self.num_players)]
         self.possible_agents = self.agents[:]
         self.num_actions = 1 + NUM_MONEY_CARDS  # PASS + 10 money cards
@@ -206,7 +224,8 @@ class DiscreteHighSocietyEnv(AECEnv):
         assert 3 <= self.num_players <= 5
         self._build_spaces()
 
-        self.game_state = self._start_game()
+        deck = options.get("deck") if options else None
+        self.game_state = self._start_game(deck)
         self.game_state.cur_round = self._start_auction_round()
 
         self.agents = self.possible_agents[:]
@@ -249,12 +268,17 @@ class DiscreteHighSocietyEnv(AECEnv):
     def close(self):
         pass
 
-    def _start_game(self) -> GameState:
-        prestige_cards = [
-            *[PrestigeCard(type="value", value=i) for i in range(1, 10)],
-            *[PrestigeCard(type="special", value=None, speciality="2x") for _ in range(4)],
-        ]
-        random.shuffle(prestige_cards)
+    def _start_game(self, deck: list[PrestigeCard] | None = None) -> GameState:
+        """Deal a new game. `deck` fixes the prestige cards in draw order instead of shuffling."""
+        if deck is None:
+            prestige_cards = [
+                *[PrestigeCard(type="value", value=i) for i in range(1, 10)],
+                *[PrestigeCard(type="special", value=None, speciality="2x") for _ in range(4)],
+            ]
+            random.shuffle(prestige_cards)
+        else:
+            # Cards are drawn from the end of the list
+            prestige_cards = [card.model_copy() for card in reversed(deck)]
 
         player_states = {}
         for i in range(self.num_players):
@@ -270,7 +294,7 @@ class DiscreteHighSocietyEnv(AECEnv):
 
         return GameState(
             round_starter_idx=0,
-            remaining_special_cards=4,
+            remaining_special_cards=sum(card.type == "special" for card in prestige_cards),
             player_states=player_states,
             remaining_prestige_cards=prestige_cards,
         )
@@ -0,0 +1,243 @@
+"""Batched SimpleHighSocietyEnv: N games stepped together with array operations.
+
+The rules are SimpleHighSocietyEnv's, including its turn order: after an
+explicit action the next seat in turn acts (even in a new round), and a round
+emptied by auto-passes opens with the round starter. Instead of per-game
+objects, every game's money, bids, prestige and round state are rows of arrays,
+one column per seat. Auto-passes and round completion are applied with masks
+over the games they concern, never recursively.
+
+Games may have different player counts. Every observation is padded to
+MAX_NUM_PLAYERS seats, so all games share one observation width; a game's
+first `num_players` entries of each per-seat field match
+SimpleHighSocietyEnv's observation.
+
+One deliberate difference: when a game ends because the remaining bidders
+were auto-passed, SimpleHighSocietyEnv clears the final rewards in the same
+step; here they are kept.
+"""
+from typing import Sequence
+
+import numpy as np
+from gymnasium import spaces
+
+MIN_NUM_PLAYERS = 3
+MAX_NUM_PLAYERS = 5
+NUM_SPECIAL_CARDS = 4
+STARTING_MONEY = float(sum(range(1, 10)))
+# Prestige cards as codes: 0 is a 2x card, 1-9 the value cards
+SPECIAL_CARD = 0
+DECK = np.array([*range(1, 10), *[SPECIAL_CARD] * NUM_SPECIAL_CARDS], dtype=np.int8)
+
+SCALAR_FIELDS = ["total_prestige", "remaining_special_cards", "is_last_round", "remaining_money", "current_round_bid"]
+SEAT_FIELDS = ["bids", "current_player_prestige", "potential_player_prestige", "current_round_starter", "next_round_starter"]
+
+
+def _obs_layout() -> dict[str, slice]:
+    # Fields in the order cat_dict_array concatenates the single env's observation
+    layout, offset = {}, 0
+    for field in sorted(SCALAR_FIELDS + SEAT_FIELDS):
+        width = MAX_NUM_PLAYERS if field in SEAT_FIELDS else 1
+        layout[field] = slice(offset, offset + width)
+        offset += width
+    return layout
+
+
+OBS_LAYOUT = _obs_layout()
+OBS_DIM = len(SCALAR_FIELDS) + len(SEAT_FIELDS) * MAX_NUM_PLAYERS
+
+
+class VectorSimpleHighSocietyEnv:
+    """`num_envs` SimpleHighSocietyEnv games, stepped with one vector of raise intensities.
+
+    `step(raise_intensities)` applies each game's action for its current seat
+    (`current_seat`); games that are already over ignore theirs. `observe()`
+    returns the current seat's (num_envs, OBS_DIM) observations, laid out as
+    `cat_dict_array` lays out a single game's (see OBS_LAYOUT).
+    """
+
+    def __init__(self, num_envs: int, num_players: int | Sequence[int]):
+        num_players = np.broadcast_to(np.asarray(num_players, dtype=np.int64), (num_envs,)).copy()
+        if ((num_players < MIN_NUM_PLAYERS) | (num_players > MAX_NUM_PLAYERS)).any():
+            raise ValueError("Must have between 3 - 5 players")
+        self.num_envs = num_envs
+        self.num_players = num_players
+        self._rows = np.arange(num_envs)
+        self._seats = np.arange(MAX_NUM_PLAYERS)
+        # Seats beyond a game's player count are padding
+        self.seat_mask = self._seats[None, :] < num_players[:, None]
+
+        self.observation_spaces = spaces.Dict({
+            field: spaces.Box(low=0, high=100, shape=(columns.stop - columns.start,), dtype=np.float32)
+            for field, columns in OBS_LAYOUT.items()
+        })
+
+        self.reset()
+
+    def observation_space(self) -> spaces.Dict:
+        """Per-game observation space, with per-seat fields padded to MAX_NUM_PLAYERS."""
+        return self.observation_spaces
+
+    def reset(self, seed: int | None = None, options: dict | None = None) -> np.ndarray:
+        """Start every game over. `options={"decks": ...}` fixes the (num_envs, 13) card codes in draw order."""
+        options = options or {}
+        if "decks" in options:
+            self.decks = np.asarray(options["decks"], dtype=np.int8).reshape(self.num_envs, len(DECK))
+        else:
+            rng = np.random.default_rng(seed)
+            self.decks = rng.permuted(np.tile(DECK, (self.num_envs, 1)), axis=1)
+
+        n, m = self.num_envs, MAX_NUM_PLAYERS
+        self.money = np.where(self.seat_mask, STARTING_MONEY, 0.0)
+        self.bids = np.zeros((n, m))
+        self.card_values = np.zeros((n, m))
+        self.special_cards = np.zeros((n, m), dtype=np.int64)
+        self.prestige = np.zeros((n, m))
+        self.players_to_bid = np.zeros((n, m), dtype=bool)
+        self.cur_bid = np.zeros(n)
+        self.cur_bidder = np.zeros(n, dtype=np.int64)
+        self.card = np.zeros(n, dtype=np.int8)
+        self.cards_drawn = np.zeros(n, dtype=np.int64)
+        self.remaining_special_cards = np.full(n, NUM_SPECIAL_CARDS, dtype=np.int64)
+        self.round_starter = np.zeros(n, dtype=np.int64)
+        self.current_seat = np.zeros(n, dtype=np.int64)
+        self.rewards = np.zeros((n, m), dtype=np.float32)
+        self.done = np.zeros(n, dtype=bool)
+
+        everyone = np.ones(n, dtype=bool)
+        self._start_rounds(everyone)
+        self._select_seats(everyone, self.round_starter)
+        return self.observe()
+
+    def step(self, raise_intensities: np.ndarray):
+        """Apply each unfinished game's raise intensity in [0, 1] (0 passes) for its current seat."""
+        raise_intensities = np.asarray(raise_intensities, dtype=np.float64).reshape(self.num_envs)
+        active = ~self.done
+        if ((raise_intensities[active] < 0) | (raise_intensities[active] > 1)).any():
+            raise ValueError("Raise intensities must be in [0, 1]")
+        self.rewards[active] = 0
+
+        rows, seats = self._rows[active], self.current_seat[active]
+        intensity = raise_intensities[active]
+        passing = intensity == 0
+        self._pass(rows[passing], seats[passing])
+
+        rows, seats, intensity = rows[~passing], seats[~passing], intensity[~passing]
+        available = self.money[rows, seats] + self.bids[rows, seats]
+        min_bid = self.cur_bid[rows] + 1
+        bid = min_bid + intensity * (available - min_bid)
+        self.money[rows, seats] += self.bids[rows, seats]
+        self.money[rows, seats] -= bid
+        self.bids[rows, seats] = bid
+        self.cur_bid[rows] = bid
+        self.cur_bidder[rows] = seats
+
+        round_over = active & (self.players_to_bid.sum(axis=1) <= 1)
+        game_over = self._complete_rounds(round_over)
+        self._start_rounds(round_over & ~game_over)
+        self._select_seats(active & ~game_over, (self.current_seat + 1) % self.num_players)
+
+    def observe(self) -> np.ndarray:
+        """(num_envs, OBS_DIM) float32 observations of each game's current seat."""
+        rows, seat = self._rows, self.current_seat
+        starter = self.round_starter
+        special = self.card == SPECIAL_CARD
+        # Prestige each seat would have with the card on auction
+        potential = np.where(
+            special[:, None],
+            self.card_values * 2.0 ** (self.special_cards + 1),
+            (self.card_values + self.card[:, None]) * 2.0 ** self.special_cards,
+        )
+        fields = {
+            "total_prestige": self.prestige[rows, seat],
+            "remaining_special_cards": self.remaining_special_cards,
+            "is_last_round": self.remaining_special_cards == 1,
+            "remaining_money": self.money[rows, seat] + self.bids[rows, seat],
+            "current_round_bid": self.cur_bid,
+            "bids": self.bids,
+            "current_player_prestige": self.prestige,
+            "potential_player_prestige": potential,
+            "current_round_starter": self._seats[None, :] == starter[:, None],
+            "next_round_starter": self._seats[None, :] == ((starter + 1) % self.num_players)[:, None],
+        }
+        obs = np.empty((self.num_envs, OBS_DIM), dtype=np.float32)
+        for field, columns in OBS_LAYOUT.items():
+            if field in SEAT_FIELDS:
+                obs[:, columns] = np.where(self.seat_mask, fields[field], 0)
+            else:
+                obs[:, columns.start] = fields[field]
+        return obs
+
+    def _pass(self, rows: np.ndarray, seats: np.ndarray):
+        self.money[rows, seats] += self.bids[rows, seats]
+        self.bids[rows, seats] = 0
+        self.players_to_bid[rows, seats] = False
+
+    def _start_rounds(self, mask: np.ndarray):
+        """Draw the next card and open the bidding in the games in `mask`."""
+        rows = self._rows[mask]
+        self.card[rows] = self.decks[rows, self.cards_drawn[rows]]
+        self.cards_drawn[rows] += 1
+        self.remaining_special_cards[rows] -= self.card[rows] == SPECIAL_CARD
+        self.cur_bid[rows] = 0
+        self.cur_bidder[rows] = self.round_starter[rows]
+        self.bids[rows] = 0
+        self.players_to_bid[rows] = self.seat_mask[rows]
+
+    def _complete_rounds(self, mask: np.ndarray) -> np.ndarray:
+        """Award the card in the games in `mask` and score those that are over; returns the finished games."""
+        won = mask & (self.cur_bid > 0) & self.players_to_bid.any(axis=1)
+        rows = self._rows[won]
+        winners = self.cur_bidder[rows]
+        special = self.card[rows] == SPECIAL_CARD
+        self.special_cards[rows, winners] += special
+        self.card_values[rows, winners] += np.where(special, 0, self.card[rows])
+        self.prestige[rows, winners] = self.card_values[rows, winners] * 2.0 ** self.special_cards[rows, winners]
+
+        # Everyone but the winner gets back what they still have bid
+        refund = mask[:, None] & (self.bids > 0)
+        refund[rows, winners] = False
+        self.money += np.where(refund, self.bids, 0)
+
+        self.round_starter[mask] = (self.round_starter[mask] + 1) % self.num_players[mask]
+
+        game_over = mask & (self.remaining_special_cards == 0)
+        self._score(game_over)
+        return game_over
+
+    def _score(self, mask: np.ndarray):
+        """Final rewards: the poorest are eliminated, the most prestigious of the rest wins."""
+        rows = self._rows[mask]
+        money = np.where(self.seat_mask[rows], self.money[rows], np.inf)
+        eligible = self.seat_mask[rows] & (money != money.min(axis=1, keepdims=True))
+        winner = np.where(eligible, self.prestige[rows], -np.inf).argmax(axis=1)
+        rewards = np.where(self.seat_mask[rows], -1.0, 0.0).astype(np.float32)
+        has_winner = eligible.any(axis=1)
+        rewards[np.flatnonzero(has_winner), winner[has_winner]] = 1.0
+        self.rewards[rows] = rewards
+        self.done[rows] = True
+
+    def _select_seats(self, mask: np.ndarray, start: np.ndarray):
+        """Give the turn to the first seat from `start` that can afford to raise, auto-passing the others.
+
+        A game whose bidders all get auto-passed completes its round and, unless
+        it is over, searches again from the new round's starter.
+        """
+        pending = mask.copy()
+        start = start.copy()
+        while pending.any():
+            searching = pending.copy()
+            for i in range(MAX_NUM_PLAYERS):
+                rows = self._rows[searching & (i < self.num_players)]
+                seats = (start[rows] + i) % self.num_players[rows]
+                bidding = self.players_to_bid[rows, seats]
+                affords = self.money[rows, seats] + self.bids[rows, seats] >= self.cur_bid[rows] + 1
+                chosen = bidding & affords
+                self.current_seat[rows[chosen]] = seats[chosen]
+                searching[rows[chosen]] = False
+                self._pass(rows[bidding & ~affords], seats[bidding & ~affords])
+
+            game_over = self._complete_rounds(searching)
+            pending = searching & ~game_over
+            self._start_rounds(pending)
+            start[pending] = self.round_starter[pending]
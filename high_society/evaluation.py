@@ -0,0 +1,186 @@
+"""Head-to-head checkpoint comparison with a sequential probability ratio test.
+
+Instead of playing a fixed, large number of games, games are played in pairs
+and the test stops as soon as the result is statistically decided.
+
+Each pair uses the same deck seed and the same seat for the player under test:
+- game A: the candidate in that seat, the baseline in every other seat
+- game B: the baseline in that seat, the baseline in every other seat
+
+Game B does not depend on the seat, so it is played once per deck and shared
+by every seat's pair. Only pairs where exactly one of the two won carry
+information about which checkpoint is stronger. Under H0 the candidate wins
+such a pair with probability 0.5, under H1 with probability `p1`. Seats rotate
+every pair so neither side profits from the starting seat.
+
+Usage:
+    python -m high_society.evaluation --candidate pool/dqn_agent_v5.pth --baseline pool/dqn_agent_v4.pth
+"""
+import argparse
+import math
+from dataclasses import dataclass
+from typing import Literal
+
+import numpy as np
+
+from high_society.agents import DiscreteAgent, DQNAgent
+from high_society.environments.discrete import DiscreteHighSocietyEnv
+from high_society.main import collect_trajectories_discrete
+
+
+@dataclass
+class SPRT:
+    """Wald's SPRT on the probability that the candidate wins a discordant pair."""
+    p0: float = 0.5
+    p1: float = 0.6
+    alpha: float = 0.05
+    beta: float = 0.05
+    llr: float = 0.0
+
+    @property
+    def upper_bound(self) -> float:
+        return math.log((1 - self.beta) / self.alpha)
+
+    @property
+    def lower_bound(self) -> float:
+        return math.log(self.beta / (1 - self.alpha))
+
+    def update(self, candidate_won: bool):
+        if candidate_won:
+            self.llr += math.log(self.p1 / self.p0)
+        else:
+            self.llr += math.log((1 - self.p1) / (1 - self.p0))
+
+    def decision(self) -> Literal["candidate", "baseline"] | None:
+        """Return "candidate" if H1 is accepted, "baseline" if H0 is accepted, None to keep going."""
+        if self.llr >= self.upper_bound:
+            return "candidate"
+        if self.llr <= self.lower_bound:
+            return "baseline"
+        return None
+
+
+@dataclass
+class ComparisonResult:
+    decision: Literal["candidate", "baseline", "inconclusive"]
+    games: int
+    pairs: int
+    candidate_wins: int  # discordant pairs won by the candidate
+    baseline_wins: int  # discordant pairs won by the baseline
+    llr: float
+
+
+def _play_game(env: DiscreteHighSocietyEnv, agents: list[DiscreteAgent], seed: int, max_steps: int) -> list[bool]:
+    """Play one game and return whether each seat won."""
+    traj_data = collect_trajectories_discrete(env, agents, max_steps=max_steps, seed=seed)
+    return [bool(traj_data[agent.player_id]["won"]) for agent in agents]
+
+
+def compare_agents(
+    make_candidate,
+    make_baseline,
+    num_players: int = 4,
+    max_pairs: int = 5000,
+    sprt: SPRT | None = None,
+    max_steps: int = 1000,
+    seed: int | None = None,
+) -> ComparisonResult:
+    """Play seat-rotated, deck-paired games until the SPRT reaches a decision.
+
+    Args:
+        make_candidate: Callable taking a player_id and returning the candidate DiscreteAgent for that seat
+        make_baseline: Callable taking a player_id and returning the baseline DiscreteAgent for that seat
+        num_players: Table size for every game
+        max_pairs: Give up as "inconclusive" after this many game pairs
+        sprt: Test configuration, defaults to H0 p=0.5 vs H1 p=0.6 at alpha=beta=0.05
+        max_steps: Maximum steps per game
+        seed: Seed for the sequence of deck seeds
+    """
+    sprt = sprt or SPRT()
+    env = DiscreteHighSocietyEnv(num_players=num_players)
+    candidates = [make_candidate(i) for i in range(num_players)]
+    baselines = [make_baseline(i) for i in range(num_players)]
+    rng = np.random.default_rng(seed)
+
+    candidate_wins = 0
+    baseline_wins = 0
+    games = 0
+    decision = None
+    pairs = 0
+    while pairs < max_pairs and decision is None:
+        seat = pairs % num_players
+        # A new deck once every seat has played it
+        if seat == 0:
+            deck_seed = int(rng.integers(2**31))
+            baseline_won_by_seat = _play_game(env, baselines, deck_seed, max_steps)
+            games += 1
+
+        with_candidate = baselines[:seat] + [candidates[seat]] + baselines[seat + 1:]
+        candidate_won = _play_game(env, with_candidate, deck_seed, max_steps)[seat]
+        baseline_won = baseline_won_by_seat[seat]
+        games += 1
+        pairs += 1
+
+        if candidate_won == baseline_won:
+            continue
+        if candidate_won:
+            candidate_wins += 1
+        else:
+            baseline_wins += 1
+        sprt.update(candidate_won)
+        decision = sprt.decision()
+
+    return ComparisonResult(
+        decision=decision or "inconclusive",
+        games=games,
+        pairs=pairs,
+        candidate_wins=candidate_wins,
+        baseline_wins=baseline_wins,
+        llr=sprt.llr,
+    )
+
+
+def compare_checkpoints(
+    candidate_path: str,
+    baseline_path: str,
+    num_players: int = 4,
+    max_pairs: int = 5000,
+    sprt: SPRT | None = None,
+    seed: int | None = None,
+) -> ComparisonResult:
+    """Compare two saved DQN checkpoints with greedy (epsilon=0) play."""
+    env = DiscreteHighSocietyEnv(num_players=num_players)
+    obs_space = env.observation_space("player_0")
+
+    def make_candidate(player_id: int) -> DQNAgent:
+        return DQNAgent.from_checkpoint(candidate_path, player_id, env.num_actions, obs_space)
+
+    def make_baseline(player_id: int) -> DQNAgent:
+        return DQNAgent.from_checkpoint(baseline_path, player_id, env.num_actions, obs_space)
+
+    return compare_agents(make_candidate, make_baseline, num_players=num_players, max_pairs=max_pairs, sprt=sprt, seed=seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Decide whether a candidate checkpoint beats a baseline")
+    parser.add_argument("--candidate", required=True, help="Path to the candidate .pth")
+    parser.add_argument("--baseline", required=True, help="Path to the baseline .pth")
+    parser.add_argument("--num-players", type=int, default=4)
+    parser.add_argument("--max-pairs", type=int, default=5000)
+    parser.add_argument("--p1", type=float, default=0.6, help="Candidate pair-win probability under H1")
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--beta", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    sprt = SPRT(p1=args.p1, alpha=args.alpha, beta=args.beta)
+    result = compare_checkpoints(args.candidate, args.baseline, args.num_players, args.max_pairs, sprt, args.seed)
+
+    print(f"Decision: {result.decision}")
+    print(f"Games played: {result.games} ({result.pairs} pairs)")
+    print(f"Discordant pairs: candidate {result.candidate_wins} / baseline {result.baseline_wins}")
+    print(f"Log-likelihood ratio: {result.llr:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""Append-only binary log of played games, for offline training data.
+
+A game is fully determined by its deck order and the sequence of actions, so
+that is all a record keeps (plus the outcome and who played), well under 100
+bytes a game. `replay_trajectories` plays a record back through the env to
+rebuild the `collect_trajectories_discrete` output for every seat.
+
+Each record is framed as
+
+    magic b"HS", u32 payload length, u32 CRC-32 of the payload, payload
+
+so a reader can skip a record torn by a crash and find the next one. Payload:
+
+    u8 version, u8 num_players, i8 winner (-1: none), u8 human seat (255: none),
+    f64 unix time, u8 + robot type (UTF-8), u8 deck length + deck nibbles in
+    draw order (1-9 value cards, 10 the 2x cards), u16 count + action nibbles
+
+`GameLogWriter` writes from a background thread and fsyncs once per batch, so
+callers only pay for a queue put.
+"""
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Iterator
+
+import numpy as np
+
+from high_society.environments.discrete import DiscreteHighSocietyEnv, PrestigeCard
+
+RECORD_VERSION = 1
+MAGIC = b"HS"
+DEFAULT_FLUSH_INTERVAL_S = 1.0
+DEFAULT_MAX_PENDING = 10_000
+
+_FRAME = struct.Struct(">2sII")
+_HEADER = struct.Struct(">BBbBd")
+_COUNT = struct.Struct(">H")
+_SPECIAL_NIBBLE = 10
+_NO_SEAT = 255
+
+
+@dataclass
+class GameRecord:
+    num_players: int
+    # Prestige cards in draw order, the first auction's card first
+    deck: list[PrestigeCard]
+    # Every seat's actions in the order they were played
+    actions: list[int]
+    winner_idx: int | None
+    human_idx: int | None = None
+    robot_type: str = ""
+    timestamp: float = field(default_factory=time.time)
+
+
+def deck_in_draw_order(env: DiscreteHighSocietyEnv) -> list[PrestigeCard]:
+    """The deck of a game that was just reset, as `reset(options={"deck": ...})` takes it."""
+    return [env.game_state.cur_round.card, *reversed(env.game_state.remaining_prestige_cards)]
+
+
+def _card_nibble(card: PrestigeCard) -> int:
+    return _SPECIAL_NIBBLE if card.type == "special" else card.value
+
+
+def _nibble_card(nibble: int) -> PrestigeCard:
+    if nibble == _SPECIAL_NIBBLE:
+        return PrestigeCard(type="special", speciality="2x")
+    return PrestigeCard(type="value", value=nibble)
+
+
+def _pack_nibbles(nibbles: list[int]) -> bytes:
+    if len(nibbles) % 2:
+        nibbles = [*nibbles, 0]
+    return bytes(nibbles[i] << 4 | nibbles[i + 1] for i in range(0, len(nibbles), 2))
+
+
+def _unpack_nibbles(data: bytes, count: int) -> list[int]:
+    return [n for byte in data for n in (byte >> 4, byte & 0xF)][:count]
+
+
+def encode_record(record: GameRecord) -> bytes:
+    """The framed bytes of one record."""
+    robot_type = record.robot_type.encode()
+    payload = b"".join([
+        _HEADER.pack(
+            RECORD_VERSION,
+            record.num_players,
+            -1 if record.winner_idx is None else record.winner_idx,
+            _NO_SEAT if record.human_idx is None else record.human_idx,
+            record.timestamp,
+        ),
+        bytes([len(robot_type)]), robot_type,
+        bytes([len(record.deck)]), _pack_nibbles([_card_nibble(card) for card in record.deck]),
+        _COUNT.pack(len(record.actions)), _pack_nibbles(record.actions),
+    ])
+    return _FRAME.pack(MAGIC, len(payload), zlib.crc32(payload)) + payload
+
+
+def decode_record(payload: bytes) -> GameRecord:
+    """A record from its payload (the bytes after the frame header)."""
+    version, num_players, winner_idx, human_idx, timestamp = _HEADER.unpack_from(payload, 0)
+    if version != RECORD_VERSION:
+        raise ValueError(f"Unsupported record version {version}")
+    offset = _HEADER.size
+    robot_type = payload[offset + 1:offset + 1 + payload[offset]].decode()
+    offset += 1 + payload[offset]
+    deck_len = payload[offset]
+    deck_bytes = payload[offset + 1:offset + 1 + (deck_len + 1) // 2]
+    offset += 1 + len(deck_bytes)
+    (num_actions,) = _COUNT.unpack_from(payload, offset)
+    offset += _COUNT.size
+    return GameRecord(
+        num_players=num_players,
+        deck=[_nibble_card(n) for n in _unpack_nibbles(deck_bytes, deck_len)],
+        actions=_unpack_nibbles(payload[offset:offset + (num_actions + 1) // 2], num_actions),
+        winner_idx=None if winner_idx < 0 else winner_idx,
+        human_idx=None if human_idx == _NO_SEAT else human_idx,
+        robot_type=robot_type,
+        timestamp=timestamp,
+    )
+
+
+def read_records(path: str | os.PathLike) -> Iterator[GameRecord]:
+    """Every intact record in the log, skipping any torn by a crash."""
+    with open(path, "rb") as f:
+        data = f.read()
+    offset = 0
+    while True:
+        offset = data.find(MAGIC, offset)
+        if offset < 0 or offset + _FRAME.size > len(data):
+            return
+        _, length, crc = _FRAME.unpack_from(data, offset)
+        start = offset + _FRAME.size
+        payload = data[start:start + length]
+        if len(payload) == length and zlib.crc32(payload) == crc:
+            try:
+                record = decode_record(payload)
+            except (ValueError, IndexError, struct.error):
+                record = None
+            if record is not None:
+                yield record
+                offset = start + length
+                continue
+        # Not a whole record: look for the next one
+        offset += 1
+
+
+class _ReplayAgent:
+    """Plays a recorded game's actions; every seat shares the one action stream."""
+
+    def __init__(self, player_id: int, actions: Iterator[int]):
+        self.player_id = player_id
+        self.actions = actions
+
+    def get_action(self, observation: np.ndarray, action_mask: np.ndarray) -> tuple[int, float]:
+        action = next(self.actions)
+        if not action_mask[action]:
+            raise ValueError(f"Recorded action {action} is illegal on replay")
+        return action, 0.0
+
+
+def replay_trajectories(record: GameRecord, max_steps: int = 1000) -> dict[int, dict[str, np.ndarray]]:
+    """Every seat's trajectory in `collect_trajectories_discrete` format (log_probs are 0)."""
+    from high_society.main import collect_trajectories_discrete
+
+    env = DiscreteHighSocietyEnv(num_players=record.num_players)
+    actions = iter(record.actions)
+    agents = [_ReplayAgent(seat, actions) for seat in range(record.num_players)]
+    return collect_trajectories_discrete(env, agents, max_steps=max_steps, deck=record.deck)
+
+
+class GameLogWriter:
+    """Appends records to a log file from a background thread.
+
+    `append` never blocks: when `max_pending` records are already waiting, the
+    record is dropped and counted. Records are written and fsynced in batches,
+    one batch per `flush_interval_s` at most, so a crash loses at most that
+    much. One writer per file; give each process its own file.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        flush_interval_s: float = DEFAULT_FLUSH_INTERVAL_S,
+        max_pending: int = DEFAULT_MAX_PENDING,
+    ):
+        self.path = path
+        self.flush_interval_s = flush_interval_s
+        self._queue: queue.Queue[bytes | None] = queue.Queue(max_pending)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "ab")
+        self.written = 0
+        self.dropped = 0
+        self.fsyncs = 0
+        self._worker = threading.Thread(target=self._run, name="game-log-writer", daemon=True)
+        self._worker.start()
+
+    def append(self, record: GameRecord):
+        try:
+            self._queue.put_nowait(encode_record(record))
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        """Write out everything appended so far and close the file."""
+        if self._worker.is_alive():
+            self._queue.put(None)
+            self._worker.join()
+        self._file.close()
+
+    def _collect_batch(self, first: bytes) -> tuple[list[bytes], bool]:
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval_s
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return batch, False
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                return batch, False
+            if item is None:
+                return batch, True
+            batch.append(item)
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch, closing = self._collect_batch(first)
+            self._file.write(b"".join(batch))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.written += len(batch)
+            self.fsyncs += 1
+            if closing:
+                return
@@ -0,0 +1,306 @@
+"""Round-robin league evaluation of DQN checkpoints.
+
+Schedules seat-balanced 3-5 player matches among the `dqn_agent_v*.pth`
+checkpoints in a pool directory and a few random baselines, plays them across
+a process pool and keeps incremental Elo ratings. The final standings are
+written to a leaderboard JSON file.
+
+Workers load the checkpoints as frozen NumpyQNetworks and play each chunk of
+matches in lockstep, so every checkpoint makes one batched forward pass per
+step for all the games where it is to move.
+
+Usage:
+    python -m high_society.league --pool ./experiments/results/pool --games 5000
+"""
+import argparse
+import json
+import os
+import random
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from high_society.agents import DiscreteAgent, DiscreteRandomPassAgent
+from high_society.environments.discrete import DiscreteHighSocietyEnv, MAX_NUM_PLAYERS, PrestigeCard
+from high_society.numpy_policy import NumpyDQNAgent, NumpyQNetwork, masked_argmax
+from high_society.utils import cat_dict_array
+
+RANDOM_BASELINES = {
+    "random_0.2": 0.2,
+    "random_0.5": 0.5,
+    "random_0.8": 0.8,
+}
+MIN_NUM_PLAYERS = 3
+
+
+@dataclass
+class Match:
+    """A single game: who sits in which seat and which deck seed is used."""
+    seats: list[str]
+    seed: int
+
+
+@dataclass
+class MatchResult:
+    seats: list[str]
+    winner_seat: int | None
+
+
+@dataclass
+class Standing:
+    rating: float
+    games: int = 0
+    wins: int = 0
+
+
+@dataclass
+class EloRatings:
+    """Multiplayer Elo, updated incrementally one game at a time.
+
+    Each game is scored as a set of pairwise results: the winner beats every
+    other seat and the remaining seats draw with each other. The K-factor is
+    split across the opponents so a game moves a rating about as much as a
+    single two-player game would.
+    """
+    k_factor: float = 32.0
+    initial_rating: float = 1500.0
+    standings: dict[str, Standing] = field(default_factory=dict)
+
+    def _get(self, name: str) -> Standing:
+        if name not in self.standings:
+            self.standings[name] = Standing(rating=self.initial_rating)
+        return self.standings[name]
+
+    def update(self, result: MatchResult):
+        players = [self._get(name) for name in result.seats]
+        ratings = [p.rating for p in players]
+        k = self.k_factor / (len(players) - 1)
+
+        deltas = np.zeros(len(players))
+        for i in range(len(players)):
+            for j in range(len(players)):
+                if i == j:
+                    continue
+                expected = 1.0 / (1.0 + 10 ** ((ratings[j] - ratings[i]) / 400))
+                if result.winner_seat == i:
+                    score = 1.0
+                elif result.winner_seat == j:
+                    score = 0.0
+                else:
+                    score = 0.5
+                deltas[i] += k * (score - expected)
+
+        for seat, player in enumerate(players):
+            player.rating += float(deltas[seat])
+            player.games += 1
+            if result.winner_seat == seat:
+                player.wins += 1
+
+    def leaderboard(self) -> list[dict]:
+        rows = [
+            {
+                "name": name,
+                "rating": round(s.rating, 1),
+                "games": s.games,
+                "wins": s.wins,
+                "win_rate": s.wins / s.games if s.games > 0 else 0.0,
+            }
+            for name, s in self.standings.items()
+        ]
+        return sorted(rows, key=lambda row: row["rating"], reverse=True)
+
+
+def schedule_matches(entries: list[str], num_games: int, seed: int | None = None) -> list[Match]:
+    """Schedule roughly num_games seat-balanced matches.
+
+    Participants are sampled per group, then the group plays every rotation
+    of the seating with the same deck seed, so no entry gains from always
+    sitting in the starting seat or from a lucky shuffle.
+    """
+    if len(entries) < MIN_NUM_PLAYERS:
+        raise ValueError(f"Need at least {MIN_NUM_PLAYERS} league entries, got {len(entries)}")
+
+    rng = random.Random(seed)
+    max_players = min(MAX_NUM_PLAYERS, len(entries))
+    matches: list[Match] = []
+    while len(matches) < num_games:
+        num_players = rng.randint(MIN_NUM_PLAYERS, max_players)
+        group = rng.sample(entries, num_players)
+        deck_seed = rng.randrange(2**31)
+        for shift in range(num_players):
+            seats = group[shift:] + group[:shift]
+            matches.append(Match(seats=seats, seed=deck_seed))
+    return matches
+
+
+# --- Worker process state ---
+_worker_pool_dir: str | None = None
+_worker_agents: dict[str, DiscreteAgent | NumpyDQNAgent] = {}
+_worker_envs: dict[int, list[DiscreteHighSocietyEnv]] = defaultdict(list)
+
+
+def _init_worker(pool_dir: str):
+    global _worker_pool_dir
+    _worker_pool_dir = pool_dir
+
+
+def _get_worker_agent(name: str) -> DiscreteAgent | NumpyDQNAgent:
+    """Load each league entry once per worker process and keep it frozen."""
+    if name not in _worker_agents:
+        if name in RANDOM_BASELINES:
+            agent = DiscreteRandomPassAgent(player_id=0, pass_probability=RANDOM_BASELINES[name])
+        else:
+            agent = NumpyDQNAgent(player_id=0, q_net=NumpyQNetwork.from_checkpoint(os.path.join(_worker_pool_dir, name)))
+        _worker_agents[name] = agent
+    return _worker_agents[name]
+
+
+def _winner_seat(env: DiscreteHighSocietyEnv) -> int | None:
+    for seat, agent_name in enumerate(env.agents):
+        if env.rewards[agent_name] > 0:
+            return seat
+    return None
+
+
+def match_deck(seed: int) -> list[PrestigeCard]:
+    """The prestige cards in draw order for a match's deck seed, from its own generator."""
+    cards = [
+        *[PrestigeCard(type="value", value=i) for i in range(1, 10)],
+        *[PrestigeCard(type="special", speciality="2x") for _ in range(4)],
+    ]
+    return [cards[i] for i in np.random.default_rng(seed).permutation(len(cards))]
+
+
+def play_matches(
+    envs: list[DiscreteHighSocietyEnv],
+    seatings: list[list[DiscreteAgent | NumpyDQNAgent]],
+    seeds: list[int],
+    max_steps: int = 1000,
+) -> list[int | None]:
+    """Play one game per env in lockstep, seatings[g][i] in seat i of game g; returns each winning seat.
+
+    On every step the NumpyDQNAgents to move are grouped by agent, and each
+    group's observations go through its q_net as one batch. Other agents act
+    one game at a time. Decks come from match_deck, so the games don't
+    reseed the global RNGs the agents may draw from.
+    """
+    for env, agents, seed in zip(envs, seatings, seeds):
+        env.reset(num_players=len(agents), options={"deck": match_deck(seed)})
+
+    active = list(range(len(envs)))
+    for _ in range(max_steps):
+        active = [g for g in active if not all(envs[g].terminations.values())]
+        if not active:
+            break
+
+        actions: dict[int, int] = {}
+        batched: dict[NumpyDQNAgent, list[tuple[int, np.ndarray, np.ndarray]]] = defaultdict(list)
+        for g in active:
+            env = envs[g]
+            agent_name = env.agent_selection
+            agent = seatings[g][env.agents.index(agent_name)]
+            obs = cat_dict_array(env.observe(agent_name))
+            action_mask = env.get_action_mask(agent_name)
+            if isinstance(agent, NumpyDQNAgent):
+                batched[agent].append((g, obs, action_mask))
+            else:
+                actions[g], _ = agent.get_action(obs, action_mask)
+        for agent, moves in batched.items():
+            games, observations, action_masks = zip(*moves)
+            chosen = masked_argmax(agent.q_net(np.stack(observations)), np.stack(action_masks))
+            actions.update(zip(games, chosen.tolist()))
+
+        for g in active:
+            envs[g].step(actions[g])
+
+    return [_winner_seat(env) for env in envs]
+
+
+def play_match(env: DiscreteHighSocietyEnv, agents: list[DiscreteAgent], seed: int, max_steps: int = 1000) -> int | None:
+    """Play one game with agents[i] in seat i and return the winning seat (None if nobody won)."""
+    return play_matches([env], [agents], [seed], max_steps=max_steps)[0]
+
+
+def _play_matches(matches: list[Match], max_steps: int) -> list[MatchResult]:
+    """Play a chunk of matches together, each in its own (reused) env."""
+    envs = []
+    used: dict[int, int] = defaultdict(int)
+    for match in matches:
+        num_players = len(match.seats)
+        pool = _worker_envs[num_players]
+        if used[num_players] == len(pool):
+            pool.append(DiscreteHighSocietyEnv(num_players=num_players))
+        envs.append(pool[used[num_players]])
+        used[num_players] += 1
+
+    seatings = [[_get_worker_agent(name) for name in match.seats] for match in matches]
+    winner_seats = play_matches(envs, seatings, [match.seed for match in matches], max_steps=max_steps)
+    return [MatchResult(seats=match.seats, winner_seat=winner) for match, winner in zip(matches, winner_seats)]
+
+
+def list_pool_entries(pool_dir: str) -> list[str]:
+    checkpoints = sorted(f for f in os.listdir(pool_dir) if f.endswith(".pth"))
+    return checkpoints + list(RANDOM_BASELINES)
+
+
+def write_leaderboard(ratings: EloRatings, path: str, num_games: int):
+    with open(path, "w") as f:
+        json.dump({"games": num_games, "leaderboard": ratings.leaderboard()}, f, indent=2)
+
+
+def run_league(
+    pool_dir: str,
+    num_games: int,
+    leaderboard_path: str,
+    num_workers: int | None = None,
+    chunk_size: int = 200,
+    max_steps: int = 1000,
+    seed: int | None = None,
+) -> EloRatings:
+    """Play a league among all pool checkpoints and the random baselines.
+
+    Matches are sent to the workers in chunks and ratings are updated as each
+    chunk comes back. Chunks finish out of order, which is fine for Elo.
+    """
+    entries = list_pool_entries(pool_dir)
+    matches = schedule_matches(entries, num_games, seed=seed)
+    chunks = [matches[i:i + chunk_size] for i in range(0, len(matches), chunk_size)]
+
+    ratings = EloRatings()
+    games_played = 0
+    wins_by_seat: dict[int, int] = defaultdict(int)
+    with ProcessPoolExecutor(max_workers=num_workers, initializer=_init_worker, initargs=(pool_dir,)) as executor:
+        futures = [executor.submit(_play_matches, chunk, max_steps) for chunk in chunks]
+        for future in as_completed(futures):
+            results = future.result()
+            for result in results:
+                ratings.update(result)
+                if result.winner_seat is not None:
+                    wins_by_seat[result.winner_seat] += 1
+            games_played += len(results)
+            print(f"Played {games_played}/{len(matches)} games")
+
+    write_leaderboard(ratings, leaderboard_path, games_played)
+    print("\n=== Leaderboard ===\n")
+    for rank, row in enumerate(ratings.leaderboard(), start=1):
+        print(f"{rank:>3}. {row['name']:<24} {row['rating']:>7.1f}  ({row['wins']}/{row['games']} wins)")
+    print(f"Wins by seat: {dict(sorted(wins_by_seat.items()))}")
+    return ratings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank pool checkpoints with a round-robin league")
+    parser.add_argument("--pool", default="./experiments/results/pool", help="Directory of .pth checkpoints")
+    parser.add_argument("--games", type=int, default=5000, help="Approximate number of games to play")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--out", default="./experiments/results/leaderboard.json", help="Leaderboard output path")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    run_league(args.pool, args.games, args.out, num_workers=args.workers, seed=args.seed)
+
+
+if __name__ == "__main__":
+    main()
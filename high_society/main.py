@@ -1,16 +1,21 @@
+from __future__ import annotations
+
 from collections import defaultdict
 import os
 from datetime import datetime
 import random
+from typing import TYPE_CHECKING
 
 import numpy as np
-import torch
-from torch.utils.tensorboard import SummaryWriter
-from high_society.environments.simple import SimpleHighSocietyEnv
-from high_society.environments.discrete import DiscreteHighSocietyEnv
+from high_society.environments.discrete import DiscreteHighSocietyEnv, PrestigeCard
 from high_society.agents import VanillaPGAgent, RandomAgent, Agent, DiscreteAgent, DiscreteRandomPassAgent, DQNAgent
 from high_society.utils import cat_dict_array
 
+# torch and TensorBoard are only needed by the training loops, so they are
+# imported there; collecting trajectories stays cheap to import.
+if TYPE_CHECKING:
+    from high_society.environments.simple import SimpleHighSocietyEnv
+
 
 def collect_trajectories_simple(
     env: SimpleHighSocietyEnv,
@@ -114,7 +119,9 @@ def collect_trajectories_simple(
 def collect_trajectories_discrete(
     env: DiscreteHighSocietyEnv,
     agents: list[DiscreteAgent],
-    max_steps: int = 1000
+    max_steps: int = 1000,
+    seed: int | None = None,
+    deck: list[PrestigeCard] | None = None,
 ) -> dict[int, dict[str, np.ndarray]]:
     """Run a game episode and collect trajectory data for discrete action space.
 
@@ -122,6 +129,8 @@ def collect_trajectories_discrete(
         env: The DiscreteHighSocietyEnv environment
         agents: List of DiscreteAgent instances
         max_steps: Maximum steps before truncating
+        seed: Optional seed for the deck shuffle, so games can be replayed on the same deck
+        deck: Optional prestige cards in draw order, instead of a shuffled deck
 
     Returns:
         Dict mapping player_id to trajectory data containing:
@@ -134,7 +143,7 @@ def collect_trajectories_discrete(
         - truncateds: (T,) array
         - won: bool
     """
-    env.reset()
+    env.reset(seed=seed, options={"deck": deck} if deck is not None else None)
 
     agent_lookup = {f"player_{agent.player_id}": agent for agent in agents}
 
@@ -207,6 +216,8 @@ def collect_trajectories_discrete(
     return result
 
 def run_sessions(num_sessions: int, batch_size: int, training_steps: int, max_steps: int) -> DQNAgent:
+    import torch
+    from torch.utils.tensorboard import SummaryWriter
 
     dqn_agent = None
     wins_by_pass_prob: dict[float, int] = defaultdict(int)
@@ -277,6 +288,8 @@ def run_sessions(num_sessions: int, batch_size: int, training_steps: int, max_st
     return dqn_agent
 
 def run_self_play(env: DiscreteHighSocietyEnv, learning_agent: DQNAgent, dqn_pool: list[str], max_steps: int, training_steps: int, batch_size: int) -> None:
+    import torch
+    from torch.utils.tensorboard import SummaryWriter
 
     now = datetime.now()
     writer = SummaryWriter(f"runs/self_play{now}")
@@ -368,7 +381,103 @@ def run_self_play(env: DiscreteHighSocietyEnv, learning_agent: DQNAgent, dqn_poo
 
     return learning_agent
 
+def evaluate_against_pool(learning_agent: DQNAgent, opponents: list[DiscreteAgent], num_games: int, max_steps: int, seed: int | None = None) -> float:
+    """Greedy win rate of `learning_agent` in 3-5 player games against opponents drawn from `opponents`.
+
+    The learning agent's seat rotates from game to game.
+    """
+    from high_society.league import play_match
+
+    rng = random.Random(seed)
+    env = DiscreteHighSocietyEnv()
+    epsilon = learning_agent.epsilon
+    learning_agent.epsilon = 0.0
+    wins = 0
+    try:
+        for game in range(num_games):
+            agents = [rng.choice(opponents) for _ in range(rng.randint(2, 4))]
+            seat = game % (len(agents) + 1)
+            agents.insert(seat, learning_agent)
+            if play_match(env, agents, seed=rng.randrange(2**31), max_steps=max_steps) == seat:
+                wins += 1
+    finally:
+        learning_agent.epsilon = epsilon
+    return wins / num_games
+
+def run_offline(
+    learning_agent: DQNAgent,
+    dataset_dir: str,
+    dqn_pool: list[str],
+    epochs: int,
+    batch_size: int,
+    cql_alpha: float = 0.0,
+    eval_every: int = 1000,
+    eval_games: int = 100,
+    max_steps: int = 500,
+    prefetch: int = 4,
+    seed: int | None = None,
+) -> DQNAgent:
+    """Train on a stored TrajectoryDataset instead of playing games.
+
+    Batches are read and moved to the learner's device on a background thread,
+    so the learner runs at its own speed. Every `eval_every` updates the greedy
+    agent plays `eval_games` games against the `dqn_pool` checkpoints (random
+    agents if the pool is empty). `cql_alpha` > 0 trains the conservative
+    variant, see DQNAgent.update_from_batch.
+    """
+    import time
+
+    import torch
+    from torch.utils.tensorboard import SummaryWriter
+
+    from high_society.dataset import BatchPrefetcher, TrajectoryDataset
+
+    now = datetime.now()
+    writer = SummaryWriter(f"runs/offline{now}")
+
+    dataset = TrajectoryDataset(dataset_dir)
+    env = DiscreteHighSocietyEnv()
+    opponents: list[DiscreteAgent] = [
+        DQNAgent.from_checkpoint(f"./experiments/results/pool/{path}", player_id=0, num_actions=env.num_actions, obs_space=env.observation_space("player_0"), device="cpu")
+        for path in dqn_pool
+    ] or [DiscreteRandomPassAgent(player_id=0, pass_probability=p) for p in (0.2, 0.5, 0.8)]
+
+    step = 0
+    for epoch in range(epochs):
+        batches = dataset.iter_batches(batch_size, seed=None if seed is None else seed + epoch, drop_last=True)
+        window_start = time.perf_counter()
+        window_transitions = 0
+        with BatchPrefetcher(batches, learning_agent.device, depth=prefetch) as prefetcher:
+            for batch in prefetcher:
+                metrics = learning_agent.update_from_batch(batch, cql_alpha=cql_alpha)
+                step += 1
+                window_transitions += batch_size
+
+                writer.add_scalar("train/loss", metrics["loss"], step)
+                writer.add_scalar("q_values/mean_predicted", metrics["mean_q"], step)
+                writer.add_scalar("q_values/mean_target", metrics["mean_target"], step)
+                writer.add_scalar("q_values/error", metrics["q_error"], step)
+                if "cql_penalty" in metrics:
+                    writer.add_scalar("train/cql_penalty", metrics["cql_penalty"], step)
+
+                if step % eval_every == 0:
+                    elapsed = time.perf_counter() - window_start
+                    writer.add_scalar("train/transitions_per_s", window_transitions / elapsed, step)
+                    with torch.no_grad():
+                        win_rate = evaluate_against_pool(learning_agent, opponents, eval_games, max_steps, seed=step)
+                    writer.add_scalar("eval/win_rate", win_rate, step)
+                    writer.flush()
+                    print(f"Epoch {epoch + 1}/{epochs}: Step {step}: {window_transitions / elapsed:.0f} transitions/s, eval win rate {100 * win_rate:.1f}%")
+                    window_start = time.perf_counter()
+                    window_transitions = 0
+
+    writer.close()
+
+    return learning_agent
+
 def run_tournament(max_steps: int, training_steps: int, batch_size: int, sessions: int) -> None:
+    import torch
+
     learning_agent_path = "./experiments/results/pool/dqn_agent_v3.pth"
 
     version = 4
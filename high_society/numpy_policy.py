@@ -0,0 +1,172 @@
+"""Torch-free inference for trained DQN policies.
+
+Reads a `torch.save`d q_net state dict straight from the .pth zip archive into
+NumPy arrays and runs the `build_discrete_mlp` architecture (Linear + ReLU
+layers, raw outputs) as a NumPy forward pass. Nothing in this module imports
+torch, so serving processes can use trained weights without paying for it.
+"""
+import collections
+import json
+import os
+import pickle
+import zipfile
+
+import numpy as np
+
+# torch storage class name -> NumPy dtype
+_STORAGE_DTYPES = {
+    "FloatStorage": np.float32,
+    "DoubleStorage": np.float64,
+    "HalfStorage": np.float16,
+    "LongStorage": np.int64,
+    "IntStorage": np.int32,
+    "ShortStorage": np.int16,
+    "CharStorage": np.int8,
+    "ByteStorage": np.uint8,
+    "BoolStorage": np.bool_,
+}
+
+
+def _rebuild_tensor(storage, storage_offset, size, stride, *args):
+    """Stand-in for torch._utils._rebuild_tensor_v2 that returns a NumPy array."""
+    itemsize = storage.dtype.itemsize
+    view = np.lib.stride_tricks.as_strided(
+        storage[storage_offset:],
+        shape=tuple(size),
+        strides=tuple(s * itemsize for s in stride),
+    )
+    return np.array(view)
+
+
+class _StateDictUnpickler(pickle.Unpickler):
+    """Unpickles a torch state dict, allowing only the globals a state dict needs."""
+
+    def __init__(self, file, archive: zipfile.ZipFile, prefix: str, byteorder: str):
+        super().__init__(file)
+        self.archive = archive
+        self.prefix = prefix
+        self.byteorder = byteorder
+
+    def find_class(self, module, name):
+        if (module, name) == ("collections", "OrderedDict"):
+            return collections.OrderedDict
+        if (module, name) == ("torch._utils", "_rebuild_tensor_v2"):
+            return _rebuild_tensor
+        if module == "torch" and name in _STORAGE_DTYPES:
+            return _STORAGE_DTYPES[name]
+        raise pickle.UnpicklingError(f"Unsupported global in state dict: {module}.{name}")
+
+    def persistent_load(self, pid):
+        typename, dtype, key, _location, numel = pid
+        if typename != "storage":
+            raise pickle.UnpicklingError(f"Unsupported persistent id: {typename}")
+        dtype = np.dtype(dtype).newbyteorder("<" if self.byteorder == "little" else ">")
+        data = self.archive.read(f"{self.prefix}/data/{key}")
+        return np.frombuffer(data, dtype=dtype, count=numel).astype(dtype.newbyteorder("="))
+
+
+def load_state_dict_numpy(path: str | os.PathLike) -> dict[str, np.ndarray]:
+    """Load a state dict saved with `torch.save(module.state_dict(), path)` as NumPy arrays."""
+    with zipfile.ZipFile(path) as archive:
+        names = archive.namelist()
+        pkl_name = next(n for n in names if n.endswith("/data.pkl"))
+        prefix = pkl_name[: -len("/data.pkl")]
+        byteorder_name = f"{prefix}/byteorder"
+        byteorder = archive.read(byteorder_name).decode() if byteorder_name in names else "little"
+        with archive.open(pkl_name) as f:
+            return dict(_StateDictUnpickler(f, archive, prefix, byteorder).load())
+
+
+class NumpyQNetwork:
+    """NumPy forward pass of a `build_discrete_mlp` network.
+
+    Weights are stored transposed so a batch of observations is a chain of
+    `x @ W + b` with a ReLU between hidden layers.
+    """
+
+    def __init__(self, weights: list[np.ndarray], biases: list[np.ndarray]):
+        assert len(weights) == len(biases)
+        self.weights = weights
+        self.biases = biases
+
+    @classmethod
+    def from_state_dict(cls, state_dict: dict[str, np.ndarray]) -> "NumpyQNetwork":
+        # nn.Sequential names the Linear layers "0", "2", "4", ... (ReLUs have no parameters)
+        layer_ids = sorted({int(k.split(".")[0]) for k in state_dict if k.endswith(".weight")})
+        weights = [np.ascontiguousarray(state_dict[f"{i}.weight"].T, dtype=np.float32) for i in layer_ids]
+        biases = [np.ascontiguousarray(state_dict[f"{i}.bias"], dtype=np.float32) for i in layer_ids]
+        return cls(weights, biases)
+
+    @classmethod
+    def from_checkpoint(cls, path: str | os.PathLike) -> "NumpyQNetwork":
+        return cls.from_state_dict(load_state_dict_numpy(path))
+
+    def save_flat(self, path: str | os.PathLike):
+        """Write all parameters to one .npy file (plus a .json layout) that `load_flat` can memory-map."""
+        layout = [list(w.shape) for w in self.weights]
+        flat = np.concatenate([p.ravel() for w, b in zip(self.weights, self.biases) for p in (w, b)])
+        np.save(path, flat.astype(np.float32))
+        with open(f"{path}.json", "w") as f:
+            json.dump({"layers": layout}, f)
+
+    @classmethod
+    def load_flat(cls, path: str | os.PathLike) -> "NumpyQNetwork":
+        """Memory-map a file written by `save_flat`.
+
+        The parameters are read-only views into the mapping, so every process
+        that maps the same file shares one copy of the weights in the page cache.
+        """
+        with open(f"{path}.json") as f:
+            layout = json.load(f)["layers"]
+        flat = np.load(path, mmap_mode="r")
+        weights, biases = [], []
+        offset = 0
+        for n_in, n_out in layout:
+            weights.append(flat[offset:offset + n_in * n_out].reshape(n_in, n_out))
+            offset += n_in * n_out
+            biases.append(flat[offset:offset + n_out])
+            offset += n_out
+        return cls(weights, biases)
+
+    @property
+    def obs_dim(self) -> int:
+        return self.weights[0].shape[0]
+
+    @property
+    def num_actions(self) -> int:
+        return self.weights[-1].shape[1]
+
+    def __call__(self, observations: np.ndarray) -> np.ndarray:
+        """Q-values for a single observation (obs_dim,) or a batch (B, obs_dim)."""
+        x = np.asarray(observations, dtype=np.float32)
+        last = len(self.weights) - 1
+        for i, (w, b) in enumerate(zip(self.weights, self.biases)):
+            x = x @ w + b
+            if i < last:
+                np.maximum(x, 0, out=x)
+        return x
+
+
+def masked_argmax(q_values: np.ndarray, action_masks: np.ndarray) -> np.ndarray:
+    """Greedy action per row, never choosing an action whose mask is False."""
+    return np.where(action_masks, q_values, -np.inf).argmax(axis=-1)
+
+
+class NumpyDQNAgent:
+    """Greedy DQN policy backed by a NumpyQNetwork.
+
+    Same `get_action` interface as DiscreteAgent, without importing torch.
+    """
+
+    def __init__(self, player_id: int, q_net: NumpyQNetwork):
+        self.player_id = player_id
+        self.q_net = q_net
+
+    def get_action(self, observation: np.ndarray, action_mask: np.ndarray) -> tuple[int, float]:
+        """Get the greedy valid action.
+
+        Returns:
+            Tuple of (action index, log_prob placeholder)
+        """
+        q_vals = self.q_net(observation)
+        return int(masked_argmax(q_vals, action_mask)), 0.0
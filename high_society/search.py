@@ -0,0 +1,113 @@
+"""Anytime rollout search for robot moves.
+
+Each legal action is scored by Monte Carlo rollouts: copy the game, shuffle
+the undrawn prestige cards (the order isn't known to the players), play the
+action, then play every seat with the rollout policy to the end of the game.
+Actions are sampled round-robin until the deadline, so the search can be
+stopped at any point. Until every legal action has been tried, the search
+has no basis for comparing them and returns the fallback policy's action.
+
+Like NumpyDQNAgent, nothing here imports torch.
+"""
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+
+from high_society.environments.discrete import DiscreteHighSocietyEnv
+from high_society.utils import cat_dict_array
+
+MAX_ROLLOUT_STEPS = 1000
+
+
+@dataclass
+class SearchResult:
+    action: int
+    # Rollouts finished before the deadline
+    rollouts: int
+    # False if the deadline came before every legal action was tried once,
+    # in which case `action` is the fallback's
+    completed: bool
+
+
+class AnytimeRolloutAgent:
+    """Robot that searches until a deadline and falls back to a base policy.
+
+    `fallback` and `rollout_agent` have the usual `get_action(observation,
+    action_mask)` interface; typically both are the greedy DQN robot.
+    `make_env(num_players)` builds the scratch envs rollouts are played in.
+    """
+
+    def __init__(
+        self,
+        fallback,
+        rollout_agent,
+        seed: int | None = None,
+        make_env: Callable[[int], DiscreteHighSocietyEnv] = DiscreteHighSocietyEnv,
+    ):
+        self.fallback = fallback
+        self.rollout_agent = rollout_agent
+        self.rng = np.random.default_rng(seed)
+        self.make_env = make_env
+        # One scratch env per player count, reused for every rollout
+        self._scratch: dict[int, DiscreteHighSocietyEnv] = {}
+
+    def search(self, env: DiscreteHighSocietyEnv, deadline: float) -> SearchResult:
+        """Best action for the seat to move in `env`, found before `deadline` (a time.perf_counter() value).
+
+        `env` itself is not modified.
+        """
+        agent_name = env.agent_selection
+        seat = env.agents.index(agent_name)
+        mask = env.get_action_mask(agent_name)
+        fallback_action, _ = self.fallback.get_action(cat_dict_array(env.observe(agent_name)), mask)
+
+        actions = np.flatnonzero(mask)
+        if len(actions) == 1:
+            return SearchResult(action=int(actions[0]), rollouts=0, completed=True)
+
+        totals = np.zeros(len(actions))
+        counts = np.zeros(len(actions), dtype=np.int64)
+        i = 0
+        while time.perf_counter() < deadline:
+            reward = self._rollout(env, seat, int(actions[i]), deadline)
+            if reward is None:
+                break
+            totals[i] += reward
+            counts[i] += 1
+            i = (i + 1) % len(actions)
+
+        rollouts = int(counts.sum())
+        if counts.min() == 0:
+            return SearchResult(action=int(fallback_action), rollouts=rollouts, completed=False)
+        means = totals / counts
+        # Ties go to the fallback's choice
+        best = np.flatnonzero(means == means.max())
+        fallback_pos = np.flatnonzero(actions == fallback_action)
+        pos = fallback_pos[0] if len(fallback_pos) and fallback_pos[0] in best else best[0]
+        return SearchResult(action=int(actions[pos]), rollouts=rollouts, completed=True)
+
+    def _rollout(self, env: DiscreteHighSocietyEnv, seat: int, action: int, deadline: float) -> float | None:
+        """`seat`'s final reward after playing `action`, or None if the deadline passed first."""
+        num_players = env.num_players
+        if num_players not in self._scratch:
+            self._scratch[num_players] = self.make_env(num_players)
+        sim = self._scratch[num_players]
+
+        game_state = env.game_state.model_copy(deep=True)
+        self.rng.shuffle(game_state.remaining_prestige_cards)
+        sim.restore_from_state(game_state, seat)
+        sim.step(action)
+
+        for _ in range(MAX_ROLLOUT_STEPS):
+            if all(sim.terminations.values()):
+                return sim.rewards[sim.agents[seat]]
+            if time.perf_counter() >= deadline:
+                return None
+            agent_name = sim.agent_selection
+            rollout_action, _ = self.rollout_agent.get_action(
+                cat_dict_array(sim.observe(agent_name)), sim.get_action_mask(agent_name),
+            )
+            sim.step(rollout_action)
+        return None
@@ -1,5 +1,6 @@
+from functools import cache
+
 import numpy as np
-import torch
 
 def cat_dict_array(d: dict[str, np.array]) -> np.array:
     return np.concatenate(
@@ -7,7 +8,11 @@ def cat_dict_array(d: dict[str, np.array]) -> np.array:
         axis=0
     )
 
+@cache
 def get_device():
+    """Pick the torch device on first use (probing CUDA is slow) and reuse it."""
+    import torch
+
     if torch.cuda.is_available():
         return torch.device("cuda")
     return torch.device("cpu")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Measure cold import time of the modules that should stay light.
+
+Each module is imported in a fresh interpreter, so nothing is cached between
+measurements. Also reports whether torch got pulled in along the way.
+
+Usage:
+    python scripts/bench_import_time.py              # Print a table
+    python scripts/bench_import_time.py --max-ms 1500  # Fail if any import is slower
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    "high_society.environments.discrete",
+    "high_society.main",
+    "app.backend.main",
+]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "torch": "torch" in sys.modules}}))
+"""
+
+
+def measure(module: str, repeats: int) -> dict:
+    """Best-of-N cold import time in milliseconds."""
+    runs = []
+    for _ in range(repeats):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module)],
+            cwd=ROOT,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {"ms": min(r["ms"] for r in runs), "torch": any(r["torch"] for r in runs)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cold import time")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per module, the fastest is reported")
+    parser.add_argument("--max-ms", type=float, default=None, help="Exit non-zero if any import takes longer")
+    args = parser.parse_args()
+
+    failed = False
+    for module in MODULES:
+        result = measure(module, args.repeats)
+        flag = " (imports torch)" if result["torch"] else ""
+        print(f"{module:<40} {result['ms']:>8.1f} ms{flag}")
+        if args.max_ms is not None and result["ms"] > args.max_ms:
+            failed = True
+
+    if failed:
+        print(f"Error: at least one import exceeded {args.max_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Compare per-response JSON encode time and size of the game responses.
+
+Responses are collected from random games, then encoded by:
+    fastapi   what FastAPI does with a returned model: check it against the
+              response model, then dump it to JSON bytes
+    jsonable  the older FastAPI path: jsonable_encoder, then json.dumps
+    rendered  what the game endpoints do now: the model's compiled serializer
+              (app.backend.main._rendered)
+
+Usage:
+    python scripts/bench_serialization.py
+    python scripts/bench_serialization.py --games 50 --repeats 20
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+
+from app.backend import main as backend  # noqa: E402
+from app.backend.schemas import ActionRequest, GameResponse  # noqa: E402
+
+
+def collect_responses(num_games: int, seed: int) -> list[GameResponse]:
+    """Every response of `num_games` games against random robots, as /api/action returns them."""
+    rng = random.Random(seed)
+    random.seed(seed)
+    cancel = threading.Event()
+    responses = []
+    for _ in range(num_games):
+        response = backend._new_game(rng.randint(3, 5), "random", None, cancel)
+        responses.append(response)
+        while not response.game_over:
+            action = rng.choice([i for i, legal in enumerate(response.action_mask) if legal])
+            req = ActionRequest(
+                game_state=response.game_state,
+                current_agent_idx=response.current_agent_idx,
+                action=action,
+                robot_type="random",
+            )
+            response = backend._submit_action(req, cancel)
+            responses.append(response)
+    return responses
+
+
+def _fastapi_encoder():
+    """The synchronous core of fastapi.routing.serialize_response."""
+    field = next(r for r in backend.app.routes if getattr(r, "path", None) == "/api/action").response_field
+
+    def encode(response: GameResponse) -> bytes:
+        value, _ = field.validate(response, {}, loc=("response",))
+        return field.serialize_json(value)
+    return encode
+
+
+ENCODERS = {
+    "fastapi": _fastapi_encoder,
+    "jsonable": lambda: lambda response: JSONResponse(jsonable_encoder(response)).body,
+    "rendered": lambda: lambda response: backend._ModelJSONResponse(response).body,
+}
+
+
+def bench(encode, responses: list[GameResponse], repeats: int) -> dict:
+    """Best-of-N mean encode time per response."""
+    sizes = [len(encode(response)) for response in responses]
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for response in responses:
+            encode(response)
+        best = min(best, (time.perf_counter() - start) / len(responses))
+    return {
+        "encode_us": round(best * 1e6, 2),
+        "mean_bytes": round(float(np.mean(sizes)), 1),
+        "max_bytes": int(np.max(sizes)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark game response JSON encoding")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    responses = collect_responses(args.games, args.seed)
+    results = {name: bench(make(), responses, args.repeats) for name, make in ENCODERS.items()}
+
+    # Same JSON whichever way it is encoded
+    first = responses[len(responses) // 2]
+    assert len({json.dumps(json.loads(make()(first)), sort_keys=True) for make in ENCODERS.values()}) == 1
+
+    print(json.dumps({"responses": len(responses), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
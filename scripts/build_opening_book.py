@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Build the opening book the backend uses for the first auction.
+
+Plays the DQN robots' replies to every (player count, first card, human first
+action) and writes them, together with the hash of the weights, to JSON. The
+backend only uses a book whose hash matches the weights it serves.
+
+Usage:
+    python scripts/build_opening_book.py
+    python scripts/build_opening_book.py --weights path/to/dqn.pth --output path/to/opening_book.json
+"""
+
+import argparse
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.backend.opening_book import build_opening_book, weights_sha256  # noqa: E402
+from high_society.numpy_policy import NumpyDQNAgent, NumpyQNetwork  # noqa: E402
+
+DEFAULT_WEIGHTS = os.path.join(ROOT, "experiments", "results", "pool", "dqn_agent_v3.pth")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the first-auction opening book")
+    parser.add_argument("--weights", default=DEFAULT_WEIGHTS, help="DQN q_net state dict (.pth)")
+    parser.add_argument("--output", default=None, help="Defaults to opening_book.json next to the weights")
+    args = parser.parse_args()
+
+    output = args.output or os.path.join(os.path.dirname(args.weights), "opening_book.json")
+    robot = NumpyDQNAgent(player_id=0, q_net=NumpyQNetwork.from_checkpoint(args.weights))
+    book = build_opening_book(robot, weights_sha256(args.weights))
+
+    with open(output, "w") as f:
+        json.dump(book, f)
+    print(f"Wrote {len(book['lines'])} lines to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Load test the game API with simulated human players.
+
+Each simulated player starts a game with /api/new-game, then keeps posting a
+random legal move to /api/action until the game is over, and starts the next
+game. Runs against the app in-process (the default) or a running server, once
+per robot type, and prints a JSON report of throughput, latency percentiles
+and errors that can be diffed across builds.
+
+Usage:
+    python scripts/load_test.py                                 # In-process, dqn and random
+    python scripts/load_test.py --concurrency 64 --duration 30
+    python scripts/load_test.py --url http://localhost:8000 --robot-types random
+    python scripts/load_test.py --output results/load_test.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+import httpx
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENDPOINTS = ("/api/new-game", "/api/action")
+PERCENTILES = (50, 90, 95, 99)
+
+
+class Stats:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.games = 0
+
+    def record(self, endpoint: str, seconds: float, error: str | None = None):
+        self.latencies[endpoint].append(seconds)
+        if error is not None:
+            self.errors[error] += 1
+
+    def report(self, elapsed: float) -> dict:
+        requests = sum(len(v) for v in self.latencies.values())
+        errors = sum(self.errors.values())
+        latency_ms = {}
+        for endpoint in ENDPOINTS:
+            samples = np.array(self.latencies.get(endpoint, []), dtype=np.float64) * 1000
+            if len(samples) == 0:
+                continue
+            latency_ms[endpoint] = {
+                "count": len(samples),
+                "mean": round(float(samples.mean()), 3),
+                **{f"p{p}": round(float(np.percentile(samples, p)), 3) for p in PERCENTILES},
+                "max": round(float(samples.max()), 3),
+            }
+        return {
+            "requests": requests,
+            "errors": errors,
+            "error_rate": errors / requests if requests else 0.0,
+            "errors_by_kind": dict(self.errors),
+            "games_completed": self.games,
+            "requests_per_s": requests / elapsed,
+            "games_per_s": self.games / elapsed,
+            "elapsed_s": elapsed,
+            "latency_ms": latency_ms,
+        }
+
+
+async def _timed_request(client: httpx.AsyncClient, stats: Stats, endpoint: str, method: str, **kwargs) -> dict | None:
+    start = time.perf_counter()
+    try:
+        resp = await client.request(method, endpoint, **kwargs)
+    except httpx.HTTPError as e:
+        stats.record(endpoint, time.perf_counter() - start, type(e).__name__)
+        return None
+    elapsed = time.perf_counter() - start
+    if resp.status_code != 200:
+        stats.record(endpoint, elapsed, f"HTTP {resp.status_code}")
+        return None
+    stats.record(endpoint, elapsed)
+    return resp.json()
+
+
+def _random_legal_action(rng: random.Random, action_mask: list[bool]) -> int:
+    return rng.choice([i for i, legal in enumerate(action_mask) if legal])
+
+
+async def _player(client: httpx.AsyncClient, stats: Stats, robot_type: str, deadline: float, rng: random.Random):
+    """Play games back to back until the deadline."""
+    while time.perf_counter() < deadline:
+        num_players = rng.randint(3, 5)
+        body = await _timed_request(
+            client, stats, "/api/new-game", "GET", params={"num_players": num_players, "robot_type": robot_type},
+        )
+        while body is not None and not body["game_over"] and time.perf_counter() < deadline:
+            body = await _timed_request(client, stats, "/api/action", "POST", json={
+                "game_state": body["game_state"],
+                "current_agent_idx": body["current_agent_idx"],
+                "action": _random_legal_action(rng, body["action_mask"]),
+                "robot_type": robot_type,
+            })
+        if body is not None and body["game_over"]:
+            stats.games += 1
+
+
+@asynccontextmanager
+async def _client(url: str | None, timeout: float):
+    if url is not None:
+        async with httpx.AsyncClient(base_url=url, timeout=timeout) as client:
+            yield client
+        return
+
+    sys.path.insert(0, ROOT)
+    from app.backend.main import app
+
+    # Run the app's startup (warm-up) as a server would
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=timeout) as client:
+            yield client
+
+
+async def run_load(url: str | None, robot_type: str, concurrency: int, duration: float, seed: int, timeout: float) -> dict:
+    stats = Stats()
+    async with _client(url, timeout) as client:
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*(
+            _player(client, stats, robot_type, deadline, random.Random(seed + i)) for i in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+    return stats.report(elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the game API with simulated players")
+    parser.add_argument("--url", default=None, help="Server to target, e.g. http://localhost:8000 (default: in-process)")
+    parser.add_argument("--robot-types", nargs="+", default=["dqn", "random"], choices=["dqn", "random"])
+    parser.add_argument("--concurrency", type=int, default=16, help="Simulated players playing at once")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per robot type")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = {
+        "config": {
+            "target": args.url or "in-process",
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "seed": args.seed,
+        },
+        "results": {
+            robot_type: asyncio.run(
+                run_load(args.url, robot_type, args.concurrency, args.duration, args.seed, args.timeout)
+            )
+            for robot_type in args.robot_types
+        },
+    }
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
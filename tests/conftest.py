@@ -0,0 +1,26 @@
+"""Shared fixtures"""
+import pytest
+
+from app.backend.decision_cache import DecisionCache
+
+
+@pytest.fixture
+def dqn_weights(tmp_path, monkeypatch):
+    """Point the backend at freshly initialized DQN weights instead of the trained pool checkpoint."""
+    import torch
+    from app.backend import main
+    from high_society.agents import DQNAgent
+    from high_society.environments.discrete import DiscreteHighSocietyEnv
+
+    env = DiscreteHighSocietyEnv(num_players=5)
+    agent = DQNAgent(player_id=0, num_actions=env.num_actions, obs_space=env.observation_space("player_0"))
+    path = tmp_path / "dqn_agent.pth"
+    torch.save(agent.q_net.state_dict(), path)
+
+    monkeypatch.setattr(main, "_WEIGHTS_PATH", path)
+    monkeypatch.setattr(main, "_policy", None)
+    monkeypatch.setattr(main, "_dqn_robot", None)
+    monkeypatch.setattr(main, "_batcher", None)
+    monkeypatch.setattr(main, "_decision_cache", DecisionCache())
+    monkeypatch.setattr(main, "_opening_book", None)
+    return path
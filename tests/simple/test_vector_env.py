@@ -0,0 +1,100 @@
+"""Tests for the batched simple environment"""
+import numpy as np
+import pytest
+
+from high_society.environments.simple import SimpleHighSocietyEnv
+from high_society.environments.simple_vector import (
+    OBS_DIM,
+    OBS_LAYOUT,
+    SEAT_FIELDS,
+    SPECIAL_CARD,
+    VectorSimpleHighSocietyEnv,
+)
+from high_society.utils import cat_dict_array
+
+
+def _deck_codes(env: SimpleHighSocietyEnv) -> list[int]:
+    """The single env's deck in draw order, as the vector env's card codes."""
+    cards = [env.game_state.cur_round.card, *reversed(env.game_state.remaining_prestige_cards)]
+    return [SPECIAL_CARD if card.type == "special" else card.value for card in cards]
+
+
+def _unpad(obs: np.ndarray, num_players: int) -> np.ndarray:
+    return np.concatenate([
+        obs[columns][:num_players] if field in SEAT_FIELDS else obs[columns]
+        for field, columns in OBS_LAYOUT.items()
+    ])
+
+
+def _random_actions(rng: np.random.Generator, n: int) -> np.ndarray:
+    # Mostly small raises so auctions go a few rounds and money runs low late in the game
+    return np.where(rng.random(n) < 0.4, 0.0, rng.random(n) ** 4).astype(np.float32)
+
+
+def test_matches_single_games_step_for_step():
+    rng = np.random.default_rng(0)
+    num_players = [3, 4, 5] * 10
+    singles = []
+    for i, n in enumerate(num_players):
+        env = SimpleHighSocietyEnv(num_players=n)
+        env.reset(seed=i)
+        singles.append(env)
+    venv = VectorSimpleHighSocietyEnv(len(singles), num_players)
+    venv.reset(options={"decks": [_deck_codes(env) for env in singles]})
+
+    for _ in range(1000):
+        if venv.done.all():
+            break
+        obs = venv.observe()
+        actions = _random_actions(rng, len(singles))
+        for i, env in enumerate(singles):
+            assert venv.done[i] == all(env.terminations.values())
+            if venv.done[i]:
+                continue
+            assert venv.current_seat[i] == env.agents.index(env.agent_selection)
+            np.testing.assert_array_equal(_unpad(obs[i], num_players[i]), cat_dict_array(env.observe(env.agent_selection)))
+            env.step(np.array([actions[i]]))
+        venv.step(actions)
+
+    assert venv.done.all()
+    for i, env in enumerate(singles):
+        n = num_players[i]
+        np.testing.assert_array_equal(venv.money[i, :n], [p.total_money for p in env.game_state.player_states.values()])
+        np.testing.assert_array_equal(venv.prestige[i, :n], [p.total_prestige for p in env.game_state.player_states.values()])
+        rewards = [env.rewards[name] for name in env.agents]
+        # The single env clears the rewards of a game ended by auto-passes
+        if any(rewards):
+            np.testing.assert_array_equal(venv.rewards[i, :n], rewards)
+        assert sorted(venv.rewards[i, :n]) in ([-1.0] * n, [-1.0] * (n - 1) + [1.0])
+        assert not venv.rewards[i, n:].any()
+
+
+def test_observations_are_padded_to_a_fixed_width():
+    venv = VectorSimpleHighSocietyEnv(3, [3, 4, 5])
+    obs = venv.reset(seed=1)
+
+    assert obs.shape == (3, OBS_DIM)
+    assert obs.dtype == np.float32
+    assert sum(space.shape[0] for space in venv.observation_space().spaces.values()) == OBS_DIM
+    for field in SEAT_FIELDS:
+        assert not obs[0, OBS_LAYOUT[field]][3:].any()
+        assert not obs[1, OBS_LAYOUT[field]][4:].any()
+    # Everyone starts with 45 and the first round's starter is seat 0
+    np.testing.assert_array_equal(obs[:, OBS_LAYOUT["remaining_money"]], 45)
+    np.testing.assert_array_equal(obs[:, OBS_LAYOUT["current_round_starter"]][:, 0], 1)
+
+
+def test_finished_games_ignore_actions_and_invalid_intensities_raise():
+    venv = VectorSimpleHighSocietyEnv(4, 3)
+    venv.reset(seed=2)
+    with pytest.raises(ValueError):
+        venv.step(np.full(4, 1.5))
+
+    # Everyone passing discards every card, so each game takes 3 passes per card
+    while not venv.done.all():
+        venv.step(np.zeros(4))
+    rewards = venv.rewards.copy()
+    venv.step(np.full(4, 2.0))
+    np.testing.assert_array_equal(venv.rewards, rewards)
+    # Nobody spent anything: all eliminated, nobody wins
+    np.testing.assert_array_equal(venv.rewards[:, :3], -1)
@@ -0,0 +1,344 @@
+"""Tests for the game API"""
+import json
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.backend.main import app
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def _legal_action(action_mask: list[bool]) -> int:
+    legal = np.flatnonzero(action_mask)
+    # Prefer a bid so games make progress, pass when nothing else is legal
+    return int(legal[-1]) if len(legal) > 1 else 0
+
+
+def test_stateless_game_round_trip(client):
+    resp = client.get("/api/new-game", params={"num_players": 3, "robot_type": "random"})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["current_agent_idx"] == 0
+
+    resp = client.post("/api/action", json={
+        "game_state": body["game_state"],
+        "current_agent_idx": body["current_agent_idx"],
+        "action": _legal_action(body["action_mask"]),
+        "robot_type": "random",
+    })
+    assert resp.status_code == 200
+
+
+def test_session_game_plays_to_completion(client):
+    resp = client.get("/api/session/new-game", params={"num_players": 4, "robot_type": "random"})
+    assert resp.status_code == 200
+    body = resp.json()
+    session_id = body["session_id"]
+    assert "game_state" not in body
+    assert body["auction"]["card"]["type"] in ("value", "special")
+
+    for _ in range(200):
+        if body["game_over"]:
+            break
+        resp = client.post("/api/session/action", json={"session_id": session_id, "action": _legal_action(body["action_mask"])})
+        assert resp.status_code == 200
+        body = resp.json()
+
+    assert body["game_over"]
+    # Finished sessions are dropped
+    resp = client.post("/api/session/action", json={"session_id": session_id, "action": 0})
+    assert resp.status_code == 404
+
+
+def test_session_rejects_illegal_action(client):
+    body = client.get("/api/session/new-game", params={"num_players": 3, "robot_type": "random"}).json()
+
+    resp = client.post("/api/session/action", json={"session_id": body["session_id"], "action": 99})
+    assert resp.status_code == 422
+
+
+def test_unknown_session_is_404(client):
+    resp = client.post("/api/session/action", json={"session_id": "nope", "action": 0})
+    assert resp.status_code == 404
+
+
+def _apply_delta(state: dict, delta: dict) -> dict:
+    state = dict(state, version=delta["version"], current_agent_idx=delta["current_agent_idx"],
+                 action_mask=delta["action_mask"], game_over=delta["game_over"])
+    players = [dict(p) for p in state["players"]]
+    for change in delta.get("changed_players", []):
+        players[change["player_idx"]].update(change)
+    state["players"] = players
+    for key in ("auction", "remaining_special_cards"):
+        if key in delta:
+            state[key] = delta[key]
+    if delta.get("auction_cleared"):
+        state["auction"] = None
+    state["log"] = state.get("log", []) + delta.get("new_log_entries", [])
+    return state
+
+
+def test_session_deltas_rebuild_the_full_state(client):
+    from app.backend.main import _sessions
+
+    state = client.get("/api/session/new-game", params={"num_players": 4, "robot_type": "random"}).json()
+    session_id = state["session_id"]
+
+    for _ in range(3):
+        resp = client.post("/api/session/delta-action", json={
+            "session_id": session_id,
+            "action": _legal_action(state["action_mask"]),
+            "known_version": state["version"],
+        })
+        assert resp.status_code == 200
+        delta = resp.json()
+        assert delta["base_version"] == state["version"]
+        assert delta["version"] == state["version"] + 1
+        assert "full" not in delta
+        state = _apply_delta(state, delta)
+        if state["game_over"]:
+            return
+
+    snapshot = _sessions.get(session_id).snapshots[state["version"]]
+    assert state["players"] == [p.model_dump() for p in snapshot.players]
+    assert state["auction"] == (snapshot.auction.model_dump() if snapshot.auction else None)
+
+
+def test_session_delta_with_unknown_version_sends_full_state(client):
+    from app.backend.main import _sessions
+
+    state = client.get("/api/session/new-game", params={"num_players": 3, "robot_type": "random"}).json()
+    earlier = client.post("/api/session/action", json={"session_id": state["session_id"], "action": 0}).json()
+    history = state["action_log"] + earlier["action_log"]
+
+    resp = client.post("/api/session/delta-action", json={
+        "session_id": state["session_id"],
+        "action": _legal_action(earlier["action_mask"]),
+        "known_version": 999,
+    })
+    delta = resp.json()
+    assert "base_version" not in delta
+    assert delta["full"]["version"] == delta["version"]
+    # The whole history, not just this request's moves
+    assert delta["full"]["action_log"][:len(history)] == history
+    session = _sessions.get(state["session_id"])
+    if session is not None:
+        assert delta["full"]["action_log"] == [entry.model_dump() for entry in session.action_log]
+
+
+def test_session_delta_reports_a_cleared_auction(client):
+    from app.backend.delta import build_delta_response
+    from app.backend.main import _sessions
+    from app.backend.schemas import SessionGameResponse
+
+    state = client.get("/api/session/new-game", params={"num_players": 3, "robot_type": "random"}).json()
+    session = _sessions.get(state["session_id"])
+    base = session.snapshots[state["version"]]
+    ended = SessionGameResponse(**dict(state, auction=None, version=state["version"] + 1))
+
+    delta = build_delta_response(ended, base, state["version"], session.action_log).model_dump(mode="json")
+    assert delta["auction_cleared"] is True
+    assert "auction" not in delta
+
+
+def test_dqn_robots_play_a_session_game(client, dqn_weights):
+    body = client.get("/api/session/new-game", params={"num_players": 5, "robot_type": "dqn"}).json()
+
+    for _ in range(200):
+        if body["game_over"]:
+            break
+        resp = client.post("/api/session/action", json={"session_id": body["session_id"], "action": _legal_action(body["action_mask"])})
+        assert resp.status_code == 200
+        body = resp.json()
+
+    assert body["game_over"]
+
+
+def test_dqn_robot_is_shared_across_seats_and_player_counts(client, dqn_weights, monkeypatch, tmp_path):
+    from app.backend import main
+
+    mmap_path = tmp_path / "policy.npy"
+    monkeypatch.setattr(main, "_WEIGHTS_MMAP_PATH", str(mmap_path))
+    for num_players in (3, 5):
+        body = client.get("/api/new-game", params={"num_players": num_players, "robot_type": "dqn"}).json()
+        assert body["action_mask"]
+
+    assert main._get_dqn_agent() is main._get_dqn_agent()
+    assert mmap_path.exists()
+    assert main._get_policy().weights[0].base is not None
+
+
+def test_repeated_openings_are_answered_from_the_decision_cache(client, dqn_weights):
+    import random
+    from app.backend import main
+
+    state = random.getstate()
+    try:
+        for _ in range(3):
+            # Same shuffle every game, so the robots face the same opening
+            random.seed(0)
+            body = client.get("/api/session/new-game", params={"num_players": 4, "robot_type": "dqn"}).json()
+            client.post("/api/session/action", json={"session_id": body["session_id"], "action": 0})
+    finally:
+        random.setstate(state)
+
+    stats = client.get("/api/health").json()["decision_cache"]
+    assert stats["hits"] > 0
+    assert stats["size"] == len(main._decision_cache)
+
+
+def test_metrics_endpoint_reports_request_phases(client):
+    state = client.get("/api/new-game", params={"num_players": 3, "robot_type": "random"}).json()
+    client.post("/api/action", json={
+        "game_state": state["game_state"],
+        "current_agent_idx": state["current_agent_idx"],
+        "action": 0,
+        "robot_type": "random",
+    })
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    text = resp.text
+    for phase in ("parse", "restore", "mask", "robot_inference", "build_response", "serialize"):
+        assert f'high_society_phase_seconds_count{{phase="{phase}"}}' in text
+    assert 'high_society_request_seconds_count{route="/api/action",status="200"}' in text
+    assert "high_society_robot_turns_per_request_count" in text
+    assert "high_society_requests_in_flight 1" in text  # the /metrics request itself
+    assert "high_society_decision_cache_hit_ratio" in text
+
+
+def _serialize_count(client) -> float:
+    for line in client.get("/metrics").text.splitlines():
+        if line.startswith('high_society_phase_seconds_count{phase="serialize"}'):
+            return float(line.split()[-1])
+    return 0.0
+
+
+def test_stream_requests_are_not_timed_as_serialization(client):
+    body = client.get("/api/new-game", params={"num_players": 4, "robot_type": "random"}).json()
+    session = client.get("/api/session/new-game", params={"num_players": 3, "robot_type": "random"}).json()
+    before = _serialize_count(client)
+
+    client.post("/api/action/stream", json={
+        "game_state": body["game_state"],
+        "current_agent_idx": body["current_agent_idx"],
+        "action": _legal_action(body["action_mask"]),
+        "robot_type": "random",
+    })
+    client.post("/api/session/stream-action", json={"session_id": session["session_id"], "action": 0})
+
+    assert _serialize_count(client) == before
+
+
+def test_ready_only_after_warm_up(dqn_weights, monkeypatch):
+    import threading
+    from app.backend import main
+
+    monkeypatch.setattr(main, "_ready", threading.Event())
+    monkeypatch.setattr(main, "_warmup_error", None)
+    monkeypatch.setattr(main, "_env_templates", {})
+    assert TestClient(app).get("/api/ready").status_code == 503
+
+    with TestClient(app) as client:
+        assert client.get("/api/health").json()["status"] == "ok"
+        assert client.get("/api/ready").json() == {"status": "ready"}
+        assert set(main._env_templates) == {3, 4, 5}
+        assert main._policy is not None
+
+
+def test_failed_warm_up_is_not_ready(monkeypatch, tmp_path):
+    import threading
+    from app.backend import main
+
+    monkeypatch.setattr(main, "_WEIGHTS_PATH", tmp_path / "missing.pth")
+    monkeypatch.setattr(main, "_policy", None)
+    monkeypatch.setattr(main, "_dqn_robot", None)
+    monkeypatch.setattr(main, "_batcher", None)
+    monkeypatch.setattr(main, "_ready", threading.Event())
+    monkeypatch.setattr(main, "_warmup_error", None)
+
+    with TestClient(app) as client:
+        resp = client.get("/api/ready")
+        assert resp.status_code == 503
+        assert resp.json()["status"] == "failed"
+        # Games with random robots still work
+        assert client.get("/api/new-game", params={"robot_type": "random"}).status_code == 200
+
+
+def test_games_from_env_templates_do_not_share_state():
+    from app.backend import main
+
+    first = main._make_env(4)
+    first.reset(num_players=4)
+    second = main._make_env(4)
+    second.reset(num_players=4)
+    untouched = second.game_state.model_dump()
+
+    first.step(int(np.flatnonzero(first.get_action_mask(first.agent_selection))[-1]))
+    assert first.game_state is not second.game_state
+    assert second.game_state.model_dump() == untouched
+
+
+def _read_events(resp) -> list[tuple[str, dict]]:
+    events = []
+    for block in resp.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_stream_action_emits_each_robot_move(client):
+    body = client.get("/api/new-game", params={"num_players": 4, "robot_type": "random"}).json()
+
+    with client.stream("POST", "/api/action/stream", json={
+        "game_state": body["game_state"],
+        "current_agent_idx": body["current_agent_idx"],
+        "action": _legal_action(body["action_mask"]),
+        "robot_type": "random",
+    }) as resp:
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        resp.read()
+        events = _read_events(resp)
+
+    kinds = [kind for kind, _ in events]
+    assert kinds[0] == "state"
+    assert kinds[-1] == "done"
+    moves = [data for kind, data in events if kind == "move"]
+    assert set(kinds[1:-1]) <= {"move"}
+    for move in moves:
+        assert len(move["action_log"]) == 1
+    # The last state is the human's turn (or the game ended)
+    final = moves[-1] if moves else events[0][1]
+    assert final["game_over"] or final["current_agent_idx"] == 0
+
+
+def test_stream_action_rejects_illegal_action_before_streaming(client):
+    body = client.get("/api/new-game", params={"num_players": 3, "robot_type": "random"}).json()
+
+    resp = client.post("/api/action/stream", json={
+        "game_state": body["game_state"],
+        "current_agent_idx": body["current_agent_idx"],
+        "action": 99,
+        "robot_type": "random",
+    })
+    assert resp.status_code == 422
+
+
+def test_session_stream_action(client):
+    body = client.get("/api/session/new-game", params={"num_players": 3, "robot_type": "random"}).json()
+
+    resp = client.post("/api/session/stream-action", json={"session_id": body["session_id"], "action": _legal_action(body["action_mask"])})
+    events = _read_events(resp)
+
+    assert events[0][0] == "state"
+    assert events[-1][0] == "done"
+    versions = [data["version"] for kind, data in events if kind in ("state", "move")]
+    assert versions == sorted(versions)
+    assert versions[0] == body["version"] + 1
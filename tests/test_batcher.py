@@ -0,0 +1,130 @@
+"""Tests for micro-batched robot inference"""
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from app.backend.batcher import InferenceBatcher
+from high_society.numpy_policy import NumpyQNetwork, masked_argmax
+
+OBS_DIM = 43
+NUM_ACTIONS = 11
+
+
+def _random_q_net(seed: int = 0) -> NumpyQNetwork:
+    rng = np.random.default_rng(seed)
+    sizes = [OBS_DIM, 64, 64, NUM_ACTIONS]
+    weights = [rng.normal(size=(i, o)).astype(np.float32) for i, o in zip(sizes[:-1], sizes[1:])]
+    biases = [rng.normal(size=o).astype(np.float32) for o in sizes[1:]]
+    return NumpyQNetwork(weights, biases)
+
+
+def _random_inputs(n: int, seed: int = 1) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    observations = rng.uniform(0, 10, size=(n, OBS_DIM)).astype(np.float32)
+    masks = rng.random((n, NUM_ACTIONS)) < 0.5
+    masks[:, 0] = True
+    return observations, masks
+
+
+def test_batched_actions_match_unbatched():
+    q_net = _random_q_net()
+    batcher = InferenceBatcher(q_net, max_batch_size=8, max_wait_ms=50)
+    observations, masks = _random_inputs(64)
+    expected = masked_argmax(q_net(observations), masks)
+
+    results = [None] * len(observations)
+
+    def play(i):
+        with batcher.caller():
+            results[i] = batcher.get_action(observations[i], masks[i])
+
+    threads = [threading.Thread(target=play, args=(i,)) for i in range(len(observations))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    batcher.close()
+
+    assert results == expected.tolist()
+    assert batcher.decisions == len(observations)
+    assert batcher.batches < len(observations)
+
+
+def test_lone_caller_does_not_wait_for_batch():
+    batcher = InferenceBatcher(_random_q_net(), max_batch_size=32, max_wait_ms=1000)
+    observations, masks = _random_inputs(5)
+
+    start = time.monotonic()
+    with batcher.caller():
+        for obs, mask in zip(observations, masks):
+            batcher.get_action(obs, mask)
+    elapsed = time.monotonic() - start
+    batcher.close()
+
+    assert elapsed < 0.5
+    assert batcher.batches == 5
+
+
+def test_errors_are_raised_to_callers():
+    batcher = InferenceBatcher(_random_q_net(), max_wait_ms=1)
+    future = batcher.submit(np.zeros(3, dtype=np.float32), np.ones(NUM_ACTIONS, dtype=bool))
+
+    with pytest.raises(ValueError):
+        future.result(timeout=5)
+    batcher.close()
+
+
+def test_decisions_a_few_ms_apart_share_a_batch():
+    batcher = InferenceBatcher(_random_q_net(), max_batch_size=32, max_wait_ms=500)
+    observations, masks = _random_inputs(2)
+    registered = threading.Barrier(2)
+
+    def play(i: int, delay: float):
+        with batcher.caller():
+            registered.wait()
+            time.sleep(delay)
+            batcher.get_action(observations[i], masks[i])
+
+    threads = [threading.Thread(target=play, args=(0, 0.0)), threading.Thread(target=play, args=(1, 0.005))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    batcher.close()
+
+    assert (batcher.batches, batcher.decisions) == (1, 2)
+
+
+def test_cache_hits_do_not_hold_up_other_batches():
+    from app.backend.batcher import BatchedDQNAgent
+    from app.backend.decision_cache import CachedAgent, DecisionCache
+
+    batcher = InferenceBatcher(_random_q_net(), max_batch_size=32, max_wait_ms=1000)
+    observations, masks = _random_inputs(2)
+    cached = CachedAgent(BatchedDQNAgent(player_id=0, batcher=batcher), DecisionCache(), on_hit=batcher.idle)
+    cached.get_action(observations[0], masks[0])
+    hit, done = threading.Event(), threading.Event()
+
+    def cached_request():
+        # Still playing robot turns, but answered from the cache
+        with batcher.caller():
+            cached.get_action(observations[0], masks[0])
+            hit.set()
+            done.wait()
+
+    thread = threading.Thread(target=cached_request)
+    thread.start()
+    hit.wait()
+    start = time.monotonic()
+    with batcher.caller():
+        BatchedDQNAgent(player_id=1, batcher=batcher).get_action(observations[1], masks[1])
+    elapsed = time.monotonic() - start
+    done.set()
+    thread.join()
+    batcher.close()
+
+    assert elapsed < 0.5
+    assert cached.cache.stats()["hits"] == 1
+    assert batcher._active_callers == 0
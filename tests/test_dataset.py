@@ -0,0 +1,160 @@
+"""Tests for the sharded on-disk trajectory dataset"""
+import numpy as np
+import pytest
+import torch
+
+from high_society.agents import DiscreteRandomPassAgent, DQNAgent
+from high_society.dataset import BatchPrefetcher, DatasetWriter, TrajectoryDataset
+from high_society.environments.discrete import DiscreteHighSocietyEnv
+from high_society.main import collect_trajectories_discrete, run_offline
+
+
+def _collect(num_games: int, num_players: int = 3) -> list[dict[str, np.ndarray]]:
+    env = DiscreteHighSocietyEnv(num_players=num_players)
+    trajectories = []
+    for game in range(num_games):
+        env.reset(seed=game)
+        agents = [DiscreteRandomPassAgent(player_id=i, pass_probability=0.4, seed=game * 8 + i) for i in range(num_players)]
+        trajectories.extend(collect_trajectories_discrete(env, agents).values())
+    return trajectories
+
+
+def _write(root, trajectories, shard_size: int):
+    with DatasetWriter(root, shard_size=shard_size) as writer:
+        for trajectory in trajectories:
+            writer.add_trajectory(trajectory)
+
+
+def _expected_batch(trajectories) -> dict[str, np.ndarray]:
+    """All transitions with next observations, built the way DQNAgent.update builds them."""
+    observations = np.concatenate([t["observations"] for t in trajectories])
+    action_masks = np.concatenate([t["action_masks"] for t in trajectories])
+    last = np.cumsum([len(t["observations"]) for t in trajectories]) - 1
+    next_observations = np.roll(observations, -1, axis=0)
+    next_action_masks = np.roll(action_masks, -1, axis=0)
+    next_observations[last] = 0
+    next_action_masks[last] = 0
+    return {
+        "observations": observations,
+        "actions": np.concatenate([t["actions"] for t in trajectories]),
+        "action_masks": action_masks,
+        "rewards": np.concatenate([t["rewards"] for t in trajectories]),
+        "terminateds": np.concatenate([t["terminateds"] for t in trajectories]),
+        "next_observations": next_observations,
+        "next_action_masks": next_action_masks,
+    }
+
+
+def _sort_rows(batch: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    keys = np.concatenate([batch["observations"], batch["next_observations"], batch["actions"][:, None]], axis=1)
+    order = np.lexsort(keys.T[::-1])
+    return {key: value[order] for key, value in batch.items()}
+
+
+def test_unshuffled_pass_matches_the_trajectories(tmp_path):
+    trajectories = _collect(6)
+    _write(tmp_path, trajectories, shard_size=50)
+    dataset = TrajectoryDataset(tmp_path)
+
+    assert len(dataset.shards) > 1
+    assert len(dataset) == sum(len(t["actions"]) for t in trajectories)
+
+    batches = list(dataset.iter_batches(batch_size=len(dataset), shuffle=False, shards_per_group=len(dataset.shards)))
+    assert len(batches) == 1
+    expected = _expected_batch(trajectories)
+    for key, value in expected.items():
+        np.testing.assert_array_equal(batches[0][key], value.astype(batches[0][key].dtype), err_msg=key)
+
+
+def test_shuffled_pass_covers_every_transition_once(tmp_path):
+    trajectories = _collect(6)
+    _write(tmp_path, trajectories, shard_size=40)
+    dataset = TrajectoryDataset(tmp_path)
+
+    batches = list(dataset.iter_batches(batch_size=32, seed=0, shards_per_group=2))
+    assert all(len(batch["actions"]) == 32 for batch in batches[:-1])
+    merged = {key: np.concatenate([batch[key] for batch in batches]) for key in batches[0]}
+
+    unshuffled = next(dataset.iter_batches(batch_size=len(dataset), shuffle=False))
+    assert not np.array_equal(merged["observations"], unshuffled["observations"])
+    got, expected = _sort_rows(merged), _sort_rows(_expected_batch(trajectories))
+    for key, value in expected.items():
+        np.testing.assert_array_equal(got[key], value.astype(got[key].dtype), err_msg=key)
+
+    assert sum(len(b["actions"]) for b in dataset.iter_batches(batch_size=32, seed=0, drop_last=True)) == len(dataset) // 32 * 32
+
+
+def test_writer_appends_to_an_existing_dataset(tmp_path):
+    trajectories = _collect(4)
+    _write(tmp_path, trajectories[:6], shard_size=1000)
+    _write(tmp_path, trajectories[6:], shard_size=1000)
+
+    dataset = TrajectoryDataset(tmp_path)
+    assert dataset.shards == ["shard-00000", "shard-00001"]
+    assert len(dataset) == sum(len(t["actions"]) for t in trajectories)
+
+    with pytest.raises(ValueError, match="obs_dim"):
+        with DatasetWriter(tmp_path) as writer:
+            trajectory = dict(trajectories[0])
+            trajectory["observations"] = trajectory["observations"][:, :-1]
+            writer.add_trajectory(trajectory)
+
+
+def test_update_from_batch_matches_update(tmp_path):
+    trajectories = _collect(3)
+    _write(tmp_path, trajectories, shard_size=1000)
+    batch = next(TrajectoryDataset(tmp_path).iter_batches(batch_size=10_000, shuffle=False))
+
+    env = DiscreteHighSocietyEnv(num_players=3)
+    agents = []
+    for _ in range(2):
+        torch.manual_seed(0)
+        agents.append(DQNAgent(player_id=0, num_actions=env.num_actions, obs_space=env.observation_space("player_0"), device="cpu"))
+
+    assert agents[0].update(trajectories) == pytest.approx(agents[1].update_from_batch(batch))
+
+
+def test_prefetcher_yields_the_batches_as_tensors(tmp_path):
+    _write(tmp_path, _collect(4), shard_size=60)
+    dataset = TrajectoryDataset(tmp_path)
+
+    expected = list(dataset.iter_batches(batch_size=16, seed=3))
+    with BatchPrefetcher(dataset.iter_batches(batch_size=16, seed=3), "cpu", depth=2) as prefetcher:
+        got = list(prefetcher)
+
+    assert len(got) == len(expected)
+    for batch, tensors in zip(expected, got):
+        for key, value in batch.items():
+            np.testing.assert_array_equal(tensors[key].numpy(), value, err_msg=key)
+
+
+def test_prefetcher_raises_reader_errors_and_closes_early():
+    def failing():
+        yield {"x": np.zeros(2)}
+        raise ValueError("bad shard")
+
+    with pytest.raises(ValueError, match="bad shard"):
+        list(BatchPrefetcher(failing(), "cpu"))
+
+    endless = ({"x": np.zeros(2)} for _ in iter(int, 1))
+    prefetcher = BatchPrefetcher(endless, "cpu", depth=1)
+    next(iter(prefetcher))
+    prefetcher.close()
+    assert not prefetcher._worker.is_alive()
+
+
+def test_run_offline_trains_from_the_dataset(tmp_path, monkeypatch):
+    _write(tmp_path / "data", _collect(4), shard_size=60)
+    env = DiscreteHighSocietyEnv()
+    agent = DQNAgent(player_id=0, num_actions=env.num_actions, obs_space=env.observation_space("player_0"), device="cpu")
+    pool_dir = tmp_path / "experiments" / "results" / "pool"
+    pool_dir.mkdir(parents=True)
+    torch.save(agent.q_net.state_dict(), pool_dir / "dqn_agent_v1.pth")
+    monkeypatch.chdir(tmp_path)
+
+    run_offline(agent, str(tmp_path / "data"), ["dqn_agent_v1.pth"], epochs=2, batch_size=16, cql_alpha=1.0, eval_every=5, eval_games=3, seed=0)
+
+    assert agent.current_step == 2 * (len(TrajectoryDataset(tmp_path / "data")) // 16)
+    assert agent.epsilon == 0.1
+    metrics = agent.update_from_batch(next(TrajectoryDataset(tmp_path / "data").iter_batches(16, seed=0)), cql_alpha=1.0)
+    assert metrics["cql_penalty"] >= 0
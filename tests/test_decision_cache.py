@@ -0,0 +1,49 @@
+"""Tests for the robot decision cache"""
+import numpy as np
+
+from app.backend.decision_cache import CachedAgent, DecisionCache, decision_key
+
+
+class _CountingAgent:
+    def __init__(self):
+        self.player_id = 0
+        self.calls = 0
+
+    def get_action(self, observation, action_mask):
+        self.calls += 1
+        return int(np.flatnonzero(action_mask)[-1]), 0.0
+
+
+def test_key_depends_on_observation_and_mask():
+    obs = np.arange(5, dtype=np.float32)
+    mask = np.array([True, False, True])
+
+    assert decision_key(obs, mask) == decision_key(obs.astype(np.float64), mask.copy())
+    assert decision_key(obs, mask) != decision_key(obs + 1, mask)
+    assert decision_key(obs, mask) != decision_key(obs, np.array([True, True, True]))
+
+
+def test_cached_agent_skips_repeated_decisions():
+    agent = _CountingAgent()
+    cached = CachedAgent(agent, DecisionCache())
+    obs = np.zeros(4, dtype=np.float32)
+    mask = np.array([True, True, False])
+
+    assert cached.get_action(obs, mask) == (1, 0.0)
+    assert cached.get_action(obs, mask) == (1, 0.0)
+    assert agent.calls == 1
+    assert cached.cache.stats() == {"size": 1, "hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_cache_evicts_least_recently_used():
+    cache = DecisionCache(max_entries=2)
+    cache.put(b"a", 1)
+    cache.put(b"b", 2)
+    assert cache.get(b"a") == 1
+
+    cache.put(b"c", 3)
+
+    assert cache.get(b"b") is None
+    assert cache.get(b"a") == 1
+    assert cache.get(b"c") == 3
+    assert len(cache) == 2
@@ -282,3 +282,55 @@ def test_auction_loops_correctly():
 
     # Player 1's turn
     assert env.agent_selection == "player_1"
+
+
+def test_reset_reuses_spaces_for_same_player_count():
+    env = DiscreteHighSocietyEnv(num_players=4)
+    spaces = env.observation_spaces
+
+    env.reset(num_players=4)
+    assert env.observation_spaces is spaces
+
+    env.reset(num_players=3)
+    assert env.observation_spaces is not spaces
+    assert env.agents == ["player_0", "player_1", "player_2"]
+    assert set(env.observation_spaces) == set(env.agents)
+
+
+def test_reset_with_fixed_deck_draws_in_order():
+    from high_society.environments.discrete import PrestigeCard
+
+    deck = [
+        PrestigeCard(type="special", speciality="2x"),
+        *[PrestigeCard(type="value", value=v) for v in range(9, 0, -1)],
+        *[PrestigeCard(type="special", speciality="2x") for _ in range(3)],
+    ]
+    env = DiscreteHighSocietyEnv(num_players=3)
+    env.reset(options={"deck": deck})
+
+    assert env.game_state.cur_round.card == deck[0]
+    assert env.game_state.remaining_special_cards == 3
+    assert env.game_state.remaining_prestige_cards[::-1] == deck[1:]
+
+
+def test_auction_sets_serialize_as_sorted_lists():
+    import json
+
+    from high_society.environments.discrete import AuctionRound, PrestigeCard
+
+    auction = AuctionRound(
+        num=1,
+        cur_bidder_idx=0,
+        cur_bid=25,
+        bids={0: 25, 1: 0, 2: 0},
+        cards_in_bid={0: {25, 1, 15, 8}, 1: set(), 2: set()},
+        players_to_bid={2, 0, 1},
+        card=PrestigeCard(type="value", value=3),
+        value_to_agent={0: 3, 1: 3, 2: 3},
+    )
+    dumped = json.loads(auction.model_dump_json())
+    assert dumped["cards_in_bid"]["0"] == [1, 8, 15, 25]
+    assert dumped["players_to_bid"] == [0, 1, 2]
+    # Python dumps keep the sets
+    assert auction.model_dump()["players_to_bid"] == {0, 1, 2}
+    assert AuctionRound.model_validate_json(auction.model_dump_json()) == auction
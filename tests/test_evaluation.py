@@ -0,0 +1,52 @@
+"""Tests for sequential head-to-head evaluation"""
+from high_society.agents import DiscreteRandomPassAgent
+from high_society.evaluation import SPRT, compare_agents
+
+
+def test_sprt_accepts_h1_after_enough_candidate_wins():
+    sprt = SPRT(p0=0.5, p1=0.6, alpha=0.05, beta=0.05)
+    decisions = []
+    for _ in range(100):
+        sprt.update(candidate_won=True)
+        decisions.append(sprt.decision())
+
+    assert decisions[0] is None
+    assert decisions[-1] == "candidate"
+
+
+def test_sprt_accepts_h0_after_enough_baseline_wins():
+    sprt = SPRT()
+    for _ in range(100):
+        sprt.update(candidate_won=False)
+
+    assert sprt.decision() == "baseline"
+
+
+def test_compare_agents_stops_early_against_always_pass():
+    # An agent that always passes never wins a card, so the random baseline should be decided better quickly
+    result = compare_agents(
+        make_candidate=lambda i: DiscreteRandomPassAgent(player_id=i, pass_probability=1.0),
+        make_baseline=lambda i: DiscreteRandomPassAgent(player_id=i, pass_probability=0.3, seed=i),
+        num_players=3,
+        max_pairs=2000,
+        seed=0,
+    )
+
+    assert result.decision == "baseline"
+    assert result.pairs < 2000
+    assert result.baseline_wins > result.candidate_wins
+
+
+def test_compare_agents_inconclusive_when_capped():
+    result = compare_agents(
+        make_candidate=lambda i: DiscreteRandomPassAgent(player_id=i, seed=i),
+        make_baseline=lambda i: DiscreteRandomPassAgent(player_id=i, seed=10 + i),
+        num_players=4,
+        max_pairs=4,
+        seed=0,
+    )
+
+    assert result.decision == "inconclusive"
+    assert result.pairs == 4
+    # One shared baseline game per deck plus one candidate game per pair
+    assert result.games == 5
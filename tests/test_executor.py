@@ -0,0 +1,58 @@
+"""Tests for the bounded robot executor"""
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.backend import main
+from app.backend.executor import ExecutorOverloaded, RobotExecutor, WorkCancelled
+from high_society.environments.discrete import DiscreteHighSocietyEnv
+
+
+def _wait_for_release(release: threading.Event, cancel: threading.Event) -> str:
+    release.wait(timeout=5)
+    return "done"
+
+
+def test_executor_rejects_work_past_queue_limit():
+    executor = RobotExecutor(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        first = asyncio.ensure_future(executor.run(_wait_for_release, release, cancel=threading.Event()))
+        second = asyncio.ensure_future(executor.run(_wait_for_release, release, cancel=threading.Event()))
+        await asyncio.sleep(0.01)
+        assert executor.pending == 2
+        with pytest.raises(ExecutorOverloaded):
+            await executor.run(_wait_for_release, release, cancel=threading.Event())
+        release.set()
+        return await asyncio.gather(first, second)
+
+    assert asyncio.run(scenario()) == ["done", "done"]
+    assert executor.pending == 0
+    executor.shutdown()
+
+
+def test_robot_turns_stop_when_cancelled():
+    env = DiscreteHighSocietyEnv(num_players=4)
+    env.reset()
+    env.step(1)  # human bids, robots are up next
+    cancel = threading.Event()
+    cancel.set()
+
+    with pytest.raises(WorkCancelled):
+        main._run_robot_turns(env, human_idx=0, robot_type="random", num_players=4, cancel=cancel)
+    # No robot moved
+    assert env.agent_selection == "player_1"
+
+
+def test_overload_returns_503(monkeypatch):
+    async def overloaded(*args, **kwargs):
+        raise ExecutorOverloaded("full")
+
+    monkeypatch.setattr(main._robot_executor, "run", overloaded)
+    resp = TestClient(main.app).get("/api/new-game", params={"robot_type": "random"})
+
+    assert resp.status_code == 503
+    assert resp.headers["retry-after"] == "1"
@@ -0,0 +1,103 @@
+"""Tests for the one-pass action request parsing and game state checks"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.backend.fast_restore import InvalidGameState, check_game_state, parse_action_request
+from app.backend.main import app
+from high_society.agents import DiscreteRandomPassAgent
+from high_society.environments.discrete import DiscreteHighSocietyEnv, PrestigeCard
+
+
+def _mid_game_env(num_players: int = 4, moves: int = 15, seed: int = 0) -> DiscreteHighSocietyEnv:
+    env = DiscreteHighSocietyEnv(num_players=num_players)
+    env.reset(num_players=num_players, seed=seed)
+    agent = DiscreteRandomPassAgent(player_id=0, pass_probability=0.3, seed=seed)
+    for _ in range(moves):
+        env.step(agent.get_action(None, env.get_action_mask(env.agent_selection))[0])
+    return env
+
+
+def _current_idx(env: DiscreteHighSocietyEnv) -> int:
+    return env.agents.index(env.agent_selection)
+
+
+def test_reachable_states_pass_the_checks():
+    for seed in range(30):
+        env = DiscreteHighSocietyEnv(num_players=3 + seed % 3)
+        env.reset(num_players=3 + seed % 3, seed=seed)
+        agent = DiscreteRandomPassAgent(player_id=0, pass_probability=0.3, seed=seed)
+        while not all(env.terminations.values()):
+            # Round-trip through JSON as the client would
+            state = type(env.game_state).model_validate_json(env.game_state.model_dump_json())
+            check_game_state(state, _current_idx(env))
+            env.step(agent.get_action(None, env.get_action_mask(env.agent_selection))[0])
+
+
+@pytest.mark.parametrize("corrupt", [
+    lambda s: s.player_states[1].prestige_cards.append(s.cur_round.card.model_copy()),
+    lambda s: s.player_states[0].money_cards.append(s.player_states[0].money_cards[0]),
+    lambda s: setattr(s.player_states[2], "total_money", 99),
+    lambda s: s.cur_round.bids.__setitem__(1, s.cur_round.bids[1] + 1),
+    lambda s: s.remaining_prestige_cards.append(PrestigeCard(type="special", speciality="2x")),
+    lambda s: s.remaining_prestige_cards.append(PrestigeCard(type="value", value=12)),
+    lambda s: setattr(s, "cur_round", None),
+    lambda s: s.player_states.pop(3),
+])
+def test_corrupted_states_are_rejected(corrupt):
+    env = _mid_game_env()
+    state = env.game_state.model_copy(deep=True)
+    corrupt(state)
+
+    with pytest.raises(InvalidGameState):
+        check_game_state(state, _current_idx(env))
+
+
+def test_seat_to_move_must_still_be_bidding():
+    env = DiscreteHighSocietyEnv(num_players=4)
+    env.reset(num_players=4, seed=0)
+    passed = _current_idx(env)
+    env.step(0)  # pass
+    assert passed not in env.game_state.cur_round.players_to_bid
+
+    with pytest.raises(InvalidGameState, match="not in the auction"):
+        check_game_state(env.game_state, passed)
+
+
+@pytest.mark.parametrize("seat", [-1, 4])
+def test_seat_to_move_must_exist(seat):
+    env = _mid_game_env()
+    with pytest.raises(InvalidGameState, match="not in the auction"):
+        check_game_state(env.game_state, seat)
+
+
+def test_parse_action_request_reports_errors_like_fastapi():
+    from fastapi.exceptions import RequestValidationError
+
+    with pytest.raises(RequestValidationError) as exc_info:
+        parse_action_request(b'{"current_agent_idx": 0, "action": 1}')
+    assert exc_info.value.errors()[0]["loc"] == ("body", "game_state")
+
+
+def test_action_endpoint_rejects_bad_bodies():
+    client = TestClient(app)
+    state = client.get("/api/new-game", params={"num_players": 3, "robot_type": "random"}).json()
+
+    assert client.post("/api/action", content=b"not json").status_code == 422
+    missing = client.post("/api/action", json={"action": 1})
+    assert missing.status_code == 422
+    assert missing.json()["detail"][0]["loc"][0] == "body"
+
+    game_state = state["game_state"]
+    game_state["player_states"]["1"]["money_cards"].append({"value": 10})
+    resp = client.post("/api/action", json={"game_state": game_state, "current_agent_idx": 0, "action": 1, "robot_type": "random"})
+    assert resp.status_code == 422
+    assert "Invalid game state" in resp.json()["detail"]
+
+
+def test_openapi_still_documents_the_action_body():
+    schema = TestClient(app).get("/openapi.json").json()
+
+    body = schema["paths"]["/api/action"]["post"]["requestBody"]["content"]["application/json"]["schema"]
+    assert body == {"$ref": "#/components/schemas/ActionRequest"}
+    assert "game_state" in schema["components"]["schemas"]["ActionRequest"]["properties"]
+    assert "GameState" in schema["components"]["schemas"]
@@ -0,0 +1,136 @@
+"""Tests for the binary game log and trajectory replay"""
+import numpy as np
+from fastapi.testclient import TestClient
+
+from high_society.agents import DiscreteRandomPassAgent
+from high_society.environments.discrete import DiscreteHighSocietyEnv
+from high_society.game_log import (
+    GameLogWriter,
+    GameRecord,
+    deck_in_draw_order,
+    encode_record,
+    read_records,
+    replay_trajectories,
+)
+from high_society.main import collect_trajectories_discrete
+
+
+class _Recording:
+    """Wraps an agent and appends its actions to a shared list."""
+
+    def __init__(self, agent, actions: list[int]):
+        self.agent = agent
+        self.player_id = agent.player_id
+        self.actions = actions
+
+    def get_action(self, observation, action_mask):
+        action, log_prob = self.agent.get_action(observation, action_mask)
+        self.actions.append(action)
+        return action, log_prob
+
+
+def _play(num_players: int, seed: int) -> tuple[GameRecord, dict]:
+    """A game between random robots, its record and its collected trajectories."""
+    env = DiscreteHighSocietyEnv(num_players=num_players)
+    env.reset(seed=seed)
+    deck = deck_in_draw_order(env)
+
+    actions: list[int] = []
+    agents = [
+        _Recording(DiscreteRandomPassAgent(player_id=i, pass_probability=0.4, seed=seed * 8 + i), actions)
+        for i in range(num_players)
+    ]
+    trajectories = collect_trajectories_discrete(env, agents, deck=deck)
+    winner = next((i for i in range(num_players) if trajectories[i]["won"]), None)
+    return GameRecord(num_players=num_players, deck=deck, actions=actions, winner_idx=winner, robot_type="random"), trajectories
+
+
+def test_replay_rebuilds_the_collected_trajectories():
+    for seed in range(5):
+        record, trajectories = _play(3 + seed % 3, seed)
+        replayed = replay_trajectories(record)
+
+        assert replayed.keys() == trajectories.keys()
+        for seat, trajectory in trajectories.items():
+            for key, value in trajectory.items():
+                if key == "log_probs":
+                    continue
+                np.testing.assert_array_equal(replayed[seat][key], value, err_msg=f"seat {seat} {key}")
+
+
+def test_writer_round_trips_records(tmp_path):
+    path = tmp_path / "games.log"
+    records = [_play(4, seed)[0] for seed in range(10)]
+
+    writer = GameLogWriter(path, flush_interval_s=0.05)
+    for record in records:
+        writer.append(record)
+    writer.close()
+
+    assert list(read_records(path)) == records
+    assert writer.written == len(records)
+    # Appended faster than the flush interval, so synced in far fewer batches
+    assert writer.fsyncs < len(records)
+    assert len(encode_record(records[0])) < 100
+
+
+def test_torn_records_are_skipped(tmp_path):
+    path = tmp_path / "games.log"
+    first, second = _play(3, 0)[0], _play(3, 1)[0]
+    # A crash mid-write, then the server restarted and kept appending
+    path.write_bytes(encode_record(first)[:-5] + encode_record(second))
+
+    assert list(read_records(path)) == [second]
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path):
+    writer = GameLogWriter(tmp_path / "games.log", flush_interval_s=0.2, max_pending=1)
+    record = _play(3, 0)[0]
+    for _ in range(50):
+        writer.append(record)
+    writer.close()
+
+    assert writer.dropped > 0
+    assert writer.written + writer.dropped == 50
+
+
+def test_session_games_are_recorded(tmp_path, monkeypatch):
+    from app.backend import main
+
+    monkeypatch.setattr(main, "_GAME_LOG_DIR", str(tmp_path))
+    monkeypatch.setattr(main, "_game_log", None)
+
+    client = TestClient(main.app)
+    body = client.get("/api/session/new-game", params={"num_players": 3, "robot_type": "random"}).json()
+    while not body["game_over"]:
+        action = next(i for i, legal in enumerate(body["action_mask"]) if legal)
+        body = client.post("/api/session/action", json={"session_id": body["session_id"], "action": action}).json()
+    main._game_log.close()
+
+    (record,) = read_records(main._game_log.path)
+    assert record.winner_idx == body["winner_idx"]
+    assert (record.human_idx, record.robot_type) == (0, "random")
+    replayed = replay_trajectories(record)
+    assert all(replayed[seat]["terminateds"][-1] for seat in replayed)
+
+
+def test_streamed_session_games_are_recorded_once(tmp_path, monkeypatch):
+    import json
+
+    from app.backend import main
+
+    monkeypatch.setattr(main, "_GAME_LOG_DIR", str(tmp_path))
+    monkeypatch.setattr(main, "_game_log", None)
+
+    client = TestClient(main.app)
+    body = client.get("/api/session/new-game", params={"num_players": 3, "robot_type": "random"}).json()
+    session_id = body["session_id"]
+    while not body["game_over"]:
+        action = next(i for i, legal in enumerate(body["action_mask"]) if legal)
+        resp = client.post("/api/session/stream-action", json={"session_id": session_id, "action": action})
+        events = [json.loads(line[len("data: "):]) for line in resp.text.splitlines() if line.startswith("data: ")]
+        body = [event for event in events if "game_over" in event][-1]
+    main._game_log.close()
+
+    (record,) = read_records(main._game_log.path)
+    assert record.winner_idx == body["winner_idx"]
@@ -0,0 +1,31 @@
+"""Tests that light modules stay light to import"""
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.mark.parametrize("module", [
+    "high_society.environments.discrete",
+    "high_society.agents",
+    "high_society.main",
+    "high_society.dataset",
+])
+def test_module_does_not_import_torch(module):
+    code = (
+        f"import sys, {module}\n"
+        "heavy = [m for m in ('torch', 'torch.utils.tensorboard', 'high_society.environments.simple') if m in sys.modules]\n"
+        "assert not heavy, heavy\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_agent_device_is_per_agent():
+    from high_society.agents import DQNAgent
+    from high_society.environments.discrete import DiscreteHighSocietyEnv
+
+    env = DiscreteHighSocietyEnv(num_players=3)
+    agent = DQNAgent(player_id=0, num_actions=env.num_actions, obs_space=env.observation_space("player_0"), device="cpu")
+
+    assert agent.device.type == "cpu"
+    assert next(agent.q_net.parameters()).device.type == "cpu"
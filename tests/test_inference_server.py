@@ -0,0 +1,90 @@
+"""Tests for the shared inference process and its worker-side client"""
+import threading
+
+import numpy as np
+import pytest
+
+from app.backend.inference_server import InferenceServer, InferenceServerError, RemotePolicy
+from high_society.numpy_policy import NumpyQNetwork
+
+
+@pytest.fixture
+def q_net(dqn_weights) -> NumpyQNetwork:
+    return NumpyQNetwork.from_checkpoint(dqn_weights)
+
+
+@pytest.fixture
+def server(q_net, tmp_path):
+    server = InferenceServer(tmp_path / "inference.sock", q_net)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def test_remote_policy_matches_local_q_values(server, q_net):
+    policy = RemotePolicy(server.server_address)
+    observations = np.random.default_rng(0).random((7, q_net.obs_dim), dtype=np.float32)
+
+    np.testing.assert_allclose(policy(observations), q_net(observations), rtol=1e-5, atol=1e-6)
+    np.testing.assert_allclose(policy(observations[0]), q_net(observations[0]), rtol=1e-5, atol=1e-6)
+    policy.close()
+
+
+def test_remote_policy_reports_the_served_dimensions(server, q_net):
+    policy = RemotePolicy(server.server_address)
+    assert (policy.obs_dim, policy.num_actions) == (q_net.obs_dim, q_net.num_actions)
+    # Asking for them doesn't cost a policy pass
+    assert server.passes.rows == 0
+    policy.close()
+
+
+def test_concurrent_workers_get_their_own_rows(server, q_net):
+    rng = np.random.default_rng(1)
+    batches = [rng.random((1 + i % 4, q_net.obs_dim), dtype=np.float32) for i in range(8)]
+    results: dict[int, np.ndarray] = {}
+
+    def worker(i: int):
+        policy = RemotePolicy(server.server_address)
+        for _ in range(20):
+            results[i] = policy(batches[i])
+        policy.close()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(batches))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for i, observations in enumerate(batches):
+        np.testing.assert_allclose(results[i], q_net(observations), rtol=1e-5, atol=1e-6)
+    assert server.passes.rows == sum(len(b) for b in batches) * 20
+
+
+def test_errors_are_reported_to_the_caller(server, q_net, tmp_path):
+    policy = RemotePolicy(server.server_address)
+    with pytest.raises(InferenceServerError, match="features"):
+        policy(np.zeros((2, q_net.obs_dim + 1), dtype=np.float32))
+    # The connection is still usable afterwards
+    assert policy(np.zeros(q_net.obs_dim, dtype=np.float32)).shape == (q_net.num_actions,)
+
+    with pytest.raises(InferenceServerError, match="Can't reach"):
+        RemotePolicy(tmp_path / "missing.sock")(np.zeros(q_net.obs_dim, dtype=np.float32))
+
+
+def test_backend_plays_through_the_inference_server(server, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.backend import main
+
+    monkeypatch.setattr(main, "_INFERENCE_SOCKET", server.server_address)
+    client = TestClient(main.app)
+    body = client.get("/api/session/new-game", params={"num_players": 4, "robot_type": "dqn"}).json()
+    while not body["game_over"]:
+        action = next(i for i, legal in enumerate(body["action_mask"]) if legal)
+        body = client.post("/api/session/action", json={"session_id": body["session_id"], "action": action}).json()
+
+    assert isinstance(main._get_policy(), RemotePolicy)
+    assert server.passes.passes > 0
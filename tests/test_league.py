@@ -0,0 +1,122 @@
+"""Tests for league evaluation"""
+import json
+from collections import Counter
+
+import torch
+
+from high_society.agents import DQNAgent
+from high_society.environments.discrete import DiscreteHighSocietyEnv
+from high_society.league import (
+    EloRatings,
+    MatchResult,
+    RANDOM_BASELINES,
+    match_deck,
+    play_match,
+    play_matches,
+    run_league,
+    schedule_matches,
+)
+from high_society.numpy_policy import NumpyDQNAgent, NumpyQNetwork
+
+
+def test_schedule_matches_is_seat_balanced():
+    entries = ["a.pth", "b.pth", "c.pth", "d.pth", "e.pth"]
+    matches = schedule_matches(entries, num_games=200, seed=0)
+
+    assert len(matches) >= 200
+    for match in matches:
+        assert 3 <= len(match.seats) <= 5
+        assert len(set(match.seats)) == len(match.seats)
+
+    # Within each table size, every entry sits in every seat equally often
+    seat_counts = Counter((len(m.seats), name, seat) for m in matches for seat, name in enumerate(m.seats))
+    for (num_players, name, _), count in seat_counts.items():
+        for seat in range(num_players):
+            assert seat_counts[(num_players, name, seat)] == count
+
+def test_schedule_matches_rotations_share_deck_seed():
+    matches = schedule_matches(["a", "b", "c"], num_games=3, seed=1)
+
+    assert len(matches) == 3
+    assert len({m.seed for m in matches}) == 1
+    assert len({tuple(m.seats) for m in matches}) == 3
+
+
+def test_elo_winner_gains_rating():
+    ratings = EloRatings()
+    ratings.update(MatchResult(seats=["a", "b", "c"], winner_seat=1))
+
+    board = {row["name"]: row for row in ratings.leaderboard()}
+    assert board["b"]["rating"] > 1500
+    assert board["a"]["rating"] < 1500
+    assert board["a"]["rating"] == board["c"]["rating"]
+    assert board["b"]["wins"] == 1
+    # Ratings are zero-sum
+    assert abs(sum(row["rating"] for row in board.values()) - 3 * 1500) < 1e-6
+
+
+def test_elo_no_winner_is_a_draw():
+    ratings = EloRatings()
+    ratings.update(MatchResult(seats=["a", "b", "c"], winner_seat=None))
+
+    for row in ratings.leaderboard():
+        assert row["rating"] == 1500
+
+
+def test_run_league_writes_leaderboard(tmp_path):
+    env = DiscreteHighSocietyEnv(num_players=3)
+    agent = DQNAgent(player_id=0, num_actions=env.num_actions, obs_space=env.observation_space("player_0"))
+    torch.save(agent.q_net.state_dict(), tmp_path / "dqn_agent_v1.pth")
+    out_path = tmp_path / "leaderboard.json"
+
+    run_league(str(tmp_path), num_games=20, leaderboard_path=str(out_path), num_workers=1, chunk_size=5, seed=0)
+
+    with open(out_path) as f:
+        leaderboard = json.load(f)
+    names = {row["name"] for row in leaderboard["leaderboard"]}
+    assert names == {"dqn_agent_v1.pth", *RANDOM_BASELINES}
+    assert leaderboard["games"] >= 20
+
+
+def test_batched_matches_play_like_single_torch_games(tmp_path):
+    env = DiscreteHighSocietyEnv(num_players=3)
+    torch_agents = []
+    for version in range(2):
+        torch.manual_seed(version)
+        agent = DQNAgent(player_id=0, num_actions=env.num_actions, obs_space=env.observation_space("player_0"), epsilon=0.0)
+        torch.save(agent.q_net.state_dict(), tmp_path / f"dqn_agent_v{version}.pth")
+        torch_agents.append(agent)
+    numpy_agents = [
+        NumpyDQNAgent(player_id=0, q_net=NumpyQNetwork.from_checkpoint(tmp_path / f"dqn_agent_v{version}.pth"))
+        for version in range(2)
+    ]
+
+    seatings = [[i % 2 for i in range(seed, seed + 3 + seed % 3)] for seed in range(12)]
+    expected = [
+        play_match(DiscreteHighSocietyEnv(num_players=len(seats)), [torch_agents[i] for i in seats], seed=seed)
+        for seed, seats in enumerate(seatings)
+    ]
+    envs = [DiscreteHighSocietyEnv(num_players=len(seats)) for seats in seatings]
+    winners = play_matches(envs, [[numpy_agents[i] for i in seats] for seats in seatings], list(range(len(seatings))))
+
+    assert winners == expected
+
+
+def test_play_matches_leaves_the_global_rngs_alone():
+    import random
+
+    import numpy as np
+
+    from high_society.agents import DiscreteRandomPassAgent
+
+    envs = [DiscreteHighSocietyEnv(num_players=3) for _ in range(4)]
+    seatings = [[DiscreteRandomPassAgent(player_id=0, seed=g * 3 + i) for i in range(3)] for g in range(4)]
+    random_state, np_state = random.getstate(), np.random.get_state()[1].copy()
+
+    play_matches(envs, seatings, seeds=[7, 7, 8, 9])
+
+    assert random.getstate() == random_state
+    assert (np.random.get_state()[1] == np_state).all()
+    # Rotations of a match share a deck seed, and so the deck
+    assert match_deck(7) == match_deck(7)
+    assert match_deck(7) != match_deck(8)
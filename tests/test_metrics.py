@@ -0,0 +1,59 @@
+"""Tests for the Prometheus metrics"""
+import pytest
+
+from app.backend.metrics import Counter, Gauge, Histogram, Registry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    hist = Histogram("latency_seconds", "Latency", labelnames=("phase",), buckets=(0.1, 1.0), registry=registry)
+    hist.labels("parse").observe(0.05)
+    hist.labels("parse").observe(0.5)
+    hist.labels("parse").observe(5)
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE latency_seconds histogram" in lines
+    assert 'latency_seconds_bucket{phase="parse",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{phase="parse",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{phase="parse",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{phase="parse"} 3' in lines
+    assert 'latency_seconds_sum{phase="parse"} 5.55' in lines
+
+
+def test_counters_and_gauges():
+    registry = Registry()
+    requests = Counter("requests_total", "Requests", registry=registry)
+    in_flight = Gauge("in_flight", "In flight", registry=registry)
+    Gauge("queue_depth", "Queue depth", function=lambda: 7, registry=registry)
+    requests.inc()
+    requests.inc(2)
+    in_flight.inc()
+    in_flight.inc()
+    in_flight.dec()
+
+    lines = registry.render().splitlines()
+
+    assert "requests_total 3" in lines
+    assert "in_flight 1" in lines
+    assert "queue_depth 7" in lines
+
+
+def test_label_values_are_escaped_and_checked():
+    registry = Registry()
+    counter = Counter("errors_total", "Errors", labelnames=("detail",), registry=registry)
+    counter.labels('say "hi"').inc()
+
+    assert 'errors_total{detail="say \\"hi\\""} 1' in registry.render()
+    with pytest.raises(ValueError):
+        counter.labels("a", "b")
+    with pytest.raises(ValueError):
+        Counter("errors_total", "Again", registry=registry)
+
+
+def test_gauges_are_not_counters():
+    registry = Registry()
+    gauge = Gauge("level", "Level", registry=registry)
+
+    assert not isinstance(gauge, Counter)
+    assert not hasattr(Counter("events_total", "Events", registry=registry), "dec")
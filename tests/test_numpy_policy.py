@@ -0,0 +1,81 @@
+"""Tests for torch-free NumPy inference"""
+import subprocess
+import sys
+
+import numpy as np
+import torch
+
+from high_society.agents import DQNAgent
+from high_society.environments.discrete import DiscreteHighSocietyEnv
+from high_society.numpy_policy import NumpyDQNAgent, NumpyQNetwork, load_state_dict_numpy
+from high_society.utils import cat_dict_array
+
+
+def _saved_dqn_agent(tmp_path) -> tuple[DQNAgent, str]:
+    env = DiscreteHighSocietyEnv(num_players=4)
+    agent = DQNAgent(player_id=0, num_actions=env.num_actions, obs_space=env.observation_space("player_0"), epsilon=0.0)
+    path = str(tmp_path / "dqn_agent.pth")
+    torch.save(agent.q_net.state_dict(), path)
+    return agent, path
+
+
+def test_load_state_dict_numpy_matches_torch(tmp_path):
+    agent, path = _saved_dqn_agent(tmp_path)
+
+    state_dict = load_state_dict_numpy(path)
+
+    expected = agent.q_net.state_dict()
+    assert state_dict.keys() == expected.keys()
+    for key, value in expected.items():
+        assert state_dict[key].dtype == np.float32
+        np.testing.assert_array_equal(state_dict[key], value.cpu().numpy())
+
+
+def test_numpy_q_network_matches_torch_forward(tmp_path):
+    agent, path = _saved_dqn_agent(tmp_path)
+    q_net = NumpyQNetwork.from_checkpoint(path)
+
+    observations = np.random.default_rng(0).uniform(0, 10, size=(32, q_net.obs_dim)).astype(np.float32)
+    with torch.no_grad():
+        expected = agent.q_net(torch.from_numpy(observations)).numpy()
+
+    np.testing.assert_allclose(q_net(observations), expected, rtol=1e-5, atol=1e-5)
+    np.testing.assert_allclose(q_net(observations[0]), expected[0], rtol=1e-5, atol=1e-5)
+
+
+def test_flat_weights_memory_map_to_the_same_network(tmp_path):
+    _, path = _saved_dqn_agent(tmp_path)
+    q_net = NumpyQNetwork.from_checkpoint(path)
+    flat_path = tmp_path / "dqn_agent.npy"
+    q_net.save_flat(flat_path)
+
+    mapped = NumpyQNetwork.load_flat(flat_path)
+
+    assert all(isinstance(w.base, np.memmap) or isinstance(w, np.memmap) for w in mapped.weights)
+    assert not mapped.weights[0].flags.writeable
+    observations = np.random.default_rng(0).uniform(0, 10, size=(8, q_net.obs_dim)).astype(np.float32)
+    np.testing.assert_array_equal(mapped(observations), q_net(observations))
+
+
+def test_numpy_dqn_agent_matches_dqn_agent_actions(tmp_path):
+    agent, path = _saved_dqn_agent(tmp_path)
+    numpy_agent = NumpyDQNAgent(player_id=0, q_net=NumpyQNetwork.from_checkpoint(path))
+
+    env = DiscreteHighSocietyEnv(num_players=4)
+    env.reset(seed=0)
+    for _ in range(40):
+        if all(env.terminations.values()):
+            break
+        agent_name = env.agent_selection
+        obs = cat_dict_array(env.observe(agent_name))
+        mask = env.get_action_mask(agent_name)
+
+        action, _ = numpy_agent.get_action(obs, mask)
+        assert action == agent.get_action(obs, mask)[0]
+        assert mask[action]
+        env.step(action)
+
+
+def test_backend_does_not_import_torch():
+    code = "import sys, app.backend.main; assert 'torch' not in sys.modules, 'torch was imported'"
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -0,0 +1,68 @@
+"""Tests for the first-auction opening book"""
+import json
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.backend import main
+from app.backend.opening_book import OpeningBook, build_opening_book, human_first_action, weights_sha256
+from high_society.environments.discrete import DiscreteHighSocietyEnv
+from high_society.numpy_policy import NumpyDQNAgent, NumpyQNetwork
+
+
+@pytest.fixture
+def book_path(dqn_weights, tmp_path):
+    robot = NumpyDQNAgent(player_id=0, q_net=NumpyQNetwork.from_checkpoint(dqn_weights))
+    path = tmp_path / "opening_book.json"
+    path.write_text(json.dumps(build_opening_book(robot, weights_sha256(dqn_weights))))
+    return path
+
+
+def test_book_covers_every_opening(book_path):
+    lines = json.loads(book_path.read_text())["lines"]
+    assert len(lines) == 3 * 10 * 11
+    # Robots reply until the human's turn or the end of the first auction, so at least one moves
+    assert all(len(line) >= 1 for line in lines.values())
+
+
+def test_human_first_action_only_matches_the_first_move():
+    env = DiscreteHighSocietyEnv(num_players=4)
+    env.reset(num_players=4)
+    assert human_first_action(env) is None
+
+    env.step(3)
+    assert human_first_action(env) == 3
+
+    env.step(0)
+    assert human_first_action(env) is None
+
+
+def test_book_is_ignored_for_other_weights(book_path, tmp_path):
+    other = tmp_path / "other.pth"
+    other.write_bytes(b"not the same weights")
+
+    assert OpeningBook.load(book_path, other) is None
+    assert OpeningBook.load(tmp_path / "missing.json", other) is None
+
+
+def test_booked_replies_match_live_inference(book_path, monkeypatch):
+    monkeypatch.setattr(main, "_OPENING_BOOK_PATH", str(book_path))
+    monkeypatch.setattr(main, "_opening_book", None)
+    monkeypatch.setattr(main, "_ready", threading.Event())
+
+    with TestClient(main.app) as client:
+        assert main._opening_book is not None
+        state = client.get("/api/new-game", params={"num_players": 4, "robot_type": "dqn"}).json()
+        request = {"game_state": state["game_state"], "current_agent_idx": 0, "action": 5, "robot_type": "dqn"}
+
+        booked = client.post("/api/action", json=request).json()
+        assert main._opening_book.hits == 1
+
+        monkeypatch.setattr(main, "_opening_book", None)
+        live = client.post("/api/action", json=request).json()
+
+    # Everything but how long the robots took
+    booked.pop("robot_timing")
+    live.pop("robot_timing")
+    assert booked == live
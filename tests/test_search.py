@@ -0,0 +1,107 @@
+"""Tests for the anytime rollout search robot"""
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.backend.main import app
+from high_society.agents import DiscreteRandomPassAgent
+from high_society.environments.discrete import DiscreteHighSocietyEnv
+from high_society.search import AnytimeRolloutAgent
+
+
+class _FixedAgent:
+    """Always plays the lowest legal action."""
+
+    def get_action(self, observation, action_mask):
+        return int(np.flatnonzero(action_mask)[0]), 0.0
+
+
+@pytest.fixture
+def env() -> DiscreteHighSocietyEnv:
+    env = DiscreteHighSocietyEnv(num_players=4)
+    env.reset(num_players=4, seed=0)
+    return env
+
+
+def _agent(seed: int = 0) -> AnytimeRolloutAgent:
+    return AnytimeRolloutAgent(
+        fallback=_FixedAgent(),
+        rollout_agent=DiscreteRandomPassAgent(player_id=0, pass_probability=0.4, seed=seed),
+        seed=seed,
+    )
+
+
+def test_expired_deadline_returns_the_fallback_action(env):
+    result = _agent().search(env, deadline=time.perf_counter())
+
+    assert result.action == _FixedAgent().get_action(None, env.get_action_mask(env.agent_selection))[0]
+    assert not result.completed
+    assert result.rollouts == 0
+
+
+def test_search_tries_every_action_and_leaves_the_env_alone(env):
+    before = env.game_state.model_dump()
+    mask = env.get_action_mask(env.agent_selection)
+
+    start = time.perf_counter()
+    result = _agent().search(env, deadline=start + 0.5)
+
+    assert result.completed
+    assert result.rollouts >= mask.sum()
+    assert mask[result.action]
+    # Stops at the deadline, give or take one rollout step
+    assert time.perf_counter() - start < 0.6
+    assert env.game_state.model_dump() == before
+
+
+def test_search_robot_reports_time_against_the_budget(dqn_weights):
+    client = TestClient(app)
+    resp = client.get("/api/new-game", params={"num_players": 3, "robot_type": "random", "budget_ms": 50})
+    assert resp.json()["robot_timing"]["budget_ms"] == 50
+
+    body = client.get("/api/session/new-game", params={"num_players": 3, "robot_type": "search", "budget_ms": 60}).json()
+    for _ in range(3):
+        if body["game_over"]:
+            break
+        action = next(i for i, legal in enumerate(body["action_mask"]) if legal)
+        body = client.post("/api/session/action", json={"session_id": body["session_id"], "action": action}).json()
+
+        timing = body["robot_timing"]
+        assert timing["budget_ms"] == 60
+        assert timing["turns"] == len(body["action_log"])
+        # The budget bounds the search; allow for the moves' bookkeeping around it
+        assert timing["used_ms"] < 60 + 50 * timing["turns"]
+
+
+def test_streams_delta_and_token_responses_report_the_budget(dqn_weights):
+    client = TestClient(app)
+    body = client.get("/api/new-game", params={"num_players": 3, "robot_type": "random"}).json()
+    resp = client.post("/api/action/stream", json={
+        "game_state": body["game_state"],
+        "current_agent_idx": body["current_agent_idx"],
+        "action": 0,
+        "robot_type": "random",
+        "budget_ms": 70,
+    })
+    events = [block for block in resp.text.split("\n\n") if block.startswith("event: state") or block.startswith("event: move")]
+    assert events and all('"budget_ms":70.0' in block for block in events)
+
+    body = client.get("/api/session/new-game", params={"num_players": 3, "robot_type": "random", "budget_ms": 80}).json()
+    resp = client.post("/api/session/stream-action", json={"session_id": body["session_id"], "action": 0})
+    events = [block for block in resp.text.split("\n\n") if block.startswith("event: state") or block.startswith("event: move")]
+    assert events and all('"budget_ms":80.0' in block for block in events)
+
+    body = client.get("/api/session/new-game", params={"num_players": 3, "robot_type": "random", "budget_ms": 90}).json()
+    delta = client.post("/api/session/delta-action", json={
+        "session_id": body["session_id"], "action": 0, "known_version": body["version"],
+    }).json()
+    assert delta["robot_timing"]["budget_ms"] == 90
+
+    body = client.get("/api/token/new-game", params={"num_players": 3, "robot_type": "search", "budget_ms": 40}).json()
+    assert body["robot_timing"]["budget_ms"] == 40
+    if body["token"] is not None:
+        action = next(i for i, legal in enumerate(body["action_mask"]) if legal)
+        body = client.post("/api/token/action", json={"token": body["token"], "action": action, "budget_ms": 45}).json()
+        assert body["robot_timing"]["budget_ms"] == 45
@@ -0,0 +1,60 @@
+"""Tests for the backend session store"""
+from app.backend.sessions import SessionStore
+from high_society.environments.discrete import DiscreteHighSocietyEnv
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_create_and_get():
+    store = SessionStore()
+    session = store.create(DiscreteHighSocietyEnv(num_players=3), robot_type="random")
+
+    assert store.get(session.session_id) is session
+    assert store.get("missing") is None
+
+
+def test_sessions_expire_after_ttl():
+    clock = FakeClock()
+    store = SessionStore(ttl_seconds=10, clock=clock)
+    session = store.create(DiscreteHighSocietyEnv(num_players=3), robot_type="random")
+
+    clock.now = 5
+    assert store.get(session.session_id) is session
+    # Access refreshes the TTL
+    clock.now = 14
+    assert store.get(session.session_id) is session
+    clock.now = 25
+    assert store.get(session.session_id) is None
+    assert len(store) == 0
+
+
+def test_least_recently_used_is_evicted_when_full():
+    clock = FakeClock()
+    store = SessionStore(max_sessions=2, clock=clock)
+    first = store.create(DiscreteHighSocietyEnv(num_players=3), robot_type="random")
+    second = store.create(DiscreteHighSocietyEnv(num_players=3), robot_type="random")
+
+    store.get(first.session_id)
+    third = store.create(DiscreteHighSocietyEnv(num_players=3), robot_type="random")
+
+    assert len(store) == 2
+    assert store.get(second.session_id) is None
+    assert store.get(first.session_id) is first
+    assert store.get(third.session_id) is third
+
+
+def test_expired_sessions_are_dropped_on_create():
+    clock = FakeClock()
+    store = SessionStore(ttl_seconds=10, clock=clock)
+    store.create(DiscreteHighSocietyEnv(num_players=3), robot_type="random")
+
+    clock.now = 20
+    store.create(DiscreteHighSocietyEnv(num_players=3), robot_type="random")
+
+    assert len(store) == 1
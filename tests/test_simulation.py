@@ -0,0 +1,51 @@
+"""Tests for batch simulation"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.backend import main
+from app.backend.simulation import SimulationRunner, simulate_games
+
+
+@pytest.fixture
+def client(monkeypatch):
+    runner = SimulationRunner(max_workers=2)
+    monkeypatch.setattr(main, "_simulator", runner)
+    yield TestClient(main.app)
+    runner.shutdown()
+
+
+def test_simulate_games_totals_are_consistent():
+    totals = simulate_games(["random", "random", "random", "random"], list(range(20)), weights_path=None)
+
+    assert totals.games == 20
+    assert totals.wins.sum() + totals.no_winner == 20
+    assert (totals.eliminations >= 0).all() and totals.eliminations.sum() >= 20
+    assert simulate_games(["random"] * 4, list(range(20)), None).wins.tolist() == totals.wins.tolist()
+
+
+def test_simulate_endpoint_aggregates_and_caches(client):
+    request = {"seats": ["random", "random", "random"], "num_games": 60, "seed": 1}
+
+    first = client.post("/api/simulate", json=request).json()
+    assert first["num_games"] == 60
+    assert not first["cached"]
+    assert [s["robot_type"] for s in first["seats"]] == ["random"] * 3
+    assert sum(s["win_rate"] for s in first["seats"]) + first["no_winner_rate"] == pytest.approx(1.0)
+
+    second = client.post("/api/simulate", json=request).json()
+    assert second["cached"]
+    assert second["seats"] == first["seats"]
+
+
+def test_simulate_with_dqn_seats(client, dqn_weights):
+    resp = client.post("/api/simulate", json={"seats": ["dqn", "random", "random", "random"], "num_games": 30})
+    assert resp.status_code == 200
+    assert resp.json()["seats"][0]["robot_type"] == "dqn"
+
+
+def test_simulate_validates_config(client, monkeypatch, tmp_path):
+    assert client.post("/api/simulate", json={"seats": ["random", "random"]}).status_code == 422
+    assert client.post("/api/simulate", json={"seats": ["random"] * 3, "num_games": 0}).status_code == 422
+
+    monkeypatch.setattr(main, "_WEIGHTS_PATH", tmp_path / "missing.pth")
+    assert client.post("/api/simulate", json={"seats": ["dqn", "random", "random"]}).status_code == 503
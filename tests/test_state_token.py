@@ -0,0 +1,80 @@
+"""Tests for the signed compact game state tokens"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.backend.main import app
+from app.backend.state_token import InvalidToken, TokenSigner, decode_state, encode_state
+from high_society.agents import DiscreteRandomPassAgent
+from high_society.environments.discrete import DiscreteHighSocietyEnv
+
+
+def _normalized(game_state) -> dict:
+    """The state with prestige cards in a fixed order (tokens don't keep the order they were won in)."""
+    dumped = game_state.model_dump()
+    for player in dumped["player_states"].values():
+        player["prestige_cards"].sort(key=lambda card: (card["type"], card["value"] or 0))
+    return dumped
+
+
+def test_reachable_states_round_trip():
+    for seed in range(30):
+        num_players = 3 + seed % 3
+        env = DiscreteHighSocietyEnv(num_players=num_players)
+        env.reset(num_players=num_players, seed=seed)
+        agent = DiscreteRandomPassAgent(player_id=0, pass_probability=0.3, seed=seed)
+        while not all(env.terminations.values()):
+            current_idx = env.agents.index(env.agent_selection)
+            payload = encode_state(env.game_state, current_idx, "random")
+            assert len(payload) <= 64
+
+            game_state, decoded_idx, robot_type = decode_state(payload)
+            assert _normalized(game_state) == _normalized(env.game_state)
+            assert (decoded_idx, robot_type) == (current_idx, "random")
+            env.step(agent.get_action(None, env.get_action_mask(env.agent_selection))[0])
+
+
+def test_tampered_or_foreign_tokens_are_rejected():
+    env = DiscreteHighSocietyEnv(num_players=4)
+    env.reset(num_players=4, seed=0)
+    signer = TokenSigner(b"secret")
+    token = signer.dumps(env.game_state, 0, "dqn")
+    assert signer.loads(token)[1:] == (0, "dqn")
+
+    tampered = token[:10] + ("A" if token[10] != "A" else "B") + token[11:]
+    for bad in (tampered, token[:-2], "", "not a token!"):
+        with pytest.raises(InvalidToken):
+            signer.loads(bad)
+    with pytest.raises(InvalidToken):
+        TokenSigner(b"other secret").loads(token)
+
+
+def test_token_game_plays_to_completion():
+    client = TestClient(app)
+    resp = client.get("/api/token/new-game", params={"num_players": 3, "robot_type": "random"})
+    assert resp.status_code == 200
+    body = resp.json()
+
+    for _ in range(200):
+        if body["game_over"]:
+            break
+        assert len(body["token"]) < 100
+        action = next(i for i, legal in enumerate(body["action_mask"]) if legal)
+        resp = client.post("/api/token/action", json={"token": body["token"], "action": action})
+        assert resp.status_code == 200
+        body = resp.json()
+
+    assert body["game_over"]
+    assert body["token"] is None
+
+
+def test_token_action_rejects_bad_tokens_and_illegal_actions():
+    client = TestClient(app)
+    body = client.get("/api/token/new-game", params={"robot_type": "random"}).json()
+
+    token = body["token"]
+    tampered = token[:10] + ("A" if token[10] != "A" else "B") + token[11:]
+    resp = client.post("/api/token/action", json={"token": tampered, "action": 0})
+    assert resp.status_code == 400
+
+    resp = client.post("/api/token/action", json={"token": body["token"], "action": 99})
+    assert resp.status_code == 422